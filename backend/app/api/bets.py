@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-from typing import Any
+import logging
+from typing import Any, AsyncIterator
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
-from app.models import Plan90Days, PlanStatus, User
+from app.api.streaming import NDJSON_MEDIA_TYPE, ndjson_event
+from app.db import get_async_session
+from app.db.repository import ensure_user, save_latest_draft_plan
+from app.models import PlanStatus
 from app.services.strategic_bets import generate_strategic_bets
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["bets"])
 
 DEFAULT_USER_ID = 1
@@ -41,28 +47,12 @@ def _validate_request(payload: StrategicBetsRequest) -> None:
         raise HTTPException(status_code=400, detail="`chosen_option` doit être renseigné.")
 
 
-@router.post("/bets", response_model=StrategicBetsResponse)
-def create_bets(
+async def _store_bets(
+    session: AsyncSession,
     payload: StrategicBetsRequest,
-    session: Session = Depends(get_session),
+    bets_payload: list[dict[str, str]],
 ) -> StrategicBetsResponse:
-    _validate_request(payload)
-
-    user = session.get(User, DEFAULT_USER_ID)
-    if user is None:
-        session.add(User(id=DEFAULT_USER_ID))
-        session.flush()
-
-    bets_payload = generate_strategic_bets(payload.context, payload.chosen_option)
-    if not bets_payload:
-        raise HTTPException(status_code=500, detail="Impossible de générer des paris stratégiques.")
-
-    draft_plan = session.exec(
-        select(Plan90Days)
-        .where(Plan90Days.user_id == DEFAULT_USER_ID)
-        .where(Plan90Days.status == PlanStatus.draft)
-        .order_by(Plan90Days.created_at.desc())
-    ).first()
+    await ensure_user(session, DEFAULT_USER_ID)
 
     plan_json = {
         "context": payload.context,
@@ -70,21 +60,60 @@ def create_bets(
         "bets": bets_payload,
     }
 
-    if draft_plan is None:
-        draft_plan = Plan90Days(
-            user_id=DEFAULT_USER_ID,
-            status=PlanStatus.draft,
-            plan_json=plan_json,
-        )
-    else:
-        draft_plan.plan_json = plan_json
-
-    session.add(draft_plan)
-    session.commit()
-    session.refresh(draft_plan)
+    draft_plan = await save_latest_draft_plan(session, DEFAULT_USER_ID, plan_json)
+    await session.commit()
 
     return StrategicBetsResponse(
         plan_id=draft_plan.id or 0,
         status=draft_plan.status,
         bets=[StrategicBet(**bet) for bet in bets_payload],
     )
+
+
+@router.post("/bets", response_model=StrategicBetsResponse)
+async def create_bets(
+    payload: StrategicBetsRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> StrategicBetsResponse:
+    _validate_request(payload)
+
+    bets_payload = generate_strategic_bets(payload.context, payload.chosen_option)
+    if not bets_payload:
+        raise HTTPException(status_code=500, detail="Impossible de générer des paris stratégiques.")
+
+    return await _store_bets(session, payload, bets_payload)
+
+
+@router.post("/bets/stream")
+async def create_bets_stream(
+    payload: StrategicBetsRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    """Stream strategic bets as NDJSON: one `bet` event per bet, then `done`.
+
+    The draft plan is stored after the last bet; the `done` event carries the
+    same body as `/bets`. If it cannot be stored, the stream ends with an
+    `error` event instead.
+    """
+
+    _validate_request(payload)
+
+    async def _events() -> AsyncIterator[str]:
+        bets_payload = generate_strategic_bets(payload.context, payload.chosen_option)
+        if not bets_payload:
+            yield ndjson_event("error", {"detail": "Impossible de générer des paris stratégiques."})
+            return
+
+        for bet in bets_payload:
+            yield ndjson_event("bet", StrategicBet(**bet).model_dump())
+
+        try:
+            response = await _store_bets(session, payload, bets_payload)
+        except Exception:  # noqa: BLE001 - the status line is already sent
+            logger.exception("bets.stream.persist_failed")
+            await session.rollback()
+            yield ndjson_event("error", {"detail": "Impossible d'enregistrer les paris stratégiques."})
+            return
+        yield ndjson_event("done", response.model_dump(mode="json"))
+
+    return StreamingResponse(_events(), media_type=NDJSON_MEDIA_TYPE)
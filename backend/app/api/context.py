@@ -5,10 +5,11 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, ConfigDict
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
-from app.models import CareerContext, User
+from app.db import get_async_session, get_read_session
+from app.db.repository import ensure_user, upsert_career_context
+from app.models import CareerContext
 
 router = APIRouter(tags=["context"])
 
@@ -53,45 +54,31 @@ def _validate_payload(payload: CareerContextUpsertRequest) -> None:
 
 
 @router.post("/context", response_model=CareerContextResponse)
-def upsert_context(
+async def upsert_context(
     payload: CareerContextUpsertRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> CareerContext:
     _validate_payload(payload)
 
-    user = session.get(User, DEFAULT_USER_ID)
-    if user is None:
-        session.add(User(id=DEFAULT_USER_ID))
-        session.flush()
-
-    context = session.get(CareerContext, DEFAULT_USER_ID)
-    now = datetime.now(timezone.utc)
-
-    if context is None:
-        context = CareerContext(
+    await ensure_user(session, DEFAULT_USER_ID)
+    context = await upsert_career_context(
+        session,
+        CareerContext(
             user_id=DEFAULT_USER_ID,
             primary_goal=payload.primary_goal.strip(),
             success_definition=payload.success_definition.strip(),
             constraints=payload.constraints,
             horizon_days=payload.horizon_days,
-            updated_at=now,
-        )
-    else:
-        context.primary_goal = payload.primary_goal.strip()
-        context.success_definition = payload.success_definition.strip()
-        context.constraints = payload.constraints
-        context.horizon_days = payload.horizon_days
-        context.updated_at = now
-
-    session.add(context)
-    session.commit()
-    session.refresh(context)
+            updated_at=datetime.now(timezone.utc),
+        ),
+    )
+    await session.commit()
     return context
 
 
 @router.get("/context", response_model=CareerContextResponse)
-def get_context(session: Session = Depends(get_session)) -> CareerContext:
-    context = session.get(CareerContext, DEFAULT_USER_ID)
+async def get_context(session: AsyncSession = Depends(get_read_session)) -> CareerContext:
+    context = await session.get(CareerContext, DEFAULT_USER_ID)
     if context is None:
         raise HTTPException(status_code=404, detail="CareerContext introuvable.")
     return context
@@ -4,10 +4,12 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
-from app.models import CareerContext, Decision, User
+from app.db import get_async_session, get_read_session
+from app.db.repository import ensure_user, insert_returning
+from app.db.write_behind import run_write
+from app.models import CareerContext, Decision
 from app.services.decision_engine import check_constraints, force_tradeoff, generate_options
 
 router = APIRouter(tags=["decision"])
@@ -49,8 +51,8 @@ class DecisionChooseResponse(BaseModel):
 
 
 @router.post("/decision/options", response_model=DecisionOptionsResponse)
-def decision_options(session: Session = Depends(get_session)) -> DecisionOptionsResponse:
-    context = session.get(CareerContext, DEFAULT_USER_ID)
+async def decision_options(session: AsyncSession = Depends(get_read_session)) -> DecisionOptionsResponse:
+    context = await session.get(CareerContext, DEFAULT_USER_ID)
     if context is None:
         raise HTTPException(status_code=404, detail="CareerContext introuvable.")
 
@@ -73,9 +75,9 @@ def decision_options(session: Session = Depends(get_session)) -> DecisionOptions
 
 
 @router.post("/decision/choose", response_model=DecisionChooseResponse)
-def decision_choose(
+async def decision_choose(
     request: DecisionChooseRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> DecisionChooseResponse:
     if len(request.options) > 3:
         raise HTTPException(status_code=400, detail="Le nombre d'options ne peut pas dépasser 3.")
@@ -89,11 +91,6 @@ def decision_choose(
     if set(request.abandoned_options) - set(request.options):
         raise HTTPException(status_code=400, detail="`abandoned_options` doit être un sous-ensemble de `options`.")
 
-    user = session.get(User, DEFAULT_USER_ID)
-    if user is None:
-        session.add(User(id=DEFAULT_USER_ID))
-        session.flush()
-
     try:
         validated = force_tradeoff(
             chosen=request.chosen_option,
@@ -103,16 +100,20 @@ def decision_choose(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    decision = Decision(
-        user_id=DEFAULT_USER_ID,
-        options=request.options,
-        chosen_option=request.chosen_option,
-        abandoned_options=request.abandoned_options,
-        justification=request.justification.strip(),
-    )
-    session.add(decision)
-    session.commit()
-    session.refresh(decision)
+    async def _insert_decision(write_session: AsyncSession) -> Decision:
+        await ensure_user(write_session, DEFAULT_USER_ID)
+        return await insert_returning(
+            write_session,
+            Decision(
+                user_id=DEFAULT_USER_ID,
+                options=request.options,
+                chosen_option=request.chosen_option,
+                abandoned_options=request.abandoned_options,
+                justification=request.justification.strip(),
+            ),
+        )
+
+    decision = await run_write(session, _insert_decision)
 
     return DecisionChooseResponse(
         decision_id=decision.id or 0,
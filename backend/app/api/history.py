@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import get_read_session
+from app.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page, PageRequestError, keyset_page, select_fields
+from app.models import ChecklistResult, Decision, Plan90Days, PlanStatus
+
+router = APIRouter(tags=["history"])
+
+DEFAULT_USER_ID = 1
+
+# Large JSON columns are only loaded when asked for with `fields`.
+PLAN_FIELDS = ("id", "status", "plan_json", "created_at")
+PLAN_DEFAULT_FIELDS = ("id", "status", "created_at")
+DECISION_FIELDS = ("id", "options", "chosen_option", "abandoned_options", "justification", "created_at")
+DECISION_DEFAULT_FIELDS = ("id", "chosen_option", "justification", "created_at")
+CHECKLIST_RESULT_FIELDS = (
+    "id",
+    "plan_id",
+    "clarity",
+    "focus",
+    "actionability",
+    "feasibility",
+    "risk_awareness",
+    "coherence",
+    "verdict",
+    "feedback",
+    "created_at",
+)
+
+
+class HistoryPage(BaseModel):
+    items: list[dict[str, Any]]
+    next_cursor: str | None = None
+
+
+def _fields(requested: list[str] | None, available: tuple[str, ...], default: tuple[str, ...]) -> list[str]:
+    try:
+        return select_fields(requested, available, default)
+    except PageRequestError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+async def _page(session: AsyncSession, model: Any, **kwargs: Any) -> HistoryPage:
+    try:
+        page: Page = await keyset_page(session, model, **kwargs)
+    except PageRequestError as exc:
+        raise HTTPException(status_code=400, detail="`cursor` invalide.") from exc
+    return HistoryPage(items=page.items, next_cursor=page.next_cursor)
+
+
+@router.get("/plans", response_model=HistoryPage)
+async def list_plans(
+    status: PlanStatus | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: list[str] | None = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
+) -> HistoryPage:
+    """Plans of the user, newest first; add `fields=plan_json` to include the plan body."""
+
+    where = [Plan90Days.user_id == DEFAULT_USER_ID]
+    if status is not None:
+        where.append(Plan90Days.status == status)
+    return await _page(
+        session,
+        Plan90Days,
+        fields=_fields(fields, PLAN_FIELDS, PLAN_DEFAULT_FIELDS),
+        where=where,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@router.get("/decisions", response_model=HistoryPage)
+async def list_decisions(
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: list[str] | None = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
+) -> HistoryPage:
+    """Decisions of the user, newest first; `options` and `abandoned_options` on request."""
+
+    return await _page(
+        session,
+        Decision,
+        fields=_fields(fields, DECISION_FIELDS, DECISION_DEFAULT_FIELDS),
+        where=[Decision.user_id == DEFAULT_USER_ID],
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@router.get("/plan/{plan_id}/checklist-results", response_model=HistoryPage)
+async def list_checklist_results(
+    plan_id: int,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: list[str] | None = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
+) -> HistoryPage:
+    """Checklist evaluations of a plan, newest first."""
+
+    # Only the id: an empty page must not hide a plan that does not exist.
+    if (await session.exec(select(Plan90Days.id).where(Plan90Days.id == plan_id))).first() is None:
+        raise HTTPException(status_code=404, detail="Plan introuvable.")
+
+    return await _page(
+        session,
+        ChecklistResult,
+        fields=_fields(fields, CHECKLIST_RESULT_FIELDS, CHECKLIST_RESULT_FIELDS),
+        where=[ChecklistResult.plan_id == plan_id],
+        cursor=cursor,
+        limit=limit,
+    )
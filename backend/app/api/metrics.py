@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from typing import Any, Literal
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import metrics_registry
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_model=None)
+def get_metrics(format: Literal["json", "prometheus"] = "json") -> dict[str, Any] | PlainTextResponse:
+    if format == "prometheus":
+        return PlainTextResponse(metrics_registry.render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
+    return metrics_registry.snapshot()
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
-from typing import Any
+import logging
+from typing import Annotated, Any, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlmodel import Session, select
-
-from app.db import get_session
-from app.models import ChecklistResult, Plan90Days, PlanStatus, User
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.streaming import NDJSON_MEDIA_TYPE, ndjson_event
+from app.core.config import settings
+from app.db import get_async_session, get_read_session
+from app.db.repository import ensure_user, insert_returning, update_returning
+from app.db.write_behind import run_write
+from app.models import ChecklistResult, Plan90Days, PlanStatus
 from app.services.checklist import evaluate_plan_checklist
-from app.services.pdf_export import generate_plan_pdf
+from app.services.export_jobs import ExportJob, ExportJobStatus, get_export_jobs
+from app.services.pdf_archive import ZIP_MEDIA_TYPE, PdfArchiveEntry, stream_pdf_archive
+from app.services.pdf_cache import pdf_cache_key
+from app.services.pdf_render import get_pdf_renderer
 from app.services.plan_generator import generate_plan_90_days
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["plan"])
 
 DEFAULT_USER_ID = 1
@@ -28,6 +40,17 @@ class PlanGenerateResponse(BaseModel):
     plan: dict[str, Any]
 
 
+class ExportJobResponse(BaseModel):
+    job_id: str
+    plan_id: int
+    status: ExportJobStatus
+    result_url: str
+
+
+class PlanBulkExportRequest(BaseModel):
+    plan_ids: list[int]
+
+
 class PlanEvaluateResponse(BaseModel):
     plan_id: int
     status: PlanStatus
@@ -36,6 +59,15 @@ class PlanEvaluateResponse(BaseModel):
     feedback: str
 
 
+def _job_response(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        job_id=job.id,
+        plan_id=job.plan_id,
+        status=job.status,
+        result_url=f"/export-jobs/{job.id}",
+    )
+
+
 def _validate_request(payload: PlanGenerateRequest) -> None:
     if not payload.context:
         raise HTTPException(status_code=400, detail="`context` doit être renseigné.")
@@ -44,67 +76,111 @@ def _validate_request(payload: PlanGenerateRequest) -> None:
         raise HTTPException(status_code=400, detail="`chosen_option` doit être renseigné.")
 
 
+async def _persist_draft_plan(session: AsyncSession, plan_payload: dict[str, Any]) -> PlanGenerateResponse:
+    await ensure_user(session, DEFAULT_USER_ID)
+    draft_plan = await insert_returning(
+        session,
+        Plan90Days(
+            user_id=DEFAULT_USER_ID,
+            status=PlanStatus.draft,
+            plan_json=plan_payload,
+        ),
+    )
+    await session.commit()
+
+    return PlanGenerateResponse(
+        plan_id=draft_plan.id or 0,
+        status=draft_plan.status,
+        plan=plan_payload,
+    )
+
+
 @router.post("/plan/generate", response_model=PlanGenerateResponse)
-def generate_plan(
+async def generate_plan(
     payload: PlanGenerateRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> PlanGenerateResponse:
     _validate_request(payload)
 
-    user = session.get(User, DEFAULT_USER_ID)
-    if user is None:
-        session.add(User(id=DEFAULT_USER_ID))
-        session.flush()
-
     plan_payload = generate_plan_90_days(payload.context, payload.chosen_option)
+    return await _persist_draft_plan(session, plan_payload)
 
-    draft_plan = Plan90Days(
-        user_id=DEFAULT_USER_ID,
-        status=PlanStatus.draft,
-        plan_json=plan_payload,
-    )
 
-    session.add(draft_plan)
-    session.commit()
-    session.refresh(draft_plan)
+@router.post("/plan/generate/stream")
+async def generate_plan_stream(
+    payload: PlanGenerateRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    """Stream the plan as NDJSON: one `month` event per monthly objective, then `done`.
 
-    return PlanGenerateResponse(
-        plan_id=draft_plan.id or 0,
-        status=draft_plan.status,
-        plan=plan_payload,
-    )
+    The draft `Plan90Days` row is persisted once every month has been emitted;
+    the final `done` event carries the same body as `/plan/generate`. If it
+    cannot be stored, the stream ends with an `error` event instead.
+    """
+
+    _validate_request(payload)
+
+    async def _events() -> AsyncIterator[str]:
+        plan_payload = generate_plan_90_days(payload.context, payload.chosen_option)
+        for month in plan_payload["monthly_objectives"]:
+            yield ndjson_event("month", month)
+
+        try:
+            response = await _persist_draft_plan(session, plan_payload)
+        except Exception:  # noqa: BLE001 - the status line is already sent
+            logger.exception("plan.stream.persist_failed")
+            await session.rollback()
+            # Without a terminal event, clients could take the months already
+            # received for a complete plan.
+            yield ndjson_event("error", {"detail": "Impossible d'enregistrer le plan."})
+            return
+        yield ndjson_event("done", response.model_dump(mode="json"))
+
+    return StreamingResponse(_events(), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.post("/plan/{plan_id}/evaluate", response_model=PlanEvaluateResponse)
-def evaluate_plan(
+async def evaluate_plan(
     plan_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> PlanEvaluateResponse:
-    plan = session.get(Plan90Days, plan_id)
+    plan = await session.get(Plan90Days, plan_id)
     if plan is None:
         raise HTTPException(status_code=404, detail="Plan introuvable.")
 
     result = evaluate_plan_checklist(plan.plan_json)
 
-    checklist_result = ChecklistResult(
-        plan_id=plan_id,
-        clarity=result.clarity,
-        focus=result.focus,
-        actionability=result.actionability,
-        feasibility=result.feasibility,
-        risk_awareness=result.risk_awareness,
-        coherence=result.coherence,
-        verdict=result.verdict,
-        feedback=result.feedback,
-    )
-
-    plan.status = PlanStatus.approved if result.verdict == "approved" else PlanStatus.rejected
-
-    session.add(checklist_result)
-    session.add(plan)
-    session.commit()
-    session.refresh(checklist_result)
-    session.refresh(plan)
+    status = PlanStatus.approved if result.verdict == "approved" else PlanStatus.rejected
+
+    async def _record_verdict(write_session: AsyncSession) -> tuple[ChecklistResult, Plan90Days]:
+        updated_plan = await update_returning(write_session, Plan90Days, plan_id, status=status)
+        if updated_plan is None:
+            # Deleted since it was read (e.g. by the retention task): nothing
+            # is written and the transaction is rolled back.
+            raise HTTPException(status_code=404, detail="Plan introuvable.")
+        checklist_result = await insert_returning(
+            write_session,
+            ChecklistResult(
+                plan_id=plan_id,
+                clarity=result.clarity,
+                focus=result.focus,
+                actionability=result.actionability,
+                feasibility=result.feasibility,
+                risk_awareness=result.risk_awareness,
+                coherence=result.coherence,
+                verdict=result.verdict,
+                feedback=result.feedback,
+            ),
+        )
+        return checklist_result, updated_plan
+
+    checklist_result, plan = await run_write(session, _record_verdict)
+
+    if plan.status == PlanStatus.approved and settings.pdf_prerender_on_approval:
+        # Users download right after approval: have the PDF ready by then.
+        get_pdf_renderer().prerender(
+            pdf_cache_key(plan.plan_json, checklist_result.id), plan.plan_json, checklist_result
+        )
 
     return PlanEvaluateResponse(
         plan_id=plan.id or 0,
@@ -115,28 +191,169 @@ def evaluate_plan(
     )
 
 
-@router.get("/plan/{plan_id}/export.pdf")
-def export_plan_pdf(
-    plan_id: int,
-    session: Session = Depends(get_session),
-) -> Response:
-    plan = session.get(Plan90Days, plan_id)
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: a W/ prefix still matches.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def _latest_checklist_result(session: AsyncSession, plan_id: int) -> ChecklistResult | None:
+    return (
+        await session.exec(
+            select(ChecklistResult)
+            .where(ChecklistResult.plan_id == plan_id)
+            .order_by(ChecklistResult.created_at.desc(), ChecklistResult.id.desc())
+        )
+    ).first()
+
+
+async def _approved_plan(session: AsyncSession, plan_id: int) -> tuple[Plan90Days, ChecklistResult | None, str]:
+    """The approved plan, its latest checklist result and the key of its PDF."""
+
+    plan = await session.get(Plan90Days, plan_id)
     if plan is None:
         raise HTTPException(status_code=404, detail="Plan introuvable.")
 
     if plan.status != PlanStatus.approved:
         raise HTTPException(status_code=403, detail="Export PDF autorisé uniquement pour un plan approuvé.")
 
-    checklist_result = session.exec(
-        select(ChecklistResult)
-        .where(ChecklistResult.plan_id == plan_id)
-        .order_by(ChecklistResult.created_at.desc(), ChecklistResult.id.desc())
-    ).first()
+    checklist_result = await _latest_checklist_result(session, plan_id)
+    return plan, checklist_result, pdf_cache_key(plan.plan_json, checklist_result.id if checklist_result else None)
+
 
-    pdf_payload = generate_plan_pdf(plan.plan_json, checklist_result)
-    filename = f"plan-{plan_id}-decision-grade.pdf"
-    return Response(
-        content=pdf_payload,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+def _pdf_filename(plan_id: int) -> str:
+    return f"plan-{plan_id}-decision-grade.pdf"
+
+
+def _pdf_response(plan_id: int, cache_key: str, pdf_payload: bytes | None) -> Response:
+    """The PDF, or ``304 Not Modified`` when ``pdf_payload`` is ``None``."""
+
+    headers = {"ETag": f'"{cache_key}"', "Cache-Control": "private, no-cache"}
+    if pdf_payload is None:
+        return Response(status_code=304, headers=headers)
+    filename = _pdf_filename(plan_id)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(content=pdf_payload, media_type="application/pdf", headers=headers)
+
+
+@router.get("/plan/{plan_id}/export.pdf")
+async def export_plan_pdf(
+    plan_id: int,
+    session: AsyncSession = Depends(get_read_session),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    plan, checklist_result, cache_key = await _approved_plan(session, plan_id)
+    if _etag_matches(if_none_match, f'"{cache_key}"'):
+        return _pdf_response(plan_id, cache_key, None)
+
+    pdf_payload = await get_pdf_renderer().render(cache_key, plan.plan_json, checklist_result)
+    return _pdf_response(plan_id, cache_key, pdf_payload)
+
+
+async def _approved_plans(session: AsyncSession, plan_ids: list[int]) -> list[PdfArchiveEntry]:
+    """Archive entries of ``plan_ids``, in that order, loaded in two queries."""
+
+    plans = {
+        plan.id: plan
+        for plan in (await session.exec(select(Plan90Days).where(Plan90Days.id.in_(plan_ids)))).all()
+    }
+    missing = [plan_id for plan_id in plan_ids if plan_id not in plans]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Plans introuvables : {missing}.")
+
+    not_approved = [plan_id for plan_id in plan_ids if plans[plan_id].status != PlanStatus.approved]
+    if not_approved:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Export PDF autorisé uniquement pour des plans approuvés (non approuvés : {not_approved}).",
+        )
+
+    latest_results: dict[int, ChecklistResult] = {}
+    for checklist_result in (
+        await session.exec(
+            select(ChecklistResult)
+            .where(ChecklistResult.plan_id.in_(plan_ids))
+            .order_by(ChecklistResult.plan_id, ChecklistResult.created_at.desc(), ChecklistResult.id.desc())
+        )
+    ).all():
+        latest_results.setdefault(checklist_result.plan_id, checklist_result)
+
+    entries: list[PdfArchiveEntry] = []
+    for plan_id in plan_ids:
+        plan, checklist_result = plans[plan_id], latest_results.get(plan_id)
+        entries.append(
+            PdfArchiveEntry(
+                filename=_pdf_filename(plan_id),
+                cache_key=pdf_cache_key(plan.plan_json, checklist_result.id if checklist_result else None),
+                plan_json=plan.plan_json,
+                checklist_result=checklist_result,
+                modified_at=plan.created_at,
+            )
+        )
+    return entries
+
+
+@router.post("/plans/export.zip")
+async def export_plans_zip(
+    payload: PlanBulkExportRequest,
+    session: AsyncSession = Depends(get_read_session),
+) -> StreamingResponse:
+    """Stream a ZIP of the PDFs of several approved plans.
+
+    Every plan is checked before the first byte is sent; the PDFs missing
+    from the cache are then rendered in parallel by the render pool while
+    the archive streams.
+    """
+
+    plan_ids = list(dict.fromkeys(payload.plan_ids))
+    if not plan_ids:
+        raise HTTPException(status_code=400, detail="`plan_ids` doit être renseigné.")
+    if len(plan_ids) > settings.pdf_bulk_export_max_plans:
+        raise HTTPException(
+            status_code=400,
+            detail=f"`plan_ids` est limité à {settings.pdf_bulk_export_max_plans} plans.",
+        )
+
+    entries = await _approved_plans(session, plan_ids)
+    renderer = get_pdf_renderer()
+    # One document queued behind each one rendering keeps every worker busy.
+    concurrency = max(renderer.processes, 1) * 2
+    return StreamingResponse(
+        stream_pdf_archive(renderer, entries, concurrency=concurrency),
+        media_type=ZIP_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="plans.zip"'},
     )
+
+
+@router.post("/plan/{plan_id}/export", response_model=ExportJobResponse, status_code=202)
+async def create_export_job(
+    plan_id: int,
+    session: AsyncSession = Depends(get_read_session),
+) -> ExportJobResponse:
+    """Start rendering the PDF in the background; poll `result_url` for it."""
+
+    plan, checklist_result, cache_key = await _approved_plan(session, plan_id)
+    job = get_export_jobs().submit(plan_id, cache_key, plan.plan_json, checklist_result)
+    return _job_response(job)
+
+
+@router.get("/export-jobs/{job_id}", response_model=None, responses={202: {"model": ExportJobResponse}})
+async def get_export_job(
+    job_id: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """The PDF once the job is done; `202` with the job status while it renders."""
+
+    job = get_export_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job d'export introuvable.")
+    if job.status == ExportJobStatus.failed:
+        raise HTTPException(status_code=500, detail="Le rendu du PDF a échoué.")
+    if job.status == ExportJobStatus.pending:
+        return JSONResponse(status_code=202, content=_job_response(job).model_dump(mode="json"))
+    if _etag_matches(if_none_match, f'"{job.cache_key}"'):
+        return _pdf_response(job.plan_id, job.cache_key, None)
+    return _pdf_response(job.plan_id, job.cache_key, job.pdf)
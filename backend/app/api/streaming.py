@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_event(event: str, data: Any) -> str:
+    """Encode one streamed event as a newline-delimited JSON line."""
+
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False, default=str) + "\n"
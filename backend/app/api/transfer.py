@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.streaming import NDJSON_MEDIA_TYPE
+from app.db import get_async_session, get_read_session
+from app.services.data_transfer import (
+    DEFAULT_IMPORT_BATCH_SIZE,
+    ImportFormatError,
+    aexport_ndjson,
+    aimport_ndjson,
+    aiter_lines,
+    transfer_tables,
+)
+
+router = APIRouter(tags=["transfer"])
+
+
+@router.get("/export.ndjson")
+async def export_ndjson(
+    tables: list[str] | None = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
+) -> StreamingResponse:
+    """Stream every row (or those of `tables`) as NDJSON, parents before children."""
+
+    try:
+        selected = transfer_tables(tables)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        aexport_ndjson(session, selected),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="export.ndjson"'},
+    )
+
+
+@router.post("/import.ndjson")
+async def import_ndjson(
+    request: Request,
+    batch_size: int = Query(default=DEFAULT_IMPORT_BATCH_SIZE, ge=1, le=50_000),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict[str, dict[str, int]]:
+    """Import an `/export.ndjson` body; existing primary keys are skipped.
+
+    Each batch is committed on its own: after an error, the batches already
+    written stay in place and the same file can be re-posted.
+    """
+
+    try:
+        counts = await aimport_ndjson(session, aiter_lines(request.stream()), batch_size=batch_size)
+    except ImportFormatError as exc:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"imported": counts}
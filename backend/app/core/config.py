@@ -1,13 +1,72 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     openai_api_key: str = ""
     database_url: str = "sqlite:///./copilot.db"
+    database_read_url: str = ""
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_s: float = 30.0
+    db_pool_recycle_s: int = 1800
+    db_pool_pre_ping: bool = True
+    db_echo: bool = False
+    db_json_compression: Literal["none", "zlib", "zstd"] = "none"
+    db_write_behind_enabled: bool = False
+    db_write_behind_max_batch: int = 128
+    db_write_behind_max_delay_ms: float = 10.0
+    db_write_behind_wait_for_commit: bool = True
+    db_retention_keep_drafts: int = 5
+    db_retention_rejected_ttl_days: float = 30.0
+    db_retention_batch_size: int = 500
+    db_retention_interval_s: float = 0.0
+    db_retention_archive_path: str = ""
+    db_retention_vacuum_pages: int = 1000
+    db_sqlite_journal_mode: str = "wal"
+    db_sqlite_synchronous: str = "normal"
+    db_sqlite_busy_timeout_ms: int = 5000
+    db_sqlite_cache_size_kib: int = 65536
+    db_sqlite_mmap_size_bytes: int = 268435456
+    db_sqlite_begin_immediate: bool = False
+    db_postgres_statement_timeout_ms: int = 0
+    db_postgres_application_name: str = "life-career-copilot"
+    pdf_cache_enabled: bool = True
+    pdf_cache_max_bytes: int = 64 * 1024 * 1024
+    pdf_cache_dir: str = ""
+    pdf_cache_disk_max_bytes: int = 512 * 1024 * 1024
+    pdf_render_processes: int = 2
+    pdf_prerender_on_approval: bool = True
+    pdf_export_job_ttl_s: float = 3600.0
+    pdf_export_job_max_jobs: int = 1000
+    pdf_bulk_export_max_plans: int = 200
     llm_mock: bool = False
     llm_timeout_s: float = 20.0
     llm_retries: int = 2
     llm_model: str = "gpt-4o-mini"
+    llm_base_url: str = ""
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_max_concurrency: int = 16
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_s: float = 86400.0
+    llm_cache_path: str = ""
+    llm_cache_disk_max_entries: int = 10000
+    llm_single_flight_enabled: bool = True
+    llm_prompts_hot_reload: bool = False
+    llm_retry_base_delay_s: float = 0.5
+    llm_retry_max_delay_s: float = 8.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_s: float = 30.0
+    llm_hedge_enabled: bool = False
+    llm_hedge_quantile: float = 0.95
+    llm_hedge_min_samples: int = 20
+    llm_rate_limit_rpm: int = 0
+    llm_rate_limit_tpm: int = 0
+    llm_model_rate_limits: dict[str, dict[str, int]] = {}
+    llm_rate_limit_max_wait_s: float | None = None
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
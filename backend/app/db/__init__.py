@@ -1,3 +1,25 @@
-from app.db.session import create_db_and_tables, engine, get_session
+from app.db.session import (
+    async_engine,
+    async_read_engine,
+    build_async_engine,
+    build_engine,
+    count_queries,
+    create_db_and_tables,
+    engine,
+    get_async_session,
+    get_read_session,
+    get_session,
+)
 
-__all__ = ["engine", "create_db_and_tables", "get_session"]
+__all__ = [
+    "engine",
+    "async_engine",
+    "async_read_engine",
+    "build_engine",
+    "build_async_engine",
+    "count_queries",
+    "create_db_and_tables",
+    "get_session",
+    "get_async_session",
+    "get_read_session",
+]
@@ -0,0 +1,216 @@
+"""Versioned, online schema migrations.
+
+``SQLModel.metadata.create_all`` only creates missing tables, so indexes
+added to existing tables are shipped as migrations here. Each migration is
+recorded in ``schema_migrations`` and applied at most once: a worker claims
+a migration by inserting its version row before building anything and sets
+``completed_at`` once the build is done, so when several workers start
+together only the one whose insert wins applies it. A worker that loses a
+claim stops there and leaves the later versions to the winner, which
+applies them in order; a migration still being built is not reported as
+applied. A failed build deletes the claim so the next start retries it.
+
+Index builds are written to avoid long write locks on a populated database:
+on Postgres they use ``CREATE INDEX CONCURRENTLY`` (outside a transaction,
+writes keep flowing) and an index left invalid by an interrupted build is
+dropped and rebuilt; on SQLite the build takes the write lock for its
+duration, but in WAL mode readers are never blocked and writers wait at most
+``busy_timeout`` per attempt.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Sequence
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    delete,
+    insert,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+logger = logging.getLogger(__name__)
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    # When the version was claimed; completed_at stays NULL while it is built.
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+    Column("completed_at", DateTime(timezone=True), nullable=True),
+)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    table: str
+    columns: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    create_indexes: tuple[IndexSpec, ...] = ()
+    drop_indexes: tuple[str, ...] = ()
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Composite indexes for the latest-draft and latest-checklist lookups",
+        create_indexes=(
+            IndexSpec("ix_plan90days_user_id_status_created_at", "plan90days", ("user_id", "status", "created_at")),
+            IndexSpec("ix_checklistresult_plan_id_created_at_id", "checklistresult", ("plan_id", "created_at", "id")),
+        ),
+        # Left-prefixes of the composite indexes above: pure write overhead now.
+        drop_indexes=("ix_plan90days_user_id", "ix_checklistresult_plan_id"),
+    ),
+    Migration(
+        version=2,
+        description="Keyset (created_at, id) indexes for the plan and decision histories",
+        create_indexes=(
+            IndexSpec("ix_plan90days_user_id_created_at_id", "plan90days", ("user_id", "created_at", "id")),
+            IndexSpec("ix_decision_user_id_created_at_id", "decision", ("user_id", "created_at", "id")),
+        ),
+        drop_indexes=("ix_decision_user_id",),
+    ),
+)
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    _create_migrations_table(engine)
+    with engine.connect() as connection:
+        return set(
+            connection.scalars(
+                select(schema_migrations.c.version).where(schema_migrations.c.completed_at.is_not(None))
+            )
+        )
+
+
+def _create_migrations_table(engine: Engine) -> None:
+    migration_metadata.create_all(engine)
+    with engine.connect() as connection:
+        columns = {column["name"] for column in inspect(connection).get_columns(schema_migrations.name)}
+    if "completed_at" in columns:
+        return
+    # Tables created before completed_at only ever recorded finished builds.
+    column_type = schema_migrations.c.completed_at.type.compile(dialect=engine.dialect)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {schema_migrations.name} ADD COLUMN completed_at {column_type}"))
+            connection.execute(update(schema_migrations).values(completed_at=schema_migrations.c.applied_at))
+    except DBAPIError:
+        # Another worker added it first.
+        with engine.connect() as connection:
+            columns = {column["name"] for column in inspect(connection).get_columns(schema_migrations.name)}
+        if "completed_at" not in columns:
+            raise
+
+
+def pending_migrations(engine: Engine, migrations: Sequence[Migration] = MIGRATIONS) -> list[Migration]:
+    applied = applied_versions(engine)
+    return [migration for migration in sorted(migrations, key=lambda m: m.version) if migration.version not in applied]
+
+
+def run_migrations(engine: Engine, migrations: Sequence[Migration] = MIGRATIONS) -> list[int]:
+    """Apply pending migrations in version order and return the versions this call applied."""
+
+    applied: list[int] = []
+    for migration in pending_migrations(engine, migrations):
+        if not _claim(engine, migration):
+            # Built (or being built) by another worker, which goes on with the
+            # later versions: applying them here could overtake it.
+            logger.info("migrations.claimed_elsewhere version=%s", migration.version)
+            break
+        try:
+            _apply(engine, migration)
+        except BaseException:
+            _release(engine, migration)
+            raise
+        _complete(engine, migration)
+        applied.append(migration.version)
+    return applied
+
+
+def _claim(engine: Engine, migration: Migration) -> bool:
+    """Insert the version row of ``migration``; False if another worker already did."""
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def _complete(engine: Engine, migration: Migration) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            update(schema_migrations)
+            .where(schema_migrations.c.version == migration.version)
+            .values(completed_at=datetime.now(timezone.utc))
+        )
+
+
+def _release(engine: Engine, migration: Migration) -> None:
+    with engine.begin() as connection:
+        connection.execute(delete(schema_migrations).where(schema_migrations.c.version == migration.version))
+
+
+def _apply(engine: Engine, migration: Migration) -> None:
+    postgres = engine.dialect.name == "postgresql"
+    # CONCURRENTLY is refused inside a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        existing_tables = set(inspect(connection).get_table_names())
+        for index in migration.create_indexes:
+            if index.table not in existing_tables:
+                continue
+            if postgres:
+                _drop_invalid_postgres_index(connection, index.name)
+            connection.execute(text(_create_index_sql(index, concurrently=postgres)))
+        for name in migration.drop_indexes:
+            concurrently = "CONCURRENTLY " if postgres else ""
+            connection.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+        for table in sorted({index.table for index in migration.create_indexes} & existing_tables):
+            connection.execute(text(f"ANALYZE {table}"))
+
+
+def _create_index_sql(index: IndexSpec, *, concurrently: bool) -> str:
+    concurrently_sql = "CONCURRENTLY " if concurrently else ""
+    return f"CREATE INDEX {concurrently_sql}IF NOT EXISTS {index.name} ON {index.table} ({', '.join(index.columns)})"
+
+
+def _drop_invalid_postgres_index(connection: Connection, name: str) -> None:
+    invalid = connection.scalar(
+        text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+        ),
+        {"name": name},
+    )
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
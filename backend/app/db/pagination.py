@@ -0,0 +1,96 @@
+"""Keyset pagination over ``(created_at, id)``, newest first.
+
+A page is ``WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at
+DESC, id DESC LIMIT :n`` on an index ending in ``(created_at, id)``: one
+index range scan of ``n`` entries however deep the page, where ``OFFSET``
+would read and discard every skipped row. The cursor is the position of
+the last row of the previous page, encoded as an opaque string.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import tuple_
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Needed to build the next cursor, so always selected.
+KEY_FIELDS = ("id", "created_at")
+
+
+class PageRequestError(ValueError):
+    """Raised for a cursor that cannot be decoded or an unknown field."""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise PageRequestError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def select_fields(
+    requested: Iterable[str] | None,
+    available: Sequence[str],
+    default: Sequence[str],
+) -> list[str]:
+    """Columns to load: ``requested`` (or ``default``) plus the key fields, in table order."""
+
+    wanted = set(default if requested is None else requested)
+    unknown = wanted - set(available)
+    if unknown:
+        raise PageRequestError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    wanted.update(KEY_FIELDS)
+    return [name for name in available if name in wanted]
+
+
+@dataclass
+class Page:
+    items: list[dict[str, Any]] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+async def keyset_page(
+    session: AsyncSession,
+    model: type[SQLModel],
+    *,
+    fields: Sequence[str],
+    where: Sequence[Any] = (),
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
+    """Read one page of ``model`` rows matching ``where``, loading only ``fields``."""
+
+    created_at, row_id = model.created_at, model.id
+    statement = (
+        select(*(getattr(model, name) for name in fields))
+        .where(*where)
+        .order_by(created_at.desc(), row_id.desc())
+        # One extra row tells whether another page follows.
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        statement = statement.where(tuple_(created_at, row_id) < decode_cursor(cursor))
+
+    rows = (await session.exec(statement)).all()
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    return Page(items=items, next_cursor=next_cursor)
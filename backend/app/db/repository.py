@@ -0,0 +1,116 @@
+"""Single-statement writes for the API routers.
+
+Each helper issues one SQL statement where the ORM unit of work would issue
+several: ``INSERT ... ON CONFLICT`` instead of a read followed by an insert,
+and ``RETURNING`` instead of a refresh after commit.
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Any, TypeVar
+
+from sqlalchemy import insert as generic_insert
+from sqlalchemy import event, update
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import CareerContext, Plan90Days, PlanStatus, User
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+# Users known to exist, per engine: the first write of a process inserts the
+# user, later writes skip the statement entirely.
+_known_users: weakref.WeakKeyDictionary[Engine, set[int]] = weakref.WeakKeyDictionary()
+
+
+def _engine(session: AsyncSession) -> Engine:
+    return session.bind.sync_engine
+
+
+def _dialect_insert(session: AsyncSession, model: type[SQLModel]) -> Any:
+    if _engine(session).dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def _column_values(instance: SQLModel) -> dict[str, Any]:
+    """Column values of a model instance, with its Python-side defaults applied."""
+
+    table = type(instance).__table__
+    values = {column.name: getattr(instance, column.name) for column in table.columns}
+    return {
+        name: value
+        for name, value in values.items()
+        if not (value is None and table.c[name].primary_key)
+    }
+
+
+async def ensure_user(session: AsyncSession, user_id: int) -> None:
+    known = _known_users.setdefault(_engine(session), set())
+    if user_id in known:
+        return
+    statement = _dialect_insert(session, User).values(_column_values(User(id=user_id)))
+    await session.exec(statement.on_conflict_do_nothing(index_elements=["id"]))
+
+    # Only trust the cache once the row is durable; a rollback must retry.
+    @event.listens_for(session.sync_session, "after_commit", once=True)
+    def _remember(_session: Any) -> None:
+        known.add(user_id)
+
+
+def forget_known_users() -> None:
+    _known_users.clear()
+
+
+async def insert_returning(session: AsyncSession, instance: ModelT) -> ModelT:
+    """Insert ``instance`` and return the stored row (generated id included)."""
+
+    model = type(instance)
+    result = await session.exec(generic_insert(model).values(_column_values(instance)).returning(model))
+    return result.scalar_one()
+
+
+async def update_returning(session: AsyncSession, model: type[ModelT], row_id: int, **values: Any) -> ModelT | None:
+    result = await session.exec(
+        update(model).where(model.id == row_id).values(**values).returning(model),
+        execution_options={"populate_existing": True},
+    )
+    return result.scalar_one_or_none()
+
+
+async def upsert_career_context(session: AsyncSession, context: CareerContext) -> CareerContext:
+    values = _column_values(context)
+    statement = _dialect_insert(session, CareerContext).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={name: value for name, value in values.items() if name != "user_id"},
+    ).returning(CareerContext)
+    result = await session.exec(statement, execution_options={"populate_existing": True})
+    return result.scalar_one()
+
+
+async def save_latest_draft_plan(session: AsyncSession, user_id: int, plan_json: dict[str, Any]) -> Plan90Days:
+    """Overwrite the user's most recent draft plan, or create one if there is none."""
+
+    latest_draft = (
+        select(Plan90Days.id)
+        .where(Plan90Days.user_id == user_id)
+        .where(Plan90Days.status == PlanStatus.draft)
+        .order_by(Plan90Days.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await session.exec(
+        update(Plan90Days).where(Plan90Days.id == latest_draft).values(plan_json=plan_json).returning(Plan90Days),
+        execution_options={"populate_existing": True},
+    )
+    plan = result.scalar_one_or_none()
+    if plan is None:
+        plan = await insert_returning(
+            session, Plan90Days(user_id=user_id, status=PlanStatus.draft, plan_json=plan_json)
+        )
+    return plan
@@ -0,0 +1,300 @@
+"""Retention policy and compaction job for ``Plan90Days``.
+
+``POST /plan/generate`` inserts a draft on every call. The job keeps the
+``keep_drafts`` most recent drafts of each user and the rejected plans
+evaluated less than ``rejected_ttl_days`` ago (the age of a rejected plan is
+that of its latest checklist result, the one that rejected it); approved
+plans are never touched.
+
+Expired plans and their checklist results are deleted in batches of
+``batch_size``, each in its own short transaction, so writers only ever
+wait for one batch. Each batch locks the candidates that still have the
+expired status (``FOR UPDATE`` on Postgres; SQLite serializes writers) and
+archives and deletes exactly those, so a plan evaluated meanwhile is
+neither archived nor stripped of its checklist results. With an archive path they are first appended to it in
+the ``/export.ndjson`` format (re-importable with ``/import.ndjson``).
+Freed space is then returned a little at a time: ``PRAGMA
+incremental_vacuum`` on SQLite (``auto_vacuum=incremental`` databases
+only), a plain, non-blocking ``VACUUM`` on Postgres, followed by a refresh
+of the planner statistics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, TextIO
+
+from sqlalchemy import delete, exists, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import Settings, settings
+from app.db.session import engine as default_engine
+from app.models import ChecklistResult, Plan90Days, PlanStatus
+from app.services.data_transfer import encode_row
+from app.services.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+_PLANS = Plan90Days.__table__
+_CHECKLIST_RESULTS = ChecklistResult.__table__
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    keep_drafts: int = 5
+    rejected_ttl_days: float = 30.0
+    batch_size: int = 500
+    vacuum_pages: int = 1000
+    archive_path: str = ""
+
+    @classmethod
+    def from_settings(cls, config: Settings = settings) -> RetentionPolicy:
+        return cls(
+            keep_drafts=config.db_retention_keep_drafts,
+            rejected_ttl_days=config.db_retention_rejected_ttl_days,
+            batch_size=config.db_retention_batch_size,
+            vacuum_pages=config.db_retention_vacuum_pages,
+            archive_path=config.db_retention_archive_path,
+        )
+
+
+@dataclass
+class RetentionStats:
+    runs: int = 0
+    drafts_deleted: int = 0
+    rejected_deleted: int = 0
+    checklist_results_deleted: int = 0
+    rows_archived: int = 0
+    pages_vacuumed: int = 0
+    last_run_duration_s: float = 0.0
+    failed_runs: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Run:
+    stats: RetentionStats = field(default_factory=lambda: RetentionStats(runs=1))
+    archive: TextIO | None = None
+
+
+# Totals since the process started, exposed by ``GET /metrics``.
+retention_stats = RetentionStats()
+metrics_registry.register_collector("plan_retention", retention_stats.as_dict)
+
+
+def _expired_drafts(keep: int) -> Callable[[Connection, int], list[int]]:
+    def _next_ids(connection: Connection, limit: int) -> list[int]:
+        # Served by ix_plan90days_user_id_status_created_at.
+        ranked = (
+            select(
+                _PLANS.c.id,
+                func.row_number()
+                .over(partition_by=_PLANS.c.user_id, order_by=(_PLANS.c.created_at.desc(), _PLANS.c.id.desc()))
+                .label("rank"),
+            )
+            .where(_PLANS.c.status == PlanStatus.draft)
+            .subquery()
+        )
+        return list(connection.scalars(select(ranked.c.id).where(ranked.c.rank > keep).limit(limit)))
+
+    return _next_ids
+
+
+def _expired_rejected(cutoff: datetime) -> Callable[[Connection, int], list[int]]:
+    last_id = 0
+
+    def _next_ids(connection: Connection, limit: int) -> list[int]:
+        nonlocal last_id
+        # Walks the primary key once across batches instead of rescanning
+        # the table from the start for each one.
+        ids = list(
+            connection.scalars(
+                select(_PLANS.c.id)
+                .where(_PLANS.c.id > last_id)
+                .where(_PLANS.c.status == PlanStatus.rejected)
+                .where(_PLANS.c.created_at < cutoff)
+                # Rejected before the cutoff: no checklist result since then.
+                .where(
+                    ~exists()
+                    .where(_CHECKLIST_RESULTS.c.plan_id == _PLANS.c.id)
+                    .where(_CHECKLIST_RESULTS.c.created_at >= cutoff)
+                )
+                .order_by(_PLANS.c.id)
+                .limit(limit)
+            )
+        )
+        if ids:
+            last_id = ids[-1]
+        return ids
+
+    return _next_ids
+
+
+def _archive(connection: Connection, archive: TextIO, plan_ids: list[int]) -> int:
+    archived = 0
+    # Parents first, like /export.ndjson, so the archive imports in one pass.
+    for table, key in ((_PLANS, _PLANS.c.id), (_CHECKLIST_RESULTS, _CHECKLIST_RESULTS.c.plan_id)):
+        for row in connection.execute(select(table).where(key.in_(plan_ids)).order_by(*table.primary_key.columns)):
+            archive.write(encode_row(table, row))
+            archived += 1
+    archive.flush()
+    return archived
+
+
+def _purge(
+    engine: Engine,
+    status: PlanStatus,
+    next_ids: Callable[[Connection, int], list[int]],
+    policy: RetentionPolicy,
+    run: _Run,
+) -> int:
+    deleted = 0
+    while True:
+        with engine.begin() as connection:
+            plan_ids = next_ids(connection, max(policy.batch_size, 1))
+            if not plan_ids:
+                return deleted
+            # Only the candidates still in ``status`` (a draft evaluated since
+            # it was selected stays), locked until the batch commits.
+            expired_ids = list(
+                connection.scalars(
+                    select(_PLANS.c.id)
+                    .where(_PLANS.c.id.in_(plan_ids))
+                    .where(_PLANS.c.status == status)
+                    .order_by(_PLANS.c.id)
+                    .with_for_update()
+                )
+            )
+            if not expired_ids:
+                continue
+            if run.archive is not None:
+                run.stats.rows_archived += _archive(connection, run.archive, expired_ids)
+            run.stats.checklist_results_deleted += connection.execute(
+                delete(_CHECKLIST_RESULTS).where(_CHECKLIST_RESULTS.c.plan_id.in_(expired_ids))
+            ).rowcount
+            deleted += connection.execute(delete(_PLANS).where(_PLANS.c.id.in_(expired_ids))).rowcount
+
+
+def _reclaim(engine: Engine, policy: RetentionPolicy) -> int:
+    """Return freed pages and refresh statistics; the number of pages released."""
+
+    if engine.dialect.name == "postgresql":
+        # Plain VACUUM only takes a lock that lets reads and writes through.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"VACUUM (ANALYZE) {_PLANS.name}, {_CHECKLIST_RESULTS.name}"))
+        return 0
+    if engine.dialect.name != "sqlite":
+        return 0
+
+    with engine.connect() as connection:
+        released = 0
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2 and policy.vacuum_pages > 0:
+            before = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+            # sqlite3 runs a single step of the statement, and each step frees
+            # one page: issue it once per page to release.
+            for _ in range(min(before, policy.vacuum_pages)):
+                connection.exec_driver_sql("PRAGMA incremental_vacuum")
+            released = before - connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        # Re-analyzes only the tables whose statistics drifted.
+        connection.exec_driver_sql("PRAGMA optimize")
+        connection.commit()
+    return released
+
+
+def compact_plans(
+    engine: Engine = default_engine,
+    policy: RetentionPolicy | None = None,
+    *,
+    now: datetime | None = None,
+) -> RetentionStats:
+    """Apply ``policy`` once and return what this run reclaimed."""
+
+    policy = policy or RetentionPolicy.from_settings()
+    now = now or datetime.now(timezone.utc)
+    started = time.perf_counter()
+    run = _Run()
+    try:
+        with ExitStack() as stack:
+            if policy.archive_path:
+                run.archive = stack.enter_context(open(policy.archive_path, "a", encoding="utf-8"))
+            if policy.keep_drafts > 0:
+                run.stats.drafts_deleted = _purge(
+                    engine, PlanStatus.draft, _expired_drafts(policy.keep_drafts), policy, run
+                )
+            if policy.rejected_ttl_days > 0:
+                cutoff = now - timedelta(days=policy.rejected_ttl_days)
+                run.stats.rejected_deleted = _purge(
+                    engine, PlanStatus.rejected, _expired_rejected(cutoff), policy, run
+                )
+        if run.stats.drafts_deleted or run.stats.rejected_deleted:
+            run.stats.pages_vacuumed = _reclaim(engine, policy)
+    except Exception:
+        retention_stats.failed_runs += 1
+        raise
+    finally:
+        run.stats.last_run_duration_s = time.perf_counter() - started
+        _record(run.stats)
+    return run.stats
+
+
+def _record(run: RetentionStats) -> None:
+    for name, value in run.as_dict().items():
+        if name == "last_run_duration_s":
+            retention_stats.last_run_duration_s = value
+        elif name != "failed_runs":
+            setattr(retention_stats, name, getattr(retention_stats, name) + value)
+    for reason, count in (("draft", run.drafts_deleted), ("rejected", run.rejected_deleted)):
+        if count:
+            metrics_registry.inc("plan_retention_rows_deleted_total", count, table=_PLANS.name, reason=reason)
+    if run.checklist_results_deleted:
+        metrics_registry.inc(
+            "plan_retention_rows_deleted_total", run.checklist_results_deleted, table=_CHECKLIST_RESULTS.name
+        )
+    logger.info(
+        "plan_retention.run drafts=%s rejected=%s checklist_results=%s archived=%s pages=%s duration_ms=%.1f",
+        run.drafts_deleted,
+        run.rejected_deleted,
+        run.checklist_results_deleted,
+        run.rows_archived,
+        run.pages_vacuumed,
+        run.last_run_duration_s * 1000,
+    )
+
+
+_retention_task: asyncio.Task[None] | None = None
+
+
+async def _run_periodically(interval_s: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(compact_plans)
+        except Exception:  # noqa: BLE001 - the next run retries
+            logger.exception("plan_retention.run_failed")
+        await asyncio.sleep(interval_s)
+
+
+def start_retention_task(interval_s: float = settings.db_retention_interval_s) -> None:
+    """Run ``compact_plans`` every ``interval_s`` seconds (0 disables it)."""
+
+    global _retention_task
+    if interval_s > 0 and _retention_task is None:
+        _retention_task = asyncio.get_running_loop().create_task(_run_periodically(interval_s))
+
+
+async def stop_retention_task() -> None:
+    global _retention_task
+    if _retention_task is None:
+        return
+    _retention_task.cancel()
+    try:
+        await _retention_task
+    except asyncio.CancelledError:
+        pass
+    _retention_task = None
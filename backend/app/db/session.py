@@ -1,22 +1,240 @@
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import settings
+from app.core.config import Settings, settings
 
 DEFAULT_DB_URL = "sqlite:///./copilot.db"
 
+# Sync URL scheme -> asyncio driver used by the async engine.
+_ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "sqlite+pysqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "postgresql+psycopg2": "asyncpg",
+}
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+
+def async_database_url(database_url: str) -> str:
+    """Same database as ``database_url``, addressed through an asyncio driver.
+
+    ``postgresql+psycopg`` (psycopg 3) and URLs that already name an async
+    driver are returned unchanged.
+    """
+
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        return database_url
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def _is_sqlite_read_only(url: str) -> bool:
+    return make_url(url).query.get("mode") == "ro"
+
+
+def read_only_database_url(database_url: str, read_url: str = "") -> str | None:
+    """URL of the engine serving read-only endpoints, or ``None`` to share the write engine.
+
+    An explicit ``read_url`` (typically a replica) wins. Otherwise a
+    file-backed SQLite database is reopened with ``mode=ro`` and Postgres
+    keeps the same server, each on its own pool. In-memory SQLite cannot be
+    opened twice and shares the write engine.
+    """
+
+    if read_url:
+        return read_url
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return database_url
+    if _is_sqlite_memory(database_url):
+        return None
+    if _is_sqlite_read_only(database_url):
+        return database_url
+    database = url.database or ""
+    if not database.startswith("file:"):
+        database = f"file:{database}"
+    return url.set(database=database, query={**url.query, "mode": "ro", "uri": "true"}).render_as_string(
+        hide_password=False
+    )
+
+
+def engine_options(database_url: str, config: Settings = settings, *, read_only: bool = False) -> dict[str, Any]:
+    """Keyword arguments for ``create_engine`` matching the backend of ``database_url``.
+
+    File-backed SQLite and Postgres get a sized ``QueuePool`` with pre-ping;
+    in-memory SQLite keeps a single shared connection, otherwise every pooled
+    connection would see its own empty database. ``read_only`` makes every
+    Postgres transaction read-only (SQLite uses ``mode=ro`` in the URL).
+    """
+
+    url = make_url(database_url)
+    options: dict[str, Any] = {"echo": config.db_echo}
+    pool_options = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout_s,
+        "pool_recycle": config.db_pool_recycle_s,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,
+            # Driver-level lock wait; busy_timeout below covers the same window.
+            "timeout": config.db_sqlite_busy_timeout_ms / 1000,
+        }
+        if _is_sqlite_memory(database_url):
+            options["poolclass"] = StaticPool
+        else:
+            options.update(pool_options)
+        return options
+
+    if url.get_backend_name() == "postgresql":
+        server_settings = {"application_name": config.db_postgres_application_name}
+        if config.db_postgres_statement_timeout_ms:
+            server_settings["statement_timeout"] = str(config.db_postgres_statement_timeout_ms)
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": server_settings}
+        else:
+            options["connect_args"] = {
+                "options": " ".join(f"-c {name}={value}" for name, value in server_settings.items())
+            }
+
+    options.update(pool_options)
+    return options
+
+
+def sqlite_pragmas(config: Settings = settings) -> dict[str, Any]:
+    return {
+        # Only takes effect on a database without tables yet; lets the
+        # retention job return freed pages with `PRAGMA incremental_vacuum`.
+        "auto_vacuum": "incremental",
+        "journal_mode": config.db_sqlite_journal_mode,
+        "synchronous": config.db_sqlite_synchronous,
+        "busy_timeout": config.db_sqlite_busy_timeout_ms,
+        # A negative cache_size is expressed in KiB rather than in pages.
+        "cache_size": -config.db_sqlite_cache_size_kib,
+        "mmap_size": config.db_sqlite_mmap_size_bytes,
+        "temp_store": "memory",
+    }
+
+
+def _install_sqlite_profile(engine: Engine, config: Settings) -> None:
+    pragmas = sqlite_pragmas(config)
+    in_memory = _is_sqlite_memory(str(engine.url))
+    read_only = _is_sqlite_read_only(str(engine.url))
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        if config.db_sqlite_begin_immediate and not read_only:
+            # Let SQLAlchemy issue BEGIN itself (see the "begin" hook below).
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if in_memory and name in {"journal_mode", "mmap_size"}:
+                    continue
+                if read_only and name in {"auto_vacuum", "journal_mode"}:
+                    # Both write to the file header; the writer engine has
+                    # already set them.
+                    continue
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    if config.db_sqlite_begin_immediate and not read_only:
+
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(connection: Any) -> None:
+            # Take the write lock up front: a deferred transaction that later
+            # upgrades to a writer fails with "database is locked" without
+            # honouring busy_timeout.
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def build_engine(database_url: str, config: Settings = settings, *, read_only: bool = False) -> Engine:
+    engine = create_engine(database_url, **engine_options(database_url, config, read_only=read_only))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_profile(engine, config)
+    return engine
+
+
+def build_async_engine(database_url: str, config: Settings = settings, *, read_only: bool = False) -> AsyncEngine:
+    async_url = async_database_url(database_url)
+    engine = create_async_engine(async_url, **engine_options(async_url, config, read_only=read_only))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_profile(engine.sync_engine, config)
+    return engine
+
+
+@contextmanager
+def count_queries(engine: Engine | AsyncEngine) -> Iterator[list[str]]:
+    """Collect every SQL statement (and COMMIT) sent through ``engine`` inside the block."""
+
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    statements: list[str] = []
+
+    def _on_execute(_conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        statements.append(statement)
+
+    def _on_commit(_conn: Any) -> None:
+        statements.append("COMMIT")
+
+    event.listen(sync_engine, "before_cursor_execute", _on_execute)
+    event.listen(sync_engine, "commit", _on_commit)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _on_execute)
+        event.remove(sync_engine, "commit", _on_commit)
+
+
 DATABASE_URL = settings.database_url or DEFAULT_DB_URL
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-)
+engine = build_engine(DATABASE_URL)
+async_engine = build_async_engine(DATABASE_URL)
+READ_DATABASE_URL = read_only_database_url(DATABASE_URL, settings.database_read_url)
+async_read_engine = build_async_engine(READ_DATABASE_URL, read_only=True) if READ_DATABASE_URL else async_engine
 
 
 def create_db_and_tables() -> None:
     import app.models  # noqa: F401 - ensure SQLModel metadata is populated
+    from app.db.migrations import run_migrations
 
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 
 def get_session() -> Session:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    # Objects stay usable after commit: reloading expired attributes would
+    # need an implicit await.
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Session for endpoints that only read: never takes a writer lock.
+
+    With a replica, reads may lag the last writes by the replication delay.
+    """
+
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
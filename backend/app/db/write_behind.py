@@ -0,0 +1,227 @@
+"""Group commits for the insert-only write paths (decisions, checklist results).
+
+With ``DB_WRITE_BEHIND_ENABLED=true`` each write is queued as an operation
+``op(session) -> result``. A single worker drains the queue, runs up to
+``DB_WRITE_BEHIND_MAX_BATCH`` operations in one transaction and commits
+once, after at most ``DB_WRITE_BEHIND_MAX_DELAY_MS``: concurrent requests
+share one fsync instead of queueing for their own.
+
+Durability:
+
+- ``DB_WRITE_BEHIND_WAIT_FOR_COMMIT=true`` (default): a request returns once
+  the batch holding its write is committed. Responses are as durable as
+  without the queue; only the commit is shared.
+- ``false``: a request returns as soon as its statements have run inside the
+  open batch, with the ids that batch assigned. Writes acknowledged during
+  the last ``max_delay`` can be lost if the process crashes; a clean
+  shutdown flushes the queue (see ``close_write_behind_queue``). If the
+  batch commit itself fails, its acknowledged writes are lost as well: they
+  are not replayed, since a replay could assign other ids than the ones the
+  clients already hold. Such losses are logged as errors and counted in
+  ``lost_writes`` / ``db_write_behind_lost_writes_total``.
+
+If a batch fails before any write was acknowledged, it is rolled back and
+each operation is replayed in its own transaction, so one bad write only
+fails its own request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_engine
+from app.services.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteOperation = Callable[[AsyncSession], Awaitable[T]]
+
+
+@dataclass
+class WriteBehindStats:
+    writes: int = 0
+    batches: int = 0
+    largest_batch: int = 0
+    failed_batches: int = 0
+    failed_writes: int = 0
+    lost_writes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class _PendingWrite:
+    operation: WriteOperation[Any]
+    future: asyncio.Future[Any]
+
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        max_batch: int = 128,
+        max_delay_s: float = 0.01,
+        wait_for_commit: bool = True,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max(max_batch, 1)
+        self.max_delay_s = max(max_delay_s, 0.0)
+        self.wait_for_commit = wait_for_commit
+        self.stats = WriteBehindStats()
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+        self._worker: asyncio.Task[None] | None = None
+        self._closed = False
+
+    async def submit(self, operation: WriteOperation[T]) -> T:
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingWrite(operation, future))
+        return await future
+
+    async def flush(self) -> None:
+        """Wait until everything submitted so far is committed."""
+
+        if self._worker is None:
+            return
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the worker."""
+
+        self._closed = True
+        if self._worker is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._worker
+        self._worker = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            deadline = loop.time() + self.max_delay_s
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: list[_PendingWrite]) -> None:
+        self.stats.batches += 1
+        self.stats.writes += len(batch)
+        self.stats.largest_batch = max(self.stats.largest_batch, len(batch))
+        try:
+            async with self.session_factory() as session:
+                results = [await pending.operation(session) for pending in batch]
+                if not self.wait_for_commit:
+                    self._resolve(batch, results)
+                await session.commit()
+        except Exception:  # noqa: BLE001 - isolate the failing write below
+            logger.warning("write_behind.batch_failed size=%s", len(batch), exc_info=True)
+            self.stats.failed_batches += 1
+            # A cancelled submitter was never acknowledged: its write is replayed.
+            acknowledged = [p for p in batch if p.future.done() and not p.future.cancelled()]
+            if acknowledged:
+                self._record_lost(len(acknowledged))
+            await self._write_one_by_one([p for p in batch if p not in acknowledged])
+            return
+        self._resolve(batch, results)
+
+    def _record_lost(self, count: int) -> None:
+        self.stats.lost_writes += count
+        self.stats.failed_writes += count
+        metrics_registry.inc("db_write_behind_lost_writes_total", count)
+        logger.error("write_behind.acknowledged_writes_lost count=%s", count)
+
+    async def _write_one_by_one(self, batch: list[_PendingWrite]) -> None:
+        for pending in batch:
+            try:
+                async with self.session_factory() as session:
+                    result = await pending.operation(session)
+                    await session.commit()
+            except Exception as exc:  # noqa: BLE001 - reported to the submitter
+                self.stats.failed_writes += 1
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+                continue
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    @staticmethod
+    def _resolve(batch: list[_PendingWrite], results: list[Any]) -> None:
+        for pending, result in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+
+_write_behind_queue: WriteBehindQueue | None = None
+
+
+def _get_write_behind_queue() -> WriteBehindQueue:
+    global _write_behind_queue
+    if _write_behind_queue is None:
+        _write_behind_queue = WriteBehindQueue(
+            lambda: AsyncSession(async_engine, expire_on_commit=False),
+            max_batch=settings.db_write_behind_max_batch,
+            max_delay_s=settings.db_write_behind_max_delay_ms / 1000,
+            wait_for_commit=settings.db_write_behind_wait_for_commit,
+        )
+        metrics_registry.register_collector("write_behind", _write_behind_queue.stats.as_dict)
+    return _write_behind_queue
+
+
+async def run_write(session: AsyncSession, operation: WriteOperation[T]) -> T:
+    """Run ``operation`` and commit it, directly or through the write-behind queue."""
+
+    if settings.db_write_behind_enabled:
+        # End the request's read transaction: on a rollback-journal SQLite
+        # database its shared lock would block the batch commit.
+        await session.commit()
+        return await _get_write_behind_queue().submit(operation)
+    result = await operation(session)
+    await session.commit()
+    return result
+
+
+async def close_write_behind_queue() -> None:
+    global _write_behind_queue
+    if _write_behind_queue is not None:
+        await _write_behind_queue.close()
+        _write_behind_queue = None
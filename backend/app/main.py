@@ -5,7 +5,16 @@ from app.api.context import router as context_router
 from app.api.decision import router as decision_router
 from app.api.bets import router as bets_router
 from app.api.plan import router as plan_router
-from app.db import create_db_and_tables
+from app.api.history import router as history_router
+from app.api.metrics import router as metrics_router
+from app.api.transfer import router as transfer_router
+from app.db import async_engine, async_read_engine, create_db_and_tables
+from app.db.retention import start_retention_task, stop_retention_task
+from app.db.write_behind import close_write_behind_queue
+from app.services.export_jobs import close_export_jobs
+from app.services.llm_client import aclose_default_client
+from app.services.pdf_render import close_pdf_renderer, get_pdf_renderer
+from app.services.prompt_registry import load_prompts
 
 app = FastAPI(title="Life Career Strategy Copilot API")
 
@@ -13,6 +22,22 @@ app = FastAPI(title="Life Career Strategy Copilot API")
 @app.on_event("startup")
 def on_startup() -> None:
     create_db_and_tables()
+    load_prompts()
+    start_retention_task()
+    get_pdf_renderer().warm()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await aclose_default_client()
+    await stop_retention_task()
+    await close_export_jobs()
+    close_pdf_renderer()
+    # Flush queued group-commit writes before the engine goes away.
+    await close_write_behind_queue()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
 
 
 @app.get("/health")
@@ -25,3 +50,6 @@ app.include_router(context_router)
 app.include_router(decision_router)
 app.include_router(bets_router)
 app.include_router(plan_router)
+app.include_router(history_router)
+app.include_router(metrics_router)
+app.include_router(transfer_router)
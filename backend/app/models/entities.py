@@ -4,9 +4,11 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from app.models.types import json_column
+
 
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
@@ -28,32 +30,47 @@ class CareerContext(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id", primary_key=True)
     primary_goal: str
     success_definition: str
-    constraints: dict = Field(sa_column=Column(JSON, nullable=False))
+    constraints: dict = Field(sa_column=json_column())
     horizon_days: Optional[int] = Field(default=None, nullable=True)
     updated_at: datetime = Field(default_factory=utcnow, nullable=False)
 
 
 class Decision(SQLModel, table=True):
+    # Serves the keyset-paginated decision history of a user.
+    __table_args__ = (Index("ix_decision_user_id_created_at_id", "user_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id", index=True)
-    options: list[str] = Field(sa_column=Column(JSON, nullable=False))
+    user_id: int = Field(foreign_key="user.id")
+    options: list[str] = Field(sa_column=json_column())
     chosen_option: str
-    abandoned_options: list[str] = Field(sa_column=Column(JSON, nullable=False))
+    abandoned_options: list[str] = Field(sa_column=json_column())
     justification: str
     created_at: datetime = Field(default_factory=utcnow, nullable=False)
 
 
 class Plan90Days(SQLModel, table=True):
+    # The first serves "latest draft of a user" (`/bets`) and the history
+    # filtered by status, the second the unfiltered history; their user_id
+    # prefix replaces the former single-column index.
+    __table_args__ = (
+        Index("ix_plan90days_user_id_status_created_at", "user_id", "status", "created_at"),
+        Index("ix_plan90days_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id", index=True)
-    plan_json: dict = Field(sa_column=Column(JSON, nullable=False))
+    user_id: int = Field(foreign_key="user.id")
+    plan_json: dict = Field(sa_column=json_column())
     status: PlanStatus = Field(default=PlanStatus.draft, nullable=False)
     created_at: datetime = Field(default_factory=utcnow, nullable=False)
 
 
 class ChecklistResult(SQLModel, table=True):
+    # Serves "latest checklist of a plan" (PDF export) and the checklist
+    # history of a plan without a sort step.
+    __table_args__ = (Index("ix_checklistresult_plan_id_created_at_id", "plan_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    plan_id: int = Field(foreign_key="plan90days.id", index=True)
+    plan_id: int = Field(foreign_key="plan90days.id")
     clarity: bool = Field(default=False, nullable=False)
     focus: bool = Field(default=False, nullable=False)
     actionability: bool = Field(default=False, nullable=False)
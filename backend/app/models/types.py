@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+from sqlalchemy import JSON, Column, LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+JSON_COMPRESSION_CODECS = ("none", "zlib", "zstd")
+
+# First byte of a compressed payload. JSON text never starts with a control
+# byte, so anything else is read back as plain UTF-8 JSON: rows written
+# before compression was enabled stay readable.
+_ZLIB_MARKER = b"\x01"
+_ZSTD_MARKER = b"\x02"
+
+_ZSTD_LEVEL = 6
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError("La compression zstd nécessite le paquet `zstandard`.") from exc
+    return zstandard
+
+
+def encode_json(value: Any, codec: str = "zlib") -> bytes:
+    """Compact JSON, compressed with ``codec`` unless that would not make it smaller."""
+
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if codec == "zlib":
+        compressed = _ZLIB_MARKER + zlib.compress(raw, 6)
+    elif codec == "zstd":
+        compressed = _ZSTD_MARKER + _zstd().ZstdCompressor(level=_ZSTD_LEVEL).compress(raw)
+    elif codec == "none":
+        return raw
+    else:
+        raise ValueError(f"Unknown JSON compression codec: {codec!r}")
+    return compressed if len(compressed) < len(raw) else raw
+
+
+def decode_json(payload: bytes | str | None) -> Any:
+    if payload is None:
+        return None
+    if isinstance(payload, str):
+        return json.loads(payload)
+    payload = bytes(payload)
+    if payload[:1] == _ZLIB_MARKER:
+        payload = zlib.decompress(payload[1:])
+    elif payload[:1] == _ZSTD_MARKER:
+        payload = _zstd().ZstdDecompressor().decompress(payload[1:])
+    return json.loads(payload)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON value stored as (optionally compressed) compact JSON bytes.
+
+    Values are compressed with ``codec`` on write; reads detect the codec from
+    the payload, so rows written with another codec, or as plain JSON text,
+    decode transparently.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, codec: str = "zlib") -> None:
+        super().__init__()
+        if codec not in JSON_COMPRESSION_CODECS:
+            raise ValueError(f"Unknown JSON compression codec: {codec!r}")
+        self.codec = codec
+
+    def process_bind_param(self, value: Any, dialect: Any) -> bytes | None:
+        return None if value is None else encode_json(value, self.codec)
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        return decode_json(value)
+
+
+def json_column() -> Column:
+    """Column for a JSON model field, compressed when ``DB_JSON_COMPRESSION`` is set."""
+
+    codec = settings.db_json_compression
+    if codec == "none":
+        return Column(JSON, nullable=False)
+    return Column(CompressedJSON(codec), nullable=False)
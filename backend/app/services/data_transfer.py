@@ -0,0 +1,338 @@
+"""Bulk NDJSON export/import of the application tables.
+
+One line per row: ``{"table": "<name>", "row": {...}}``. Tables are exported
+parents first (users, then contexts, decisions, plans, checklist results),
+so a file can be imported in a single pass without foreign-key violations.
+
+Exports read through a server-side cursor in ``yield_per`` partitions and
+imports insert ``executemany`` batches, each committed on its own, so memory
+stays bounded by the batch size rather than by the table size.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, NamedTuple
+
+from sqlalchemy import Table, func, select
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, StatementError
+from sqlalchemy.types import TypeDecorator
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models  # noqa: F401 - ensure SQLModel metadata is populated
+
+DEFAULT_EXPORT_PARTITION_SIZE = 1000
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+
+
+class ImportFormatError(ValueError):
+    """Raised for a line that is not a valid ``{"table", "row"}`` record of a known table.
+
+    Also raised, naming the lines concerned, for a batch the database rejects.
+    """
+
+
+def transfer_tables(names: Iterable[str] | None = None) -> list[Table]:
+    tables = list(SQLModel.metadata.sorted_tables)
+    if names is None:
+        return tables
+    wanted = set(names)
+    unknown = wanted - {table.name for table in tables}
+    if unknown:
+        raise ImportFormatError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+    return [table for table in tables if table.name in wanted]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_row(table: Table, row: Any) -> str:
+    record = {"table": table.name, "row": dict(row._mapping)}
+    return json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+
+
+def _line_label(line_number: int | None) -> str:
+    return f"line {line_number}: " if line_number is not None else ""
+
+
+def decode_line(line: str, tables: dict[str, Table], line_number: int | None = None) -> tuple[Table, dict[str, Any]]:
+    try:
+        record = json.loads(line)
+        table = tables[record["table"]]
+        row = record["row"]
+        if not isinstance(row, dict):
+            raise TypeError("row must be an object")
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ImportFormatError(f"{_line_label(line_number)}Invalid NDJSON record: {line[:200]!r}") from exc
+
+    values: dict[str, Any] = {}
+    for name, value in row.items():
+        if name not in table.c:
+            continue
+        try:
+            values[name] = _coerce(_python_type(table.c[name].type), value)
+        except (ValueError, TypeError, OverflowError) as exc:
+            raise ImportFormatError(f"{_line_label(line_number)}Invalid value for {table.name}.{name}: {exc}") from exc
+    return table, values
+
+
+# SQLite stores 64-bit integers; larger ones fail outside the driver's error types.
+_MAX_INTEGER = 2**63 - 1
+
+
+def _coerce(python_type: type | None, value: Any) -> Any:
+    """``value`` as JSON decoded it, converted to what the column binds; raises on a mismatch."""
+
+    if value is None or python_type is None or python_type is object:
+        return value
+    if python_type in (datetime, date):
+        if not isinstance(value, str):
+            raise TypeError(f"expected an ISO 8601 string, got {type(value).__name__}")
+        return python_type.fromisoformat(value)
+    if issubclass(python_type, Enum):
+        return python_type(value)
+    if python_type is bool:
+        if not isinstance(value, bool):
+            raise TypeError(f"expected a boolean, got {type(value).__name__}")
+        return value
+    if python_type is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise TypeError(f"expected an integer, got {type(value).__name__}")
+        if abs(value) > _MAX_INTEGER:
+            raise OverflowError(f"{value} is out of the 64-bit integer range")
+        return value
+    if python_type is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"expected a number, got {type(value).__name__}")
+        return float(value)
+    if python_type is str and not isinstance(value, str):
+        raise TypeError(f"expected a string, got {type(value).__name__}")
+    return value
+
+
+def _python_type(column_type: Any) -> type | None:
+    if isinstance(column_type, TypeDecorator):
+        column_type = column_type.impl_instance
+    try:
+        return column_type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _export_statement(table: Table, partition_size: int) -> Any:
+    return select(table).order_by(*table.primary_key.columns).execution_options(yield_per=partition_size)
+
+
+def export_ndjson(
+    session: Session,
+    tables: Iterable[Table],
+    *,
+    partition_size: int = DEFAULT_EXPORT_PARTITION_SIZE,
+) -> Iterator[str]:
+    for table in tables:
+        statement = _export_statement(table, partition_size).execution_options(stream_results=True)
+        for partition in session.exec(statement).partitions():
+            for row in partition:
+                yield encode_row(table, row)
+
+
+async def aexport_ndjson(
+    session: AsyncSession,
+    tables: Iterable[Table],
+    *,
+    partition_size: int = DEFAULT_EXPORT_PARTITION_SIZE,
+) -> AsyncIterator[str]:
+    for table in tables:
+        result = await session.stream(_export_statement(table, partition_size))
+        async for partition in result.partitions():
+            for row in partition:
+                yield encode_row(table, row)
+
+
+def _dialect_name(session: Session | AsyncSession) -> str:
+    return session.get_bind().dialect.name
+
+
+def _insert(session: Session | AsyncSession, table: Table) -> Any:
+    if _dialect_name(session) == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    # Re-importing an export (or resuming an interrupted one) skips rows whose
+    # primary key already exists instead of failing the whole batch.
+    return insert(table).on_conflict_do_nothing(index_elements=[column.name for column in table.primary_key])
+
+
+def _rejects_batch(exc: StatementError) -> bool:
+    """Whether ``exc`` is about the rows rather than the database being unavailable.
+
+    Besides constraint and data errors, covers values the driver or a column
+    type fails to bind (a plain :class:`StatementError`).
+    """
+
+    return isinstance(exc, (IntegrityError, DataError)) or not isinstance(exc, DBAPIError)
+
+
+class _Batch(NamedTuple):
+    table: Table
+    rows: list[dict[str, Any]]
+    first_line: int
+    last_line: int
+
+    def rejected(self, exc: Exception) -> ImportFormatError:
+        lines = (
+            f"line {self.first_line}"
+            if self.first_line == self.last_line
+            else f"lines {self.first_line}-{self.last_line}"
+        )
+        reason = getattr(exc, "orig", None) or exc
+        return ImportFormatError(f"{lines}: {self.table.name} rows rejected by the database: {reason}")
+
+
+class _Batcher:
+    """Groups decoded rows into per-table batches, flushed in file order."""
+
+    def __init__(self, tables: Iterable[Table], batch_size: int) -> None:
+        self.tables = {table.name: table for table in tables}
+        self.batch_size = max(batch_size, 1)
+        self.table: Table | None = None
+        self.rows: list[dict[str, Any]] = []
+        self.counts: dict[str, int] = {}
+        self.line_number = 0
+        self.first_line = 0
+
+    def add(self, line: str) -> list[_Batch]:
+        """Buffer ``line``; return the batches that are ready to be written."""
+
+        self.line_number += 1
+        if not line.strip():
+            return []
+        table, values = decode_line(line, self.tables, self.line_number)
+        ready = []
+        if self.table is not None and table is not self.table:
+            ready.extend(self.drain())
+        if not self.rows:
+            self.first_line = self.line_number
+        self.table = table
+        self.rows.append(values)
+        if len(self.rows) >= self.batch_size:
+            ready.extend(self.drain())
+        return ready
+
+    def drain(self) -> list[_Batch]:
+        if self.table is None or not self.rows:
+            return []
+        batch = _Batch(self.table, self.rows, self.first_line, self.line_number)
+        self.counts[self.table.name] = self.counts.get(self.table.name, 0) + len(self.rows)
+        self.rows = []
+        return [batch]
+
+
+def _sequence_resets(session: Session | AsyncSession, tables: Iterable[str]) -> list[Any]:
+    """Postgres only: move id sequences past the imported ids."""
+
+    if _dialect_name(session) != "postgresql":
+        return []
+    statements = []
+    for table in transfer_tables(tables):
+        if "id" in table.c and table.c.id.autoincrement:
+            statements.append(
+                select(
+                    func.setval(
+                        func.pg_get_serial_sequence(table.name, "id"),
+                        select(func.coalesce(func.max(table.c.id), 0) + 1).scalar_subquery(),
+                        False,
+                    )
+                )
+            )
+    return statements
+
+
+def import_ndjson(
+    session: Session,
+    lines: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_IMPORT_BATCH_SIZE,
+) -> dict[str, int]:
+    """Insert every record of ``lines``, committing each batch on its own.
+
+    Returns the number of records read per table; rows whose primary key
+    already exists are skipped. A batch the database rejects (missing
+    column, broken foreign key...) is rolled back and reported as an
+    :class:`ImportFormatError` naming its lines; earlier batches stay
+    committed.
+    """
+
+    batcher = _Batcher(transfer_tables(), batch_size)
+
+    def _write(batches: list[_Batch]) -> None:
+        for batch in batches:
+            try:
+                session.exec(_insert(session, batch.table), params=batch.rows)
+                session.commit()
+            except StatementError as exc:
+                session.rollback()
+                if not _rejects_batch(exc):
+                    raise
+                raise batch.rejected(exc) from exc
+
+    for line in lines:
+        _write(batcher.add(line))
+    _write(batcher.drain())
+
+    for statement in _sequence_resets(session, batcher.counts):
+        session.exec(statement)
+    session.commit()
+    return batcher.counts
+
+
+async def aimport_ndjson(
+    session: AsyncSession,
+    lines: AsyncIterable[str],
+    *,
+    batch_size: int = DEFAULT_IMPORT_BATCH_SIZE,
+) -> dict[str, int]:
+    batcher = _Batcher(transfer_tables(), batch_size)
+
+    async def _write(batches: list[_Batch]) -> None:
+        for batch in batches:
+            try:
+                await session.exec(_insert(session, batch.table), params=batch.rows)
+                await session.commit()
+            except StatementError as exc:
+                await session.rollback()
+                if not _rejects_batch(exc):
+                    raise
+                raise batch.rejected(exc) from exc
+
+    async for line in lines:
+        await _write(batcher.add(line))
+    await _write(batcher.drain())
+
+    for statement in _sequence_resets(session, batcher.counts):
+        await session.exec(statement)
+    await session.commit()
+    return batcher.counts
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering more than one line."""
+
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8")
+    if pending:
+        yield pending.decode("utf-8")
@@ -0,0 +1,141 @@
+"""Asynchronous PDF export jobs (``POST /plan/{id}/export``).
+
+A job renders in the background through the shared ``PdfRenderer`` and
+keeps its document until it expires after ``ttl_s``. Jobs live in the API
+process: a client polls the worker that accepted its job, and jobs do not
+survive a restart (the rendered PDF usually does, in the PDF cache).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any
+
+from app.core.config import settings
+from app.models import ChecklistResult
+from app.services.metrics import metrics_registry
+from app.services.pdf_render import PdfRenderer, get_pdf_renderer
+
+logger = logging.getLogger(__name__)
+
+
+class ExportJobStatus(str, Enum):
+    pending = "pending"
+    done = "done"
+    failed = "failed"
+
+
+@dataclass
+class ExportJob:
+    id: str
+    plan_id: int
+    cache_key: str
+    status: ExportJobStatus = ExportJobStatus.pending
+    pdf: bytes | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.monotonic)
+    task: asyncio.Task[None] | None = field(default=None, repr=False)
+
+
+@dataclass
+class ExportJobStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    expired: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ExportJobStore:
+    """In-process registry of export jobs, bounded by count and age."""
+
+    def __init__(self, renderer: PdfRenderer, *, max_jobs: int = 1000, ttl_s: float = 3600.0) -> None:
+        self.renderer = renderer
+        self.max_jobs = max(max_jobs, 1)
+        self.ttl_s = ttl_s
+        self.stats = ExportJobStats()
+        self._jobs: OrderedDict[str, ExportJob] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def submit(
+        self,
+        plan_id: int,
+        cache_key: str,
+        plan_json: dict[str, Any],
+        checklist_result: ChecklistResult | None,
+    ) -> ExportJob:
+        self._expire()
+        job = ExportJob(id=uuid.uuid4().hex, plan_id=plan_id, cache_key=cache_key)
+        self._jobs[job.id] = job
+        self.stats.submitted += 1
+        job.task = asyncio.get_running_loop().create_task(self._run(job, plan_json, checklist_result))
+        return job
+
+    def get(self, job_id: str) -> ExportJob | None:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: ExportJob, plan_json: dict[str, Any], checklist_result: ChecklistResult | None) -> None:
+        try:
+            job.pdf = await self.renderer.render(job.cache_key, plan_json, checklist_result)
+        except Exception as exc:  # noqa: BLE001 - reported through the job status
+            logger.warning("export_job.failed job_id=%s plan_id=%s", job.id, job.plan_id, exc_info=True)
+            job.status = ExportJobStatus.failed
+            job.error = str(exc) or type(exc).__name__
+            self.stats.failed += 1
+        else:
+            job.status = ExportJobStatus.done
+            self.stats.completed += 1
+        finally:
+            job.task = None
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl_s
+        # Oldest first: expired jobs, then the overflow beyond max_jobs.
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if job.created_at > deadline and len(self._jobs) < self.max_jobs:
+                return
+            del self._jobs[job.id]
+            if job.task is not None:
+                job.task.cancel()
+            self.stats.expired += 1
+
+    async def close(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._jobs.clear()
+
+
+_default_store: ExportJobStore | None = None
+
+
+def get_export_jobs() -> ExportJobStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = ExportJobStore(
+            get_pdf_renderer(),
+            max_jobs=settings.pdf_export_job_max_jobs,
+            ttl_s=settings.pdf_export_job_ttl_s,
+        )
+        metrics_registry.register_collector("pdf_export_jobs", _default_store.stats.as_dict)
+    return _default_store
+
+
+async def close_export_jobs() -> None:
+    global _default_store
+    if _default_store is not None:
+        await _default_store.close()
+        _default_store = None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+BATCH_ENDPOINT = "/v1/responses"
+TERMINAL_BATCH_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class BatchJobError(RuntimeError):
+    """Raised when a batch job ends without output or does not finish in time."""
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    custom_id: str
+    prompt_name: str
+    input_json: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    custom_id: str
+    output: Any = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def write_batch_jsonl(lines: Iterable[dict[str, Any]], path: Path) -> int:
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        for line in lines:
+            handle.write(json.dumps(line, ensure_ascii=False, sort_keys=True))
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def extract_output_text(body: dict[str, Any]) -> str:
+    """Concatenate the ``output_text`` parts of a raw Responses API body."""
+
+    if isinstance(body.get("output_text"), str):
+        return body["output_text"]
+    return "".join(
+        part.get("text", "")
+        for item in body.get("output") or []
+        if item.get("type") == "message"
+        for part in item.get("content") or []
+        if part.get("type") == "output_text"
+    )
+
+
+def parse_batch_output(text: str) -> Iterable[tuple[str, dict[str, Any] | None, str | None]]:
+    """Yield ``(custom_id, response_body, error)`` for each line of a batch output file."""
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id", "")
+        error = record.get("error")
+        response = record.get("response") or {}
+        if error:
+            # Normally {"code", "message"}, but a bare string or list must not
+            # abort the whole result file.
+            message = error.get("message") if isinstance(error, dict) else None
+            yield custom_id, None, message or (error if isinstance(error, str) else json.dumps(error))
+        elif response.get("status_code", 200) >= 400:
+            yield custom_id, None, f"HTTP {response.get('status_code')}: {json.dumps(response.get('body'))}"
+        else:
+            yield custom_id, response.get("body") or {}, None
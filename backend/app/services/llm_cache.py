@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+
+def make_cache_key(*, model: str, prompt_hash: str, canonical_input: str) -> str:
+    """Content-addressed key for one (model, prompt template, input) triple."""
+
+    material = "\x1f".join((model, prompt_hash, canonical_input))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ResponseCache(Protocol):
+    stats: CacheStats
+
+    def get(self, key: str) -> Any | None: ...
+
+    def set(self, key: str, value: Any) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryLRUCache:
+    """Thread-safe in-process LRU with per-entry TTL.
+
+    Values are stored as their JSON encoding so callers can never mutate a
+    cached response in place.
+    """
+
+    def __init__(self, *, max_entries: int = 1024, ttl_s: float | None = 86400.0) -> None:
+        self.max_entries = max(max_entries, 1)
+        self.ttl_s = ttl_s
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float | None, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, encoded = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            self.stats.memory_hits += 1
+        return json.loads(encoded)
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s else None
+        with self._lock:
+            self._entries[key] = (expires_at, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """On-disk cache tier backed by a standalone SQLite file.
+
+    Entries past ``ttl_s`` are treated as misses and removed lazily; once the
+    table exceeds ``max_entries`` the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str | Path, *, max_entries: int = 10000, ttl_s: float | None = 86400.0) -> None:
+        self.path = Path(path)
+        self.max_entries = max(max_entries, 1)
+        self.ttl_s = ttl_s
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " last_access REAL NOT NULL"
+            ")"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            encoded, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._connection.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+            self.stats.disk_hits += 1
+        return json.loads(encoded)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        expires_at = now + self.ttl_s if self.ttl_s else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, expires_at, now),
+            )
+            overflow = self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._connection.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class TieredCache:
+    """Memory LRU in front of an optional disk tier; disk hits are promoted."""
+
+    def __init__(self, memory: MemoryLRUCache, disk: SQLiteCache | None = None) -> None:
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self._record(memory_hit=True)
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._record(disk_hit=True)
+                return value
+
+        self._record()
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _record(self, *, memory_hit: bool = False, disk_hit: bool = False) -> None:
+        with self._lock:
+            if memory_hit or disk_hit:
+                self.stats.hits += 1
+                self.stats.memory_hits += int(memory_hit)
+                self.stats.disk_hits += int(disk_hit)
+            else:
+                self.stats.misses += 1
+            self.stats.evictions = self.memory.stats.evictions + (self.disk.stats.evictions if self.disk else 0)
+            self.stats.expirations = self.memory.stats.expirations + (
+                self.disk.stats.expirations if self.disk else 0
+            )
+
+
+def build_response_cache(
+    *,
+    enabled: bool = True,
+    max_entries: int = 1024,
+    ttl_s: float | None = 86400.0,
+    disk_path: str | None = None,
+    disk_max_entries: int = 10000,
+) -> TieredCache | None:
+    if not enabled:
+        return None
+
+    memory = MemoryLRUCache(max_entries=max_entries, ttl_s=ttl_s)
+    disk = SQLiteCache(disk_path, max_entries=disk_max_entries, ttl_s=ttl_s) if disk_path else None
+    return TieredCache(memory, disk)
@@ -1,14 +1,41 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import logging
 import os
+import tempfile
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Sequence
 
 from app.core.config import settings
+from app.services.llm_batch import (
+    BATCH_ENDPOINT,
+    TERMINAL_BATCH_STATUSES,
+    BatchJobError,
+    BatchRequest,
+    BatchResult,
+    extract_output_text,
+    parse_batch_output,
+    write_batch_jsonl,
+)
+from app.services.llm_cache import ResponseCache, build_response_cache, make_cache_key
+from app.services.llm_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    hedged,
+    is_retryable,
+    is_timeout,
+)
+from app.services.metrics import MetricsRegistry, metrics_registry
+from app.services.prompt_registry import PromptRegistry, PromptTemplate
+from app.services.prompt_registry import prompt_registry as shared_prompt_registry
+from app.services.rate_limiter import ModelRateLimiter, RateLimiterRegistry, estimate_tokens
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +47,13 @@ def _is_truthy(value: str | None) -> bool:
 
 
 class LLMClient:
-    """Small wrapper around OpenAI Responses API with retry and mock support."""
+    """Small wrapper around OpenAI Responses API with retry and mock support.
+
+    Only transient failures are retried, with jittered exponential backoff;
+    a shared circuit breaker makes calls fail fast during provider outages.
+    When ``hedge_quantile`` is set, async calls still pending after that
+    latency quantile are raced against a second identical request.
+    """
 
     def __init__(
         self,
@@ -31,6 +64,19 @@ class LLMClient:
         mock: bool | None = None,
         api_key: str | None = None,
         prompts_dir: Path | None = None,
+        prompt_registry: PromptRegistry | None = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        max_concurrency: int = 16,
+        cache: ResponseCache | None = None,
+        single_flight: bool = True,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedge_quantile: float | None = None,
+        hedge_min_samples: int = 20,
+        rate_limiter: ModelRateLimiter | None = None,
+        base_url: str | None = None,
+        metrics: MetricsRegistry | None = None,
     ) -> None:
         env_mock = _is_truthy(os.getenv("LLM_MOCK"))
         self.mock = env_mock if mock is None else mock
@@ -38,61 +84,527 @@ class LLMClient:
         self.retries = max(retries, 0)
         self.model = model
         self.api_key = api_key or settings.openai_api_key or os.getenv("OPENAI_API_KEY", "")
-        self.prompts_dir = prompts_dir or Path(__file__).resolve().parents[1] / "prompts"
+        if prompt_registry is None:
+            prompt_registry = PromptRegistry(prompts_dir) if prompts_dir else shared_prompt_registry
+        self.prompts = prompt_registry
+        self.prompts_dir = prompt_registry.prompts_dir
+        self.max_connections = max(max_connections, 1)
+        self.max_keepalive_connections = max(min(max_keepalive_connections, self.max_connections), 0)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.cache = cache
+        self.single_flight = SingleFlight() if single_flight else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.hedge_quantile = hedge_quantile
+        self.latencies = LatencyTracker(min_samples=hedge_min_samples)
+        self.rate_limiter = rate_limiter
+        self.base_url = base_url or None
+        self.metrics = metrics or metrics_registry
         self._client: Any | None = None
+        self._async_client: Any | None = None
 
         if not self.mock and not self.api_key:
             raise ValueError("OpenAI API key is required when LLM_MOCK is not enabled")
 
     def run_prompt(self, prompt_name: str, input_json: dict[str, Any]) -> Any:
-        prompt_text = self._load_prompt(prompt_name)
+        prompt = self._load_prompt(prompt_name)
+        self._log_started(prompt_name, prompt)
+
+        if self.mock:
+            return self._mock_output(prompt_name=prompt_name, input_json=input_json)
+
+        cache_key = self._cache_key(prompt, input_json)
+        cached_output = self._cache_lookup(prompt_name, cache_key)
+        if cached_output is not None:
+            return cached_output
+
+        messages = self._build_messages(prompt.text, input_json)
+
+        leader = False
+
+        def _call() -> Any:
+            nonlocal leader
+            leader = True
+            return self._call_provider(prompt_name, messages, cache_key)
+
+        if self.single_flight is None:
+            return _call()
+        try:
+            return self.single_flight.do(cache_key, _call)
+        finally:
+            if not leader:
+                self._count_request(prompt_name, "coalesced")
+
+    async def arun_prompt(self, prompt_name: str, input_json: dict[str, Any]) -> Any:
+        """Async variant of :meth:`run_prompt` sharing a pooled HTTP client."""
+
+        prompt = self._load_prompt(prompt_name)
+        self._log_started(prompt_name, prompt)
+
+        if self.mock:
+            return self._mock_output(prompt_name=prompt_name, input_json=input_json)
+
+        cache_key = self._cache_key(prompt, input_json)
+        cached_output = self._cache_lookup(prompt_name, cache_key)
+        if cached_output is not None:
+            return cached_output
+
+        messages = self._build_messages(prompt.text, input_json)
+
+        leader = False
+
+        def _call() -> Awaitable[Any]:
+            nonlocal leader
+            leader = True
+            return self._acall_provider(prompt_name, messages, cache_key)
+
+        if self.single_flight is None:
+            return await _call()
+        try:
+            return await self.single_flight.ado(cache_key, _call)
+        finally:
+            if not leader:
+                self._count_request(prompt_name, "coalesced")
+
+    async def astream_prompt(self, prompt_name: str, input_json: dict[str, Any]) -> AsyncIterator[str]:
+        """Yield output text deltas as the Responses API streams them.
+
+        A stream goes through the circuit breaker, the rate limiter and the
+        request metrics like any other call, but is not retried (partial
+        output may already have been consumed). The complete output is
+        cached once the stream ends; cache hits, mock responses and streams
+        coalesced with an identical one in flight are replayed as a single
+        chunk.
+        """
+
+        prompt = self._load_prompt(prompt_name)
+        self._log_started(prompt_name, prompt)
+
+        if self.mock:
+            yield self._as_text(self._mock_output(prompt_name=prompt_name, input_json=input_json))
+            return
+
+        cache_key = self._cache_key(prompt, input_json)
+        cached_output = self._cache_lookup(prompt_name, cache_key)
+        if cached_output is not None:
+            yield self._as_text(cached_output)
+            return
+
+        messages = self._build_messages(prompt.text, input_json)
+        deltas: asyncio.Queue[str] = asyncio.Queue()
+        leader = False
+
+        def _call() -> Awaitable[Any]:
+            nonlocal leader
+            leader = True
+            return self._astream_provider(prompt_name, messages, cache_key, deltas.put_nowait)
+
+        # The stream runs in its own task, handing its deltas over through the
+        # queue; followers of a coalesced stream only get its final output.
+        flight = asyncio.ensure_future(
+            _call() if self.single_flight is None else self.single_flight.ado(cache_key, _call)
+        )
+        getter: asyncio.Future[str] | None = None
+        try:
+            while True:
+                getter = asyncio.ensure_future(deltas.get())
+                done, _ = await asyncio.wait({getter, flight}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    break
+                yield getter.result()
+            while not deltas.empty():
+                yield deltas.get_nowait()
+            output = flight.result()
+            if not leader:
+                self._count_request(prompt_name, "coalesced")
+                yield self._as_text(output)
+        finally:
+            if getter is not None:
+                getter.cancel()
+            # Consumer gone: a stream shared with followers keeps going for them.
+            flight.cancel()
+
+    async def _astream_provider(
+        self,
+        prompt_name: str,
+        messages: list[dict[str, str]],
+        cache_key: str,
+        on_delta: Callable[[str], None],
+    ) -> Any:
+        estimated_tokens = self._estimate_tokens(messages)
+        probe = await self._aadmit(prompt_name, estimated_tokens)
+        started = time.perf_counter()
+        chunks: list[str] = []
+        completed = None
+        try:
+            stream = await self._async_openai_client().responses.create(
+                model=self.model,
+                input=messages,
+                timeout=self.timeout_s,
+                stream=True,
+            )
+            async for event in stream:
+                event_type = getattr(event, "type", None)
+                if event_type == "response.output_text.delta":
+                    chunks.append(event.delta)
+                    on_delta(event.delta)
+                elif event_type == "response.completed":
+                    # Carries the usage the limiter reconciles its estimate with.
+                    completed = getattr(event, "response", None)
+        except Exception as exc:  # noqa: BLE001 - recorded then surfaced to the consumer
+            self._record_failure(prompt_name, 0, exc)
+            self._count_request(prompt_name, "error")
+            raise
+        except BaseException:
+            if probe:
+                self.circuit_breaker.release_probe()
+            raise
+
+        finished = time.perf_counter()
+        self._record_success(prompt_name, finished - started, finished - started, completed, estimated_tokens)
+        output = self._to_json_if_possible("".join(chunks).strip())
         self._log_event(
-            "llm.request.started",
+            "llm.request.succeeded",
             prompt_name=prompt_name,
-            mock=self.mock,
-            retries=self.retries,
-            timeout_s=self.timeout_s,
+            attempt=0,
+            streamed=True,
+            duration_ms=round((finished - started) * 1000, 1),
+            output_type=type(output).__name__,
         )
+        self._cache_store(cache_key, output)
+        return output
 
-        if self.mock:
-            output = self._mock_response(prompt_name=prompt_name, input_json=input_json)
-            self._log_event("llm.request.mock_response", prompt_name=prompt_name, output=output)
-            return output
+    async def run_prompt_many(
+        self,
+        prompts: Iterable[tuple[str, dict[str, Any]]],
+        *,
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Run several prompts concurrently and return outputs in input order.
 
-        messages = [
-            {"role": "system", "content": prompt_text},
-            {"role": "user", "content": json.dumps(input_json, ensure_ascii=False, sort_keys=True)},
+        At most ``max_concurrency`` calls are in flight at once (defaults to the
+        client setting); the underlying connection pool is shared by all calls.
+        """
+
+        semaphore = asyncio.Semaphore(max(max_concurrency or self.max_concurrency, 1))
+
+        async def _bounded(prompt_name: str, input_json: dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self.arun_prompt(prompt_name, input_json)
+
+        return await asyncio.gather(
+            *(_bounded(prompt_name, input_json) for prompt_name, input_json in prompts),
+            return_exceptions=return_exceptions,
+        )
+
+    def submit_batch(
+        self,
+        requests: Sequence[BatchRequest],
+        *,
+        completion_window: str = "24h",
+        jsonl_path: Path | None = None,
+    ) -> str:
+        """Write ``requests`` to a JSONL file, upload it and start one batch job.
+
+        Returns the provider batch id. The file is kept at ``jsonl_path`` when
+        given, otherwise written to a temporary file removed after upload.
+        """
+
+        lines = [
+            {
+                "custom_id": request.custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": self.model,
+                    "input": self._build_messages(self._load_prompt(request.prompt_name).text, request.input_json),
+                },
+            }
+            for request in requests
         ]
 
+        if jsonl_path is not None:
+            write_batch_jsonl(lines, jsonl_path)
+            with jsonl_path.open("rb") as handle:
+                uploaded = self._openai_client().files.create(file=handle, purpose="batch")
+        else:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = Path(tmp_dir) / "batch_input.jsonl"
+                write_batch_jsonl(lines, path)
+                with path.open("rb") as handle:
+                    uploaded = self._openai_client().files.create(file=handle, purpose="batch")
+
+        batch = self._openai_client().batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=completion_window,
+        )
+        self._log_event("llm.batch.submitted", batch_id=batch.id, requests=len(lines), model=self.model)
+        return batch.id
+
+    def wait_for_batch(self, batch_id: str, *, poll_interval_s: float = 10.0, timeout_s: float | None = None) -> Any:
+        deadline = time.monotonic() + timeout_s if timeout_s is not None else None
+        while True:
+            batch = self._openai_client().batches.retrieve(batch_id)
+            if batch.status in TERMINAL_BATCH_STATUSES:
+                self._log_event("llm.batch.finished", batch_id=batch_id, status=batch.status)
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                raise BatchJobError(f"Batch {batch_id} still '{batch.status}' after {timeout_s}s")
+            time.sleep(poll_interval_s)
+
+    def fetch_batch_results(self, batch: Any, requests: Sequence[BatchRequest] = ()) -> dict[str, BatchResult]:
+        """Download and parse a finished batch, keyed by ``custom_id``.
+
+        Successful outputs for ``requests`` are also written to the response
+        cache so interactive calls with the same input are served from it.
+        """
+
+        if not batch.output_file_id:
+            raise BatchJobError(f"Batch {batch.id} ended with status '{batch.status}' and no output file")
+
+        content = self._openai_client().files.content(batch.output_file_id)
+        results: dict[str, BatchResult] = {}
+        for custom_id, body, error in parse_batch_output(content.text):
+            if error is not None:
+                results[custom_id] = BatchResult(custom_id=custom_id, error=error)
+            else:
+                output = self._to_json_if_possible(extract_output_text(body).strip())
+                results[custom_id] = BatchResult(custom_id=custom_id, output=output)
+
+        for request in requests:
+            result = results.get(request.custom_id)
+            if result is not None and result.ok:
+                prompt = self._load_prompt(request.prompt_name)
+                self._cache_store(self._cache_key(prompt, request.input_json), result.output)
+        return results
+
+    def run_batch(
+        self,
+        requests: Sequence[BatchRequest],
+        *,
+        poll_interval_s: float = 10.0,
+        timeout_s: float | None = None,
+    ) -> dict[str, BatchResult]:
+        """Submit, poll and collect a batch job (computed locally in mock mode)."""
+
+        if self.mock:
+            return {
+                request.custom_id: BatchResult(
+                    custom_id=request.custom_id,
+                    output=self._mock_response(prompt_name=request.prompt_name, input_json=request.input_json),
+                )
+                for request in requests
+            }
+
+        batch_id = self.submit_batch(requests)
+        batch = self.wait_for_batch(batch_id, poll_interval_s=poll_interval_s, timeout_s=timeout_s)
+        return self.fetch_batch_results(batch, requests)
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def _call_provider(self, prompt_name: str, messages: list[dict[str, str]], cache_key: str) -> Any:
+        estimated_tokens = self._estimate_tokens(messages)
+        call_started = time.perf_counter()
         for attempt in range(self.retries + 1):
+            probe = self._admit(prompt_name, estimated_tokens)
+            started = time.perf_counter()
             try:
                 response = self._openai_client().responses.create(
                     model=self.model,
                     input=messages,
                     timeout=self.timeout_s,
                 )
-                text_output = response.output_text.strip()
-                parsed_output = self._to_json_if_possible(text_output)
-                self._log_event(
-                    "llm.request.succeeded",
-                    prompt_name=prompt_name,
-                    attempt=attempt,
-                    output_type=type(parsed_output).__name__,
-                )
-                return parsed_output
-            except Exception as exc:  # noqa: BLE001 - keep retry logic generic
-                self._log_event(
-                    "llm.request.failed",
-                    prompt_name=prompt_name,
-                    attempt=attempt,
-                    error=str(exc),
-                )
-                if attempt >= self.retries:
+            except Exception as exc:  # noqa: BLE001 - classified by _should_retry
+                if not self._should_retry(prompt_name, attempt, exc):
+                    raise
+                time.sleep(self.retry_policy.delay(attempt, exc))
+                continue
+            except BaseException:
+                if probe:
+                    self.circuit_breaker.release_probe()
+                raise
+
+            finished = time.perf_counter()
+            self._record_success(
+                prompt_name, finished - started, finished - call_started, response, estimated_tokens
+            )
+            output = self._parse_response(
+                response, prompt_name=prompt_name, attempt=attempt, duration_s=finished - call_started
+            )
+            self._cache_store(cache_key, output)
+            return output
+
+        raise RuntimeError("Unexpected retry flow in LLMClient")
+
+    async def _acall_provider(self, prompt_name: str, messages: list[dict[str, str]], cache_key: str) -> Any:
+        def _start() -> Awaitable[Any]:
+            return self._async_openai_client().responses.create(
+                model=self.model,
+                input=messages,
+                timeout=self.timeout_s,
+            )
+
+        async def _start_hedge() -> Any:
+            # The duplicate request is billed like any other: it waits for its
+            # own share of the per-model budget.
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(estimated_tokens)
+            return await _start()
+
+        def _on_hedge() -> None:
+            self._log_event("llm.request.hedged", prompt_name=prompt_name)
+            self.metrics.inc("llm_hedged_total", prompt_name=prompt_name, model=self.model)
+
+        estimated_tokens = self._estimate_tokens(messages)
+        call_started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            probe = await self._aadmit(prompt_name, estimated_tokens)
+            started = time.perf_counter()
+            try:
+                response = await hedged(_start, self._hedge_delay(), _on_hedge, hedge=_start_hedge)
+            except Exception as exc:  # noqa: BLE001 - classified by _should_retry
+                if not self._should_retry(prompt_name, attempt, exc):
                     raise
-                time.sleep(0.5 * (attempt + 1))
+                await asyncio.sleep(self.retry_policy.delay(attempt, exc))
+                continue
+            except BaseException:
+                # A probe cancelled (timeout, client gone) has no verdict:
+                # without this the half-open circuit would refuse every later
+                # call.
+                if probe:
+                    self.circuit_breaker.release_probe()
+                raise
+
+            finished = time.perf_counter()
+            self._record_success(
+                prompt_name, finished - started, finished - call_started, response, estimated_tokens
+            )
+            output = self._parse_response(
+                response, prompt_name=prompt_name, attempt=attempt, duration_s=finished - call_started
+            )
+            self._cache_store(cache_key, output)
+            return output
 
         raise RuntimeError("Unexpected retry flow in LLMClient")
 
+    def _admit(self, prompt_name: str, estimated_tokens: int) -> bool:
+        """Pass the circuit breaker, then wait for the rate budget; True for the half-open probe.
+
+        The breaker goes first so that calls it refuses spend no budget.
+        """
+
+        probe = self._before_attempt(prompt_name)
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimated_tokens)
+        except BaseException:
+            # Never sent: the probe has no verdict to give.
+            if probe:
+                self.circuit_breaker.release_probe()
+            raise
+        self.metrics.inc("llm_attempts_total", prompt_name=prompt_name, model=self.model)
+        return probe
+
+    async def _aadmit(self, prompt_name: str, estimated_tokens: int) -> bool:
+        probe = self._before_attempt(prompt_name)
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(estimated_tokens)
+        except BaseException:
+            if probe:
+                self.circuit_breaker.release_probe()
+            raise
+        self.metrics.inc("llm_attempts_total", prompt_name=prompt_name, model=self.model)
+        return probe
+
+    def _before_attempt(self, prompt_name: str) -> bool:
+        try:
+            return self.circuit_breaker.before_call()
+        except CircuitOpenError:
+            self._count_request(prompt_name, "circuit_open")
+            raise
+
+    def _record_failure(self, prompt_name: str, attempt: int, exc: Exception) -> bool:
+        """Report a failed attempt to the breaker, metrics and logs; whether it is retryable."""
+
+        retryable = is_retryable(exc)
+        if retryable:
+            self.circuit_breaker.record_failure()
+        else:
+            # The provider answered: a client error says nothing about its health.
+            self.circuit_breaker.record_success()
+        if is_timeout(exc):
+            self.metrics.inc("llm_timeouts_total", prompt_name=prompt_name, model=self.model)
+        self._log_failed(prompt_name, attempt, exc, retryable=retryable)
+        return retryable
+
+    def _should_retry(self, prompt_name: str, attempt: int, exc: Exception) -> bool:
+        should_retry = self._record_failure(prompt_name, attempt, exc) and attempt < self.retries
+        if not should_retry:
+            self._count_request(prompt_name, "error")
+        return should_retry
+
+    def _record_success(
+        self,
+        prompt_name: str,
+        attempt_duration_s: float,
+        total_duration_s: float,
+        response: Any,
+        estimated_tokens: int,
+    ) -> None:
+        self.circuit_breaker.record_success()
+        self.latencies.record(attempt_duration_s)
+        usage = getattr(response, "usage", None)
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_usage(estimated_tokens, usage)
+
+        labels = {"prompt_name": prompt_name, "model": self.model}
+        self._count_request(prompt_name, "success")
+        self.metrics.observe("llm_attempt_duration_seconds", attempt_duration_s, **labels)
+        self.metrics.observe("llm_request_duration_seconds", total_duration_s, **labels)
+        self.metrics.inc("llm_input_tokens_total", int(getattr(usage, "input_tokens", 0) or 0), **labels)
+        self.metrics.inc("llm_output_tokens_total", int(getattr(usage, "output_tokens", 0) or 0), **labels)
+
+    def _count_request(self, prompt_name: str, outcome: str) -> None:
+        self.metrics.inc("llm_requests_total", prompt_name=prompt_name, model=self.model, outcome=outcome)
+
+    def stats(self) -> dict[str, Any]:
+        """Point-in-time state of the cache, coalescing, breaker and limiter."""
+
+        cache_stats = self.cache.stats.as_dict() if self.cache is not None else None
+        if cache_stats is not None:
+            lookups = cache_stats["hits"] + cache_stats["misses"]
+            cache_stats["hit_rate"] = cache_stats["hits"] / lookups if lookups else 0.0
+
+        flight_stats = self.single_flight.stats.as_dict() if self.single_flight is not None else None
+        if flight_stats is not None:
+            calls = flight_stats["leaders"] + flight_stats["coalesced"]
+            flight_stats["coalesced_rate"] = flight_stats["coalesced"] / calls if calls else 0.0
+            flight_stats["in_flight"] = self.single_flight.in_flight
+
+        return {
+            "model": self.model,
+            "mock": self.mock,
+            "cache": cache_stats,
+            "single_flight": flight_stats,
+            "circuit_breaker": self.circuit_breaker.state,
+            "rate_limiter": self.rate_limiter.budget() if self.rate_limiter is not None else None,
+        }
+
+    @staticmethod
+    def _estimate_tokens(messages: list[dict[str, str]]) -> int:
+        return sum(estimate_tokens(message["content"]) for message in messages)
+
+    def _hedge_delay(self) -> float | None:
+        if self.hedge_quantile is None:
+            return None
+        return self.latencies.quantile(self.hedge_quantile)
+
     def _openai_client(self) -> Any:
         if self._client is not None:
             return self._client
@@ -104,20 +616,94 @@ class LLMClient:
                 "Package 'openai' is required when LLM_MOCK is disabled"
             ) from exc
 
-        self._client = OpenAI(api_key=self.api_key)
+        self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
         return self._client
 
-    def _load_prompt(self, prompt_name: str) -> str:
-        filename = prompt_name if prompt_name.endswith(".md") else f"{prompt_name}.md"
-        prompt_path = self.prompts_dir / filename
+    def _async_openai_client(self) -> Any:
+        if self._async_client is not None:
+            return self._async_client
+
+        try:
+            from openai import DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient
+        except ImportError as exc:  # pragma: no cover - environment-dependent
+            raise RuntimeError(
+                "Package 'openai' is required when LLM_MOCK is disabled"
+            ) from exc
+
+        # Build the limits with the SDK's own HTTP library (httpx or its
+        # successor, depending on the openai release) rather than importing it.
+        limits_type = type(DEFAULT_CONNECTION_LIMITS)
+        http_client = DefaultAsyncHttpxClient(
+            limits=limits_type(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=DEFAULT_CONNECTION_LIMITS.keepalive_expiry,
+            ),
+            timeout=self.timeout_s,
+        )
+        self._async_client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=http_client,
+            max_retries=0,
+        )
+        return self._async_client
+
+    def _load_prompt(self, prompt_name: str) -> PromptTemplate:
+        return self.prompts.get(prompt_name)
+
+    @staticmethod
+    def _canonical_input(input_json: dict[str, Any]) -> str:
+        return json.dumps(input_json, ensure_ascii=False, sort_keys=True)
+
+    def _build_messages(self, prompt_text: str, input_json: dict[str, Any]) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": prompt_text},
+            {"role": "user", "content": self._canonical_input(input_json)},
+        ]
+
+    def _cache_key(self, prompt: PromptTemplate, input_json: dict[str, Any]) -> str:
+        return make_cache_key(
+            model=self.model,
+            prompt_hash=prompt.content_hash,
+            canonical_input=self._canonical_input(input_json),
+        )
 
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
+    def _cache_lookup(self, prompt_name: str, cache_key: str) -> Any | None:
+        if self.cache is None:
+            return None
+        cached_output = self.cache.get(cache_key)
+        result = "miss" if cached_output is None else "hit"
+        self.metrics.inc("llm_cache_lookups_total", prompt_name=prompt_name, model=self.model, result=result)
+        if cached_output is not None:
+            self._log_event("llm.request.cache_hit", prompt_name=prompt_name, cache_key=cache_key[:12])
+            self._count_request(prompt_name, "cache_hit")
+        return cached_output
 
-        return prompt_path.read_text(encoding="utf-8")
+    def _cache_store(self, cache_key: str, output: Any) -> None:
+        if self.cache is not None:
+            self.cache.set(cache_key, output)
+
+    def _parse_response(self, response: Any, *, prompt_name: str, attempt: int, duration_s: float) -> Any:
+        text_output = response.output_text.strip()
+        parsed_output = self._to_json_if_possible(text_output)
+        self._log_event(
+            "llm.request.succeeded",
+            prompt_name=prompt_name,
+            attempt=attempt,
+            duration_ms=round(duration_s * 1000, 1),
+            output_type=type(parsed_output).__name__,
+        )
+        return parsed_output
+
+    def _mock_output(self, *, prompt_name: str, input_json: dict[str, Any]) -> dict[str, Any]:
+        output = self._mock_response(prompt_name=prompt_name, input_json=input_json)
+        self._log_event("llm.request.mock_response", prompt_name=prompt_name, output=output)
+        self._count_request(prompt_name, "mock")
+        return output
 
     def _mock_response(self, *, prompt_name: str, input_json: dict[str, Any]) -> dict[str, Any]:
-        canonical_input = json.dumps(input_json, ensure_ascii=False, sort_keys=True)
+        canonical_input = self._canonical_input(input_json)
         mock_id = hashlib.sha256(f"{prompt_name}:{canonical_input}".encode("utf-8")).hexdigest()[:12]
         return {
             "mode": "mock",
@@ -127,6 +713,30 @@ class LLMClient:
             "result": f"Mock response for {prompt_name} ({mock_id})",
         }
 
+    def _log_started(self, prompt_name: str, prompt: PromptTemplate) -> None:
+        self._log_event(
+            "llm.request.started",
+            prompt_name=prompt_name,
+            prompt_version=prompt.version,
+            prompt_hash=prompt.content_hash[:12],
+            mock=self.mock,
+            retries=self.retries,
+            timeout_s=self.timeout_s,
+        )
+
+    def _log_failed(self, prompt_name: str, attempt: int, exc: Exception, *, retryable: bool | None = None) -> None:
+        self._log_event(
+            "llm.request.failed",
+            prompt_name=prompt_name,
+            attempt=attempt,
+            retryable=retryable,
+            error=str(exc),
+        )
+
+    @staticmethod
+    def _as_text(output: Any) -> str:
+        return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+
     @staticmethod
     def _to_json_if_possible(text: str) -> Any:
         if not text:
@@ -144,10 +754,16 @@ class LLMClient:
 
 _default_client: LLMClient | None = None
 
+rate_limiters = RateLimiterRegistry(
+    default_rpm=settings.llm_rate_limit_rpm,
+    default_tpm=settings.llm_rate_limit_tpm,
+    model_limits=settings.llm_model_rate_limits,
+    max_wait_s=settings.llm_rate_limit_max_wait_s,
+)
+metrics_registry.register_collector("llm_rate_limits", rate_limiters.budgets)
 
-def run_prompt(prompt_name: str, input_json: dict[str, Any]) -> Any:
-    """Run a versioned prompt and return parsed JSON output when possible."""
 
+def _get_default_client() -> LLMClient:
     global _default_client
     if _default_client is None:
         _default_client = LLMClient(
@@ -155,5 +771,64 @@ def run_prompt(prompt_name: str, input_json: dict[str, Any]) -> Any:
             retries=settings.llm_retries,
             model=settings.llm_model,
             mock=settings.llm_mock,
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            max_concurrency=settings.llm_max_concurrency,
+            cache=build_response_cache(
+                enabled=settings.llm_cache_enabled,
+                max_entries=settings.llm_cache_max_entries,
+                ttl_s=settings.llm_cache_ttl_s,
+                disk_path=settings.llm_cache_path or None,
+                disk_max_entries=settings.llm_cache_disk_max_entries,
+            ),
+            single_flight=settings.llm_single_flight_enabled,
+            retry_policy=RetryPolicy(
+                base_delay_s=settings.llm_retry_base_delay_s,
+                max_delay_s=settings.llm_retry_max_delay_s,
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=settings.llm_circuit_failure_threshold,
+                reset_timeout_s=settings.llm_circuit_reset_s,
+            ),
+            hedge_quantile=settings.llm_hedge_quantile if settings.llm_hedge_enabled else None,
+            hedge_min_samples=settings.llm_hedge_min_samples,
+            rate_limiter=rate_limiters.for_model(settings.llm_model),
+            base_url=settings.llm_base_url or None,
         )
-    return _default_client.run_prompt(prompt_name=prompt_name, input_json=input_json)
+        metrics_registry.register_collector("llm_client", _default_client.stats)
+    return _default_client
+
+
+def run_prompt(prompt_name: str, input_json: dict[str, Any]) -> Any:
+    """Run a versioned prompt and return parsed JSON output when possible."""
+
+    return _get_default_client().run_prompt(prompt_name=prompt_name, input_json=input_json)
+
+
+async def arun_prompt(prompt_name: str, input_json: dict[str, Any]) -> Any:
+    """Async variant of :func:`run_prompt` using the shared pooled client."""
+
+    return await _get_default_client().arun_prompt(prompt_name=prompt_name, input_json=input_json)
+
+
+def astream_prompt(prompt_name: str, input_json: dict[str, Any]) -> AsyncIterator[str]:
+    """Stream output text deltas of a prompt using the shared pooled client."""
+
+    return _get_default_client().astream_prompt(prompt_name=prompt_name, input_json=input_json)
+
+
+async def run_prompt_many(
+    prompts: Iterable[tuple[str, dict[str, Any]]],
+    *,
+    max_concurrency: int | None = None,
+) -> list[Any]:
+    """Fan out several prompts concurrently, preserving input order."""
+
+    return await _get_default_client().run_prompt_many(prompts, max_concurrency=max_concurrency)
+
+
+async def aclose_default_client() -> None:
+    """Release pooled connections held by the shared client, if any."""
+
+    if _default_client is not None:
+        await _default_client.aclose()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+_TRANSIENT_ERROR_NAMES = frozenset(
+    {"APITimeoutError", "APIConnectionError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError"}
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+    def __init__(self, retry_in_s: float) -> None:
+        super().__init__(f"LLM provider circuit is open; retry in {retry_in_s:.1f}s")
+        self.retry_in_s = retry_in_s
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether ``exc`` is a transient provider failure worth retrying.
+
+    HTTP errors are classified by status code (timeouts, conflicts, rate
+    limits and 5xx are retryable, other 4xx are not); errors without a status
+    are retryable only when they are timeouts or connection failures.
+    """
+
+    status_code = _status_code(exc)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def is_timeout(exc: BaseException) -> bool:
+    if _status_code(exc) == 408 or isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    return any("Timeout" in cls.__name__ for cls in type(exc).__mro__)
+
+
+def retry_after_s(exc: BaseException) -> float | None:
+    """Server-requested delay from ``Retry-After``/``retry-after-ms`` headers."""
+
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring ``Retry-After``."""
+
+    def __init__(
+        self,
+        *,
+        base_delay_s: float = 0.5,
+        max_delay_s: float = 8.0,
+        max_retry_after_s: float = 30.0,
+        rng: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self.base_delay_s = max(base_delay_s, 0.0)
+        self.max_delay_s = max(max_delay_s, self.base_delay_s)
+        self.max_retry_after_s = max_retry_after_s
+        self._rng = rng
+
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        server_delay = retry_after_s(exc) if exc is not None else None
+        if server_delay is not None:
+            return min(server_delay, self.max_retry_after_s)
+        ceiling = min(self.max_delay_s, self.base_delay_s * (2**attempt))
+        return self._rng(0.0, ceiling)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by all calls of a client.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls fail fast with :class:`CircuitOpenError`. Once
+    ``reset_timeout_s`` has elapsed a single probe call is let through
+    (half-open); its success closes the circuit, its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> bool:
+        """Raise :class:`CircuitOpenError` or admit the call; ``True`` when it is the half-open probe.
+
+        The probe must end with :meth:`record_success`, :meth:`record_failure`
+        or, if it never reached the provider, :meth:`release_probe`.
+        """
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.OPEN:
+                elapsed = self._clock() - self._opened_at
+                if elapsed < self.reset_timeout_s:
+                    raise CircuitOpenError(self.reset_timeout_s - elapsed)
+                self._state = self.HALF_OPEN
+            if self._probe_in_flight:
+                raise CircuitOpenError(0.0)
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self) -> None:
+        """Give the probe slot back without a verdict (cancelled or never sent)."""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies used to pick a hedge delay."""
+
+    def __init__(self, *, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = max(min_samples, 1)
+        self._samples: deque[float] = deque(maxlen=max(window, self.min_samples))
+        self._lock = threading.Lock()
+
+    def record(self, duration_s: float) -> None:
+        with self._lock:
+            self._samples.append(duration_s)
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(max(math.ceil(q * len(ordered)) - 1, 0), len(ordered) - 1)
+        return ordered[index]
+
+
+async def hedged(
+    start: Callable[[], Any],
+    hedge_after_s: float | None,
+    on_hedge: Callable[[], None],
+    *,
+    hedge: Callable[[], Any] | None = None,
+) -> Any:
+    """Await ``start()``; if it is still pending after ``hedge_after_s``, race a second copy.
+
+    The second copy is ``hedge()`` when given (e.g. to charge it to a rate
+    limiter), ``start()`` otherwise. The first successful result wins and the
+    loser is cancelled. If both copies fail, the last error is raised.
+    """
+
+    if hedge_after_s is None:
+        return await start()
+
+    tasks = {asyncio.ensure_future(start())}
+    last_error: BaseException | None = None
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=hedge_after_s)
+        if not done:
+            on_hedge()
+            tasks.add(asyncio.ensure_future((hedge or start)()))
+            pending = set(tasks)
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+            if not pending:
+                raise last_error or RuntimeError("Hedged LLM call finished without a result")
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,470 @@
+"""Local stand-in for the subset of the OpenAI API used by ``LLMClient``.
+
+Run it with ``python -m app.services.llm_stub_server`` and point the client
+at ``http://127.0.0.1:<port>/v1`` (``LLM_BASE_URL``). It serves
+``POST /v1/responses`` (plain and streamed) plus the Files and Batches
+endpoints. Responses echo the user message (the canonical input JSON)
+unless a custom ``responder`` is supplied; latency, failures and reported
+token counts follow the configured :class:`LatencyProfile` and
+:class:`FailureProfile` so the whole backend can be load-tested offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import email
+import email.policy
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from app.services.llm_batch import TERMINAL_BATCH_STATUSES
+from app.services.rate_limiter import estimate_tokens
+
+Responder = Callable[[dict[str, Any]], str]
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Per-request service time: ``mean_s`` shaped by ``distribution``.
+
+    ``uniform`` draws from ``[0, 2 * mean_s]``; ``lognormal`` uses ``sigma``
+    as the shape parameter while keeping the requested mean, which gives a
+    realistic long tail.
+    """
+
+    distribution: str = "fixed"
+    mean_s: float = 0.0
+    sigma: float = 0.5
+
+    def __post_init__(self) -> None:
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean_s <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            return rng.uniform(0.0, 2 * self.mean_s)
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.mean_s)
+        if self.distribution == "lognormal":
+            return rng.lognormvariate(math.log(self.mean_s) - self.sigma**2 / 2, self.sigma)
+        return self.mean_s
+
+
+@dataclass(frozen=True)
+class FailureProfile:
+    """Fraction of requests answered with an HTTP error or left hanging."""
+
+    error_rate: float = 0.0
+    status_codes: tuple[int, ...] = (429, 500, 503)
+    retry_after_s: float | None = None
+    hang_rate: float = 0.0
+    hang_s: float = 30.0
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    errors: int = 0
+    hangs: int = 0
+    status_counts: dict[int, int] = field(default_factory=dict)
+
+
+def echo_responder(body: dict[str, Any]) -> str:
+    """Return the last user message verbatim."""
+
+    messages = body.get("input") or []
+    if isinstance(messages, str):
+        return messages
+    user_messages = [message.get("content", "") for message in messages if message.get("role") == "user"]
+    return user_messages[-1] if user_messages else ""
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def _input_text(body: dict[str, Any]) -> str:
+    messages = body.get("input") or []
+    if isinstance(messages, str):
+        return messages
+    return "".join(str(message.get("content", "")) for message in messages)
+
+
+def build_response_object(body: dict[str, Any], text: str, *, output_tokens: int | None = None) -> dict[str, Any]:
+    input_tokens = estimate_tokens(_input_text(body))
+    output_tokens = output_tokens if output_tokens is not None else estimate_tokens(text)
+    return {
+        "id": _new_id("resp"),
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": body.get("model", ""),
+        "status": "completed",
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "output": [
+            {
+                "id": _new_id("msg"),
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+class LLMStubServer:
+    """Threaded HTTP server holding uploaded files and batch jobs in memory."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        responder: Responder | None = None,
+        batch_delay_s: float = 0.0,
+        latency: LatencyProfile | None = None,
+        failures: FailureProfile | None = None,
+        output_tokens: int | None = None,
+        stream_chunk_chars: int = 16,
+        seed: int | None = None,
+    ) -> None:
+        self.responder = responder or echo_responder
+        self.batch_delay_s = batch_delay_s
+        self.latency = latency or LatencyProfile()
+        self.failures = failures or FailureProfile()
+        self.output_tokens = output_tokens
+        self.stream_chunk_chars = max(stream_chunk_chars, 1)
+        self.stats = StubStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.files: dict[str, dict[str, Any]] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LLMStubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LLMStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def store_file(self, *, content: bytes, filename: str, purpose: str) -> dict[str, Any]:
+        file_object = {
+            "id": _new_id("file"),
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self.lock:
+            self.files[file_object["id"]] = {**file_object, "content": content}
+        return file_object
+
+    def plan_request(self) -> tuple[float, int | None, bool]:
+        """Draw ``(delay_s, error_status, hang)`` for one ``/v1/responses`` call."""
+
+        with self._rng_lock:
+            delay_s = self.latency.sample(self._rng)
+            roll = self._rng.random()
+            status = None
+            if roll < self.failures.error_rate and self.failures.status_codes:
+                status = self._rng.choice(self.failures.status_codes)
+            hang = status is None and self._rng.random() < self.failures.hang_rate
+
+        with self.lock:
+            self.stats.requests += 1
+            if status is not None:
+                self.stats.errors += 1
+                self.stats.status_counts[status] = self.stats.status_counts.get(status, 0) + 1
+            if hang:
+                self.stats.hangs += 1
+        return delay_s, status, hang
+
+    def create_batch(self, payload: dict[str, Any]) -> dict[str, Any] | None:
+        with self.lock:
+            if payload.get("input_file_id") not in self.files:
+                return None
+            batch = {
+                "id": _new_id("batch"),
+                "object": "batch",
+                "endpoint": payload.get("endpoint", "/v1/responses"),
+                "input_file_id": payload["input_file_id"],
+                "completion_window": payload.get("completion_window", "24h"),
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "output_file_id": None,
+                "error_file_id": None,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                "metadata": payload.get("metadata"),
+                "_ready_at": time.monotonic() + self.batch_delay_s,
+            }
+            self.batches[batch["id"]] = batch
+        return self.retrieve_batch(batch["id"])
+
+    def retrieve_batch(self, batch_id: str) -> dict[str, Any] | None:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] not in TERMINAL_BATCH_STATUSES and time.monotonic() >= batch["_ready_at"]:
+                self._complete_batch(batch)
+            return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+    def _complete_batch(self, batch: dict[str, Any]) -> None:
+        lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        outputs: list[str] = []
+        failed = 0
+        for line in filter(None, (line.strip() for line in lines)):
+            request = json.loads(line)
+            try:
+                text = self.responder(request.get("body", {}))
+                result = {
+                    "id": _new_id("batch_req"),
+                    "custom_id": request.get("custom_id"),
+                    "response": {
+                        "status_code": 200,
+                        "request_id": _new_id("req"),
+                        "body": build_response_object(
+                            request.get("body", {}), text, output_tokens=self.output_tokens
+                        ),
+                    },
+                    "error": None,
+                }
+            except Exception as exc:  # noqa: BLE001 - reported per request, like the real API
+                failed += 1
+                result = {
+                    "id": _new_id("batch_req"),
+                    "custom_id": request.get("custom_id"),
+                    "response": None,
+                    "error": {"code": "stub_error", "message": str(exc)},
+                }
+            outputs.append(json.dumps(result, ensure_ascii=False))
+
+        content = ("\n".join(outputs) + "\n").encode("utf-8")
+        output_file_id = _new_id("file")
+        self.files[output_file_id] = {
+            "id": output_file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": f"{batch['id']}_output.jsonl",
+            "purpose": "batch_output",
+            "status": "processed",
+            "content": content,
+        }
+        batch.update(
+            status="completed",
+            output_file_id=output_file_id,
+            completed_at=int(time.time()),
+            request_counts={"total": len(outputs), "completed": len(outputs) - failed, "failed": failed},
+        )
+
+
+def _make_handler(server: LLMStubServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            path = self.path.split("?", 1)[0]
+            if match := re.fullmatch(r"/v1/batches/([\w-]+)", path):
+                batch = server.retrieve_batch(match.group(1))
+                return self._send_json(batch) if batch else self._send_not_found()
+            if match := re.fullmatch(r"/v1/files/([\w-]+)/content", path):
+                with server.lock:
+                    stored = server.files.get(match.group(1))
+                if stored is None:
+                    return self._send_not_found()
+                return self._send(HTTPStatus.OK, stored["content"], "application/octet-stream")
+            return self._send_not_found()
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server naming
+            path = self.path.split("?", 1)[0]
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if path == "/v1/responses":
+                return self._handle_response(json.loads(body or b"{}"))
+            if path == "/v1/files":
+                return self._handle_file_upload(body)
+            if path == "/v1/batches":
+                batch = server.create_batch(json.loads(body or b"{}"))
+                return self._send_json(batch) if batch else self._send_not_found()
+            return self._send_not_found()
+
+        def _handle_response(self, payload: dict[str, Any]) -> None:
+            delay_s, status, hang = server.plan_request()
+            time.sleep(server.failures.hang_s if hang else delay_s)
+
+            if status is not None:
+                headers = {}
+                if server.failures.retry_after_s is not None:
+                    headers["Retry-After"] = f"{server.failures.retry_after_s:g}"
+                error = {"message": f"Stub failure {status}", "type": "server_error", "code": str(status)}
+                return self._send_json({"error": error}, HTTPStatus(status), headers)
+
+            response = build_response_object(
+                payload, server.responder(payload), output_tokens=server.output_tokens
+            )
+            if payload.get("stream"):
+                return self._stream_response(response)
+            return self._send_json(response)
+
+        def _stream_response(self, response: dict[str, Any]) -> None:
+            text = response["output"][0]["content"][0]["text"]
+            item_id = response["output"][0]["id"]
+            size = server.stream_chunk_chars
+            in_progress = {**response, "status": "in_progress", "output": [], "usage": None}
+            events: list[dict[str, Any]] = [{"type": "response.created", "response": in_progress}]
+            events += [
+                {
+                    "type": "response.output_text.delta",
+                    "item_id": item_id,
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": text[start : start + size],
+                    "logprobs": [],
+                }
+                for start in range(0, len(text), size)
+            ]
+            events.append({"type": "response.completed", "response": response})
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for sequence_number, event in enumerate(events):
+                data = json.dumps({**event, "sequence_number": sequence_number}, ensure_ascii=False)
+                self.wfile.write(f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.close_connection = True
+
+        def _handle_file_upload(self, body: bytes) -> None:
+            message = email.message_from_bytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body,
+                policy=email.policy.HTTP,
+            )
+            fields: dict[str, Any] = {}
+            filename = "upload.jsonl"
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if part.get_filename():
+                    filename = part.get_filename()
+                fields[name] = part.get_payload(decode=True)
+            content = fields.get("file") or b""
+            purpose = (fields.get("purpose") or b"batch").decode("utf-8")
+            self._send_json(server.store_file(content=content, filename=filename, purpose=purpose))
+
+        def _send_json(
+            self,
+            payload: Any,
+            status: HTTPStatus = HTTPStatus.OK,
+            headers: dict[str, str] | None = None,
+        ) -> None:
+            self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+        def _send_not_found(self) -> None:
+            self._send_json({"error": {"message": "Not found", "type": "invalid_request_error"}}, HTTPStatus.NOT_FOUND)
+
+        def _send(
+            self,
+            status: HTTPStatus,
+            payload: bytes,
+            content_type: str,
+            headers: dict[str, str] | None = None,
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server signature
+            return
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the local LLM stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--batch-delay-s", type=float, default=0.0)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-mean-ms", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, action="append", default=None)
+    parser.add_argument("--retry-after-s", type=float, default=None)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-s", type=float, default=30.0)
+    parser.add_argument("--output-tokens", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stub = LLMStubServer(
+        args.host,
+        args.port,
+        batch_delay_s=args.batch_delay_s,
+        latency=LatencyProfile(args.latency_distribution, args.latency_mean_ms / 1000, args.latency_sigma),
+        failures=FailureProfile(
+            error_rate=args.error_rate,
+            status_codes=tuple(args.error_status or FailureProfile().status_codes),
+            retry_after_s=args.retry_after_s,
+            hang_rate=args.hang_rate,
+            hang_s=args.hang_s,
+        ),
+        output_tokens=args.output_tokens,
+        seed=args.seed,
+    )
+    print(f"LLM stub server listening on {stub.url}")
+    stub.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+from typing import Any, Callable, Iterator
+
+DEFAULT_LATENCY_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+LabelSet = tuple[tuple[str, str], ...]
+
+# ``# HELP`` text of the metrics the app records; others get a generic one.
+METRIC_HELP = {
+    "llm_requests_total": "LLM calls by final outcome.",
+    "llm_attempts_total": "LLM provider attempts, retries included.",
+    "llm_timeouts_total": "LLM provider attempts that timed out.",
+    "llm_hedged_total": "Hedged copies of slow LLM calls.",
+    "llm_input_tokens_total": "Input tokens billed by the LLM provider.",
+    "llm_output_tokens_total": "Output tokens billed by the LLM provider.",
+    "llm_request_duration_seconds": "LLM call duration, retries included.",
+    "llm_attempt_duration_seconds": "Duration of the successful LLM attempt.",
+    "db_write_behind_lost_writes_total": "Early-acknowledged writes lost to a failed commit.",
+    "plan_retention_rows_deleted_total": "Rows deleted by the retention job.",
+}
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _label_set(labels: dict[str, Any]) -> LabelSet:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_S) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative = 0
+        buckets: dict[str, int] = {}
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else f"{bound:g}"] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class MetricsRegistry:
+    """Thread-safe in-process store of labelled counters and histograms.
+
+    Components with their own state (caches, limiters...) register a
+    collector callable; its output is embedded under its name in
+    :meth:`snapshot`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, LabelSet], float] = {}
+        self._histograms: dict[tuple[str, LabelSet], Histogram] = {}
+        self._collectors: dict[str, Callable[[], Any]] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = (name, _label_set(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _label_set(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def register_collector(self, name: str, collector: Callable[[], Any]) -> None:
+        with self._lock:
+            self._collectors[name] = collector
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get((name, _label_set(labels)), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.snapshot()}
+                for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0])
+            ]
+            collectors = dict(self._collectors)
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            **{name: collector() for name, collector in collectors.items()},
+        }
+
+    def render_prometheus(self) -> str:
+        """Counters, histograms and collector state in the Prometheus text exposition format.
+
+        Collector output is flattened into gauges named after the collector
+        and the path to each number (``pdf_cache_hits``); string fields
+        become labels of the numbers next to them, so each item of
+        ``llm_rate_limits`` is a sample set labelled with its model.
+        """
+
+        snapshot = self.snapshot()
+        families: dict[str, tuple[str, str, list[str]]] = {}
+
+        def _sample(name: str, kind: str, line: str, help_text: str | None = None) -> None:
+            family = families.get(name)
+            if family is None:
+                family = families[name] = (kind, help_text or METRIC_HELP.get(name, f"{name} ({kind})."), [])
+            family[2].append(line)
+
+        for counter in snapshot["counters"]:
+            name = counter["name"]
+            _sample(name, "counter", f"{name}{_labels(counter['labels'])} {counter['value']:g}")
+        for histogram in snapshot["histograms"]:
+            name, labels = histogram["name"], histogram["labels"]
+            for bound, count in histogram["buckets"].items():
+                _sample(name, "histogram", f"{name}_bucket{_labels(labels, le=bound)} {count}")
+            _sample(name, "histogram", f"{name}_sum{_labels(labels)} {histogram['sum']:g}")
+            _sample(name, "histogram", f"{name}_count{_labels(labels)} {histogram['count']}")
+        for collector, state in snapshot.items():
+            if collector in ("counters", "histograms"):
+                continue
+            for name, labels, value in _flatten(collector, state, {}):
+                _sample(name, "gauge", f"{name}{_labels(labels)} {value:g}", f"{collector} state: {name}.")
+
+        lines: list[str] = []
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name: str) -> str:
+    name = _INVALID_NAME_CHARS.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str], **extra: str) -> str:
+    merged = {**labels, **extra}
+    if not merged:
+        return ""
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in merged.items()) + "}"
+
+
+def _flatten(name: str, value: Any, labels: dict[str, str]) -> Iterator[tuple[str, dict[str, str], float]]:
+    """Numbers found in a collector's output, with the path to them as metric name."""
+
+    if isinstance(value, bool):
+        yield _metric_name(name), labels, float(value)
+    elif isinstance(value, (int, float)):
+        yield _metric_name(name), labels, value
+    elif isinstance(value, dict):
+        own = {**labels, **{_metric_name(key): item for key, item in value.items() if isinstance(item, str)}}
+        for key, item in value.items():
+            if not isinstance(item, str):
+                yield from _flatten(f"{name}_{key}", item, own)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(name, item, labels)
+
+
+metrics_registry = MetricsRegistry()
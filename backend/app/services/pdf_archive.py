@@ -0,0 +1,104 @@
+"""Streamed ZIP archive of plan PDFs.
+
+The archive is written to the response while it is being built: each PDF is
+added as soon as it is rendered (in plan order), and the bytes zipfile
+produces for it are handed out right away. Only ``concurrency`` documents are
+rendered ahead of the one being sent, so memory does not grow with the
+number of plans, while the render pool always has work queued.
+
+Entries are stored uncompressed: ReportLab already compresses its page
+streams, deflating them again would only cost CPU in the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable
+
+from app.models import ChecklistResult
+from app.services.pdf_render import PdfRenderer
+
+ZIP_MEDIA_TYPE = "application/zip"
+
+
+@dataclass(frozen=True)
+class PdfArchiveEntry:
+    filename: str
+    cache_key: str
+    plan_json: dict[str, Any]
+    checklist_result: ChecklistResult | None
+    modified_at: datetime
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object: zipfile then emits data descriptors."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(entry: PdfArchiveEntry) -> zipfile.ZipInfo:
+    # The plan timestamp rather than "now": the same plans give the same archive.
+    info = zipfile.ZipInfo(entry.filename, date_time=entry.modified_at.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    return info
+
+
+async def stream_pdf_archive(
+    renderer: PdfRenderer,
+    entries: Iterable[PdfArchiveEntry],
+    *,
+    concurrency: int = 4,
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of the PDFs of ``entries``, rendering up to ``concurrency`` at once.
+
+    A failed render aborts the stream: the client gets a truncated archive
+    instead of one silently missing a plan.
+    """
+
+    pending: deque[tuple[PdfArchiveEntry, asyncio.Task[bytes]]] = deque()
+    remaining = iter(entries)
+
+    def _schedule() -> None:
+        while len(pending) < max(concurrency, 1):
+            entry = next(remaining, None)
+            if entry is None:
+                return
+            task = asyncio.ensure_future(renderer.render(entry.cache_key, entry.plan_json, entry.checklist_result))
+            pending.append((entry, task))
+
+    sink = _ChunkSink()
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            _schedule()
+            while pending:
+                entry, task = pending.popleft()
+                pdf = await task
+                _schedule()
+                archive.writestr(_zip_info(entry), pdf)
+                del pdf
+                yield sink.drain()
+        # Closing the archive wrote the central directory.
+        yield sink.drain()
+    finally:
+        # Client gone or render failed: stop waiting for the renders ahead.
+        # Renders shared with other requests keep running for them (see
+        # SingleFlight) and still land in the cache.
+        for _, task in pending:
+            task.cancel()
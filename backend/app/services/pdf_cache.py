@@ -0,0 +1,191 @@
+"""Cache of rendered plan PDFs.
+
+An approved plan and its latest checklist result never change, so the PDF is
+addressed by a hash of ``plan_json``, the checklist result id and the
+renderer version. That key doubles as the strong ETag of the export
+endpoint: rendering is deterministic, so equal keys mean equal bytes.
+
+Documents live in a byte-bounded memory LRU; with a spill directory, the
+entries it evicts are written there (also byte-bounded, least recently read
+first out) and promoted back on the next hit. Documents rendered ahead of
+time are written there straight away (``persist=True``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.services.metrics import metrics_registry
+from app.services.pdf_export import PDF_RENDERER_VERSION
+
+
+def pdf_cache_key(plan_json: dict[str, Any], checklist_result_id: int | None) -> str:
+    canonical_plan = json.dumps(plan_json, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    material = "\x1f".join((PDF_RENDERER_VERSION, canonical_plan, str(checklist_result_id or "-")))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PdfCacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    spills: int = 0
+    disk_evictions: int = 0
+    memory_bytes: int = 0
+    disk_bytes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class PdfCache:
+    """Thread-safe memory LRU of PDFs with an optional size-bounded spill directory."""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        spill_dir: str | Path | None = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.max_bytes = max(max_bytes, 0)
+        self.disk_max_bytes = max(disk_max_bytes, 0)
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.stats = PdfCacheStats()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self.stats.disk_bytes = sum(path.stat().st_size for path in self.spill_dir.glob("*.pdf"))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                self.stats.memory_hits += 1
+                return pdf
+
+        pdf = self._read_spilled(key)
+        if pdf is None:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.disk_hits += 1
+        self.put(key, pdf)
+        return pdf
+
+    def put(self, key: str, pdf: bytes, *, persist: bool = False) -> None:
+        """Store ``pdf``; ``persist`` also writes it to the spill directory right away.
+
+        Persisted documents survive a restart and are visible to the other
+        server processes sharing the directory.
+        """
+
+        if persist:
+            self._spill(key, pdf)
+        evicted: list[tuple[str, bytes]] = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.stats.memory_bytes -= len(previous)
+            self._entries[key] = pdf
+            self.stats.memory_bytes += len(pdf)
+            while self.stats.memory_bytes > self.max_bytes and self._entries:
+                evicted_key, evicted_pdf = self._entries.popitem(last=False)
+                self.stats.memory_bytes -= len(evicted_pdf)
+                self.stats.evictions += 1
+                evicted.append((evicted_key, evicted_pdf))
+        for evicted_key, evicted_pdf in evicted:
+            self._spill(evicted_key, evicted_pdf)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.memory_bytes = 0
+        if self.spill_dir is not None:
+            with self._disk_lock:
+                for path in self.spill_dir.glob("*.pdf"):
+                    path.unlink(missing_ok=True)
+                self.stats.disk_bytes = 0
+
+    def _path(self, key: str) -> Path:
+        assert self.spill_dir is not None
+        return self.spill_dir / f"{key}.pdf"
+
+    def _read_spilled(self, key: str) -> bytes | None:
+        if self.spill_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            pdf = path.read_bytes()
+            # The file mtime is the recency used for disk eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return pdf
+
+    def _spill(self, key: str, pdf: bytes) -> None:
+        if self.spill_dir is None or len(pdf) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        with self._disk_lock:
+            if path.exists():
+                os.utime(path)
+                return
+            temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+            temporary.write_bytes(pdf)
+            # Readers never see a partially written document.
+            os.replace(temporary, path)
+            self.stats.spills += 1
+            self.stats.disk_bytes += len(pdf)
+            if self.stats.disk_bytes > self.disk_max_bytes:
+                self._evict_spilled()
+
+    def _evict_spilled(self) -> None:
+        assert self.spill_dir is not None
+        files = sorted(self.spill_dir.glob("*.pdf"), key=lambda item: item.stat().st_mtime)
+        for path in files:
+            if self.stats.disk_bytes <= self.disk_max_bytes:
+                return
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            self.stats.disk_bytes -= size
+            self.stats.disk_evictions += 1
+
+
+_default_pdf_cache: PdfCache | None = None
+
+
+def get_pdf_cache() -> PdfCache | None:
+    """Process-wide cache configured from ``PDF_CACHE_*``; ``None`` when disabled."""
+
+    global _default_pdf_cache
+    if not settings.pdf_cache_enabled:
+        return None
+    if _default_pdf_cache is None:
+        _default_pdf_cache = PdfCache(
+            max_bytes=settings.pdf_cache_max_bytes,
+            spill_dir=settings.pdf_cache_dir or None,
+            disk_max_bytes=settings.pdf_cache_disk_max_bytes,
+        )
+        metrics_registry.register_collector("pdf_cache", _default_pdf_cache.stats.as_dict)
+    return _default_pdf_cache
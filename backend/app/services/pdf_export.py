@@ -1,42 +1,104 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
+from typing import Any
 
 from app.models import ChecklistResult
 
+# Part of the PDF cache key: bump it whenever the layout below changes so
+# documents rendered by the previous version are not served again.
+PDF_RENDERER_VERSION = "1"
 
-def _as_bulleted_lines(items: list[str]) -> str:
-    if not items:
-        return "-"
-    return "<br/>".join(f"• {item}" for item in items)
+DOCUMENT_TITLE = "90-Day Career Strategy – Decision-Grade Plan"
 
 
-def generate_plan_pdf(plan_json: dict, checklist_result: ChecklistResult | None) -> bytes:
-    """Generate a decision-grade 90-day strategy PDF from plan JSON + checklist result."""
+@dataclass(frozen=True)
+class PdfRenderContext:
+    """Everything about a plan PDF that does not depend on the plan.
+
+    Built once per process by :func:`get_render_context`: the reportlab
+    imports, the paragraph styles and the page template settings are then
+    shared by every document instead of being rebuilt for each one.
+    """
+
+    paragraph: Any
+    spacer: Any
+    document_template: Any
+    template_options: dict[str, Any]
+    title_style: Any
+    heading_style: Any
+    body_style: Any
+    cm: float
 
+
+def build_render_context() -> PdfRenderContext:
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.styles import getSampleStyleSheet
     from reportlab.lib.units import cm
     from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 
-    buffer = BytesIO()
-    document = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=2 * cm,
-        leftMargin=2 * cm,
-        topMargin=1.8 * cm,
-        bottomMargin=1.8 * cm,
-        title="90-Day Career Strategy – Decision-Grade Plan",
+    styles = getSampleStyleSheet()
+    return PdfRenderContext(
+        paragraph=Paragraph,
+        spacer=Spacer,
+        document_template=SimpleDocTemplate,
+        template_options={
+            "pagesize": A4,
+            "rightMargin": 2 * cm,
+            "leftMargin": 2 * cm,
+            "topMargin": 1.8 * cm,
+            "bottomMargin": 1.8 * cm,
+            "title": DOCUMENT_TITLE,
+            # No timestamp or random document id: the same inputs always give
+            # the same bytes, which the strong ETag of the export endpoint
+            # relies on.
+            "invariant": True,
+        },
+        title_style=styles["Title"],
+        heading_style=styles["Heading2"],
+        body_style=styles["BodyText"],
+        cm=cm,
     )
 
-    styles = getSampleStyleSheet()
-    title_style = styles["Title"]
-    heading_style = styles["Heading2"]
-    body_style = styles["BodyText"]
+
+@lru_cache(maxsize=1)
+def get_render_context() -> PdfRenderContext:
+    return build_render_context()
+
+
+def warm_pdf_renderer() -> None:
+    """Pay the one-off costs (imports, font metrics, parser setup) before the first request.
+
+    Used at startup and as the initializer of the render worker processes.
+    """
+
+    generate_plan_pdf({}, None)
+
+
+def _as_bulleted_lines(items: list[str]) -> str:
+    if not items:
+        return "-"
+    return "<br/>".join(f"• {item}" for item in items)
+
+
+def generate_plan_pdf(
+    plan_json: dict,
+    checklist_result: ChecklistResult | None,
+    context: PdfRenderContext | None = None,
+) -> bytes:
+    """Generate a decision-grade 90-day strategy PDF from plan JSON + checklist result."""
+
+    context = context or get_render_context()
+    Paragraph, Spacer, cm = context.paragraph, context.spacer, context.cm
+    heading_style, body_style = context.heading_style, context.body_style
+
+    buffer = BytesIO()
+    document = context.document_template(buffer, **context.template_options)
 
     story: list = [
-        Paragraph("90-Day Career Strategy – Decision-Grade Plan", title_style),
+        Paragraph(DOCUMENT_TITLE, context.title_style),
         Spacer(1, 0.35 * cm),
         Paragraph(f"<b>Objective:</b> {plan_json.get('objective', '-')}", body_style),
         Spacer(1, 0.35 * cm),
@@ -0,0 +1,203 @@
+"""Plan PDF rendering outside the API process.
+
+ReportLab lays a document out in pure Python and holds the GIL the whole
+time: rendered in a thread, it still stalls every other request of the
+worker. Renders therefore run in a bounded ``ProcessPoolExecutor``
+(``PDF_RENDER_PROCESSES`` workers, ``0`` falls back to a thread). Concurrent
+requests for the same document share one render, and results go through the
+PDF cache.
+
+Approved plans are also rendered ahead of time (:meth:`PdfRenderer.prerender`):
+a download that arrives while that render is still running waits for it
+instead of starting another one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.models import ChecklistResult
+from app.services.metrics import MetricsRegistry, metrics_registry
+from app.services.pdf_cache import PdfCache, get_pdf_cache
+from app.services.pdf_export import generate_plan_pdf, warm_pdf_renderer
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _render_document(plan_json: dict[str, Any], checklist_values: dict[str, Any] | None) -> bytes:
+    """Worker entry point: arguments cross the process boundary as plain data."""
+
+    checklist_result = ChecklistResult(**checklist_values) if checklist_values is not None else None
+    return generate_plan_pdf(plan_json, checklist_result)
+
+
+@dataclass
+class PdfRenderStats:
+    renders: int = 0
+    prerenders: int = 0
+    cache_hits: int = 0
+    failures: int = 0
+    in_flight: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class PdfRenderer:
+    def __init__(
+        self,
+        *,
+        processes: int = 2,
+        cache: PdfCache | None = None,
+        metrics: MetricsRegistry = metrics_registry,
+    ) -> None:
+        self.processes = max(processes, 0)
+        self.cache = cache
+        self.metrics = metrics
+        self.single_flight = SingleFlight()
+        self.stats = PdfRenderStats()
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._background: set[asyncio.Task[None]] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        if self.processes == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the event loop, the database
+                # pools or the threads of the API process.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_pdf_renderer,
+                )
+            return self._executor
+
+    def warm(self) -> None:
+        """Start the workers (or warm this process) so the first export does not pay for it."""
+
+        executor = self._get_executor()
+        if executor is None:
+            warm_pdf_renderer()
+            return
+        # One task per worker makes the pool spawn all of them now; each runs
+        # warm_pdf_renderer as its initializer.
+        for _ in range(self.processes):
+            executor.submit(os.getpid)
+
+    async def render(
+        self,
+        cache_key: str,
+        plan_json: dict[str, Any],
+        checklist_result: ChecklistResult | None,
+        *,
+        persist: bool = False,
+    ) -> bytes:
+        """The PDF of ``cache_key`` (see ``pdf_cache_key``), from the cache or a worker."""
+
+        if self.cache is not None:
+            pdf = self.cache.get(cache_key)
+            if pdf is not None:
+                self.stats.cache_hits += 1
+                return pdf
+
+        checklist_values = checklist_result.model_dump() if checklist_result is not None else None
+
+        async def _render() -> bytes:
+            self.stats.in_flight += 1
+            started = time.perf_counter()
+            try:
+                executor = self._get_executor()
+                if executor is None:
+                    pdf = await asyncio.to_thread(_render_document, plan_json, checklist_values)
+                else:
+                    loop = asyncio.get_running_loop()
+                    pdf = await loop.run_in_executor(executor, _render_document, plan_json, checklist_values)
+            except BrokenProcessPool:
+                # A worker died (OOM...): start a fresh pool for the next render.
+                logger.error("pdf_render.pool_broken", exc_info=True)
+                self._reset_executor()
+                self.stats.failures += 1
+                raise
+            except Exception:
+                self.stats.failures += 1
+                raise
+            finally:
+                self.stats.in_flight -= 1
+            self.stats.renders += 1
+            self.metrics.observe("pdf_render_duration_seconds", time.perf_counter() - started)
+            if self.cache is not None:
+                self.cache.put(cache_key, pdf, persist=persist)
+            return pdf
+
+        return await self.single_flight.ado(cache_key, _render)
+
+    def prerender(
+        self,
+        cache_key: str,
+        plan_json: dict[str, Any],
+        checklist_result: ChecklistResult | None,
+    ) -> asyncio.Task[None] | None:
+        """Render into the cache in the background; ``None`` when there is no cache to fill."""
+
+        if self.cache is None:
+            return None
+        task = asyncio.get_running_loop().create_task(self._prerender(cache_key, plan_json, checklist_result))
+        # The loop only keeps weak references to tasks.
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _prerender(
+        self,
+        cache_key: str,
+        plan_json: dict[str, Any],
+        checklist_result: ChecklistResult | None,
+    ) -> None:
+        try:
+            await self.render(cache_key, plan_json, checklist_result, persist=True)
+        except Exception:  # noqa: BLE001 - the download renders on demand instead
+            logger.warning("pdf_render.prerender_failed cache_key=%s", cache_key, exc_info=True)
+            return
+        self.stats.prerenders += 1
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        self._reset_executor()
+
+
+_default_renderer: PdfRenderer | None = None
+
+
+def get_pdf_renderer() -> PdfRenderer:
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = PdfRenderer(processes=settings.pdf_render_processes, cache=get_pdf_cache())
+        metrics_registry.register_collector("pdf_render", _default_renderer.stats.as_dict)
+    return _default_renderer
+
+
+def close_pdf_renderer() -> None:
+    global _default_renderer
+    if _default_renderer is not None:
+        _default_renderer.close()
+        _default_renderer = None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlmodel import Session
+
+from app.models import Plan90Days, PlanStatus
+from app.services.llm_batch import BatchRequest, BatchResult
+
+PLAN_CUSTOM_ID_PREFIX = "plan-"
+
+# An approved plan is what the user signed off and downloads as a PDF: its
+# plan_json is frozen and never regenerated.
+REGENERABLE_STATUSES = frozenset({PlanStatus.draft, PlanStatus.rejected})
+
+
+def plan_custom_id(plan_id: int) -> str:
+    return f"{PLAN_CUSTOM_ID_PREFIX}{plan_id}"
+
+
+def build_plan_batch_requests(plans: Iterable[Plan90Days], prompt_name: str) -> list[BatchRequest]:
+    """One batch request per regenerable plan, carrying the stored `plan_json` as input."""
+
+    return [
+        BatchRequest(custom_id=plan_custom_id(plan.id), prompt_name=prompt_name, input_json=plan.plan_json)
+        for plan in plans
+        if plan.id is not None and plan.status in REGENERABLE_STATUSES
+    ]
+
+
+def apply_plan_batch_results(session: Session, results: dict[str, BatchResult]) -> dict[str, int]:
+    """Write successful batch outputs back to their `Plan90Days` rows.
+
+    Only JSON object outputs replace `plan_json`; failed items, outputs of
+    any other shape and plans approved while the batch ran leave the row
+    untouched. Returns per-outcome counts.
+    """
+
+    counts = {"updated": 0, "failed": 0, "skipped": 0}
+    for custom_id, result in results.items():
+        if not custom_id.startswith(PLAN_CUSTOM_ID_PREFIX):
+            counts["skipped"] += 1
+            continue
+        if not result.ok:
+            counts["failed"] += 1
+            continue
+
+        plan = session.get(Plan90Days, int(custom_id[len(PLAN_CUSTOM_ID_PREFIX) :]))
+        if plan is None or plan.status not in REGENERABLE_STATUSES or not isinstance(result.output, dict):
+            counts["skipped"] += 1
+            continue
+
+        plan.plan_json = result.output
+        session.add(plan)
+        counts["updated"] += 1
+
+    session.commit()
+    return counts
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import settings
+
+DEFAULT_PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
+
+_VERSION_PATTERN = re.compile(r"^\s*<!--\s*version:\s*(?P<version>[^\s>]+)\s*-->\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    text: str
+    content_hash: str
+    version: str
+    path: Path
+    mtime_ns: int
+
+
+def _prompt_name(prompt_name: str) -> str:
+    return prompt_name[: -len(".md")] if prompt_name.endswith(".md") else prompt_name
+
+
+def _read_template(path: Path) -> PromptTemplate:
+    text = path.read_text(encoding="utf-8")
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    version_match = _VERSION_PATTERN.search(text)
+    return PromptTemplate(
+        name=_prompt_name(path.name),
+        text=text,
+        content_hash=content_hash,
+        version=version_match.group("version") if version_match else content_hash[:12],
+        path=path,
+        mtime_ns=path.stat().st_mtime_ns,
+    )
+
+
+class PromptRegistry:
+    """In-memory store of the versioned prompt templates in ``prompts_dir``.
+
+    Templates are read once by :meth:`load`; lookups then never touch the
+    filesystem unless ``hot_reload`` is enabled, in which case the file's
+    mtime is checked on each lookup and the template re-read when it moved.
+    A template may pin its version with an ``<!-- version: x -->`` line;
+    otherwise the version is the short content hash.
+    """
+
+    def __init__(self, prompts_dir: Path | None = None, *, hot_reload: bool = False) -> None:
+        self.prompts_dir = prompts_dir or DEFAULT_PROMPTS_DIR
+        self.hot_reload = hot_reload
+        self._templates: dict[str, PromptTemplate] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, PromptTemplate]:
+        templates = {
+            template.name: template
+            for template in (_read_template(path) for path in sorted(self.prompts_dir.glob("*.md")))
+        }
+        with self._lock:
+            self._templates = templates
+            self._loaded = True
+        return dict(templates)
+
+    def get(self, prompt_name: str) -> PromptTemplate:
+        if not self._loaded:
+            self.load()
+
+        name = _prompt_name(prompt_name)
+        template = self._templates.get(name)
+
+        if self.hot_reload:
+            template = self._refresh(name, template)
+
+        if template is None:
+            raise FileNotFoundError(f"Prompt file not found: {self.prompts_dir / f'{name}.md'}")
+        return template
+
+    def _refresh(self, name: str, template: PromptTemplate | None) -> PromptTemplate | None:
+        path = self.prompts_dir / f"{name}.md"
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            with self._lock:
+                self._templates.pop(name, None)
+            return None
+
+        if template is not None and template.mtime_ns == mtime_ns:
+            return template
+
+        refreshed = _read_template(path)
+        with self._lock:
+            self._templates[name] = refreshed
+        return refreshed
+
+
+prompt_registry = PromptRegistry(hot_reload=settings.llm_prompts_hot_reload)
+
+
+def load_prompts() -> dict[str, PromptTemplate]:
+    """Preload every template of the shared registry (called at startup)."""
+
+    return prompt_registry.load()
+
+
+def get_prompt(prompt_name: str) -> PromptTemplate:
+    return prompt_registry.get(prompt_name)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+CHARS_PER_TOKEN = 4
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a call would have to queue longer than ``max_wait_s``."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap prompt-size estimate (~4 characters per token), never below 1."""
+
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+@dataclass
+class RateLimiterStats:
+    requests: int = 0
+    throttled: int = 0
+    wait_s: float = 0.0
+    estimated_tokens: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+class _Bucket:
+    """Continuously refilled bucket whose level may go negative.
+
+    A negative level is debt owed by queued callers: each reservation pushes
+    the level further down, so its wait (debt / refill rate) is strictly
+    after every earlier reservation, which makes queueing first-come,
+    first-served across threads and event loops alike.
+    """
+
+    def __init__(self, per_minute: int, now: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate_per_s = per_minute / 60.0
+        self.level = self.capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate_per_s)
+        self.updated_at = now
+
+    def wait_for(self, amount: float) -> float:
+        shortfall = amount - self.level
+        return shortfall / self.rate_per_s if shortfall > 0 else 0.0
+
+
+class ModelRateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter for one model.
+
+    Callers reserve one request plus their estimated prompt tokens, then
+    sleep until the reservation is covered. Once the provider reports real
+    usage, :meth:`record_usage` charges (or refunds) the difference with the
+    estimate so the token bucket tracks actual consumption.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_wait_s: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.model = model
+        self.requests_per_minute = max(requests_per_minute, 0)
+        self.tokens_per_minute = max(tokens_per_minute, 0)
+        self.max_wait_s = max_wait_s
+        self.stats = RateLimiterStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        now = clock()
+        self._requests = _Bucket(self.requests_per_minute, now) if self.requests_per_minute else None
+        self._tokens = _Bucket(self.tokens_per_minute, now) if self.tokens_per_minute else None
+        self._request_times: deque[float] = deque()
+        self._token_window: deque[tuple[float, int]] = deque()
+
+    def acquire(self, estimated_tokens: int) -> None:
+        wait_s = self._reserve(estimated_tokens)
+        if wait_s > 0:
+            time.sleep(wait_s)
+
+    async def aacquire(self, estimated_tokens: int) -> None:
+        wait_s = self._reserve(estimated_tokens)
+        if wait_s > 0:
+            await asyncio.sleep(wait_s)
+
+    def record_usage(self, estimated_tokens: int, usage: Any) -> None:
+        input_tokens = int(getattr(usage, "input_tokens", 0) or 0)
+        output_tokens = int(getattr(usage, "output_tokens", 0) or 0)
+        actual_tokens = input_tokens + output_tokens
+        with self._lock:
+            self.stats.input_tokens += input_tokens
+            self.stats.output_tokens += output_tokens
+            if not actual_tokens:
+                return
+            correction = actual_tokens - estimated_tokens
+            if self._tokens is not None:
+                self._tokens.refill(self._clock())
+                self._tokens.level -= correction
+            self._token_window.append((self._clock(), correction))
+
+    def budget(self) -> dict[str, Any]:
+        """Current limits, remaining capacity and usage over the last minute."""
+
+        with self._lock:
+            now = self._clock()
+            self._trim_window(now)
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.refill(now)
+            return {
+                "model": self.model,
+                "requests_per_minute": self.requests_per_minute or None,
+                "tokens_per_minute": self.tokens_per_minute or None,
+                "requests_available": max(self._requests.level, 0.0) if self._requests else None,
+                "tokens_available": max(self._tokens.level, 0.0) if self._tokens else None,
+                "requests_last_minute": len(self._request_times),
+                "tokens_last_minute": max(sum(tokens for _, tokens in self._token_window), 0),
+                **self.stats.as_dict(),
+            }
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        with self._lock:
+            now = self._clock()
+            wait_s = 0.0
+            for bucket, amount in ((self._requests, 1), (self._tokens, estimated_tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait_s = max(wait_s, bucket.wait_for(amount))
+
+            if self.max_wait_s is not None and wait_s > self.max_wait_s:
+                raise RateLimitExceeded(
+                    f"Rate limit for {self.model} would require waiting {wait_s:.1f}s"
+                )
+
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= estimated_tokens
+            self._request_times.append(now)
+            self._token_window.append((now, estimated_tokens))
+            self._trim_window(now)
+
+            self.stats.requests += 1
+            self.stats.estimated_tokens += estimated_tokens
+            if wait_s > 0:
+                self.stats.throttled += 1
+                self.stats.wait_s += wait_s
+            return wait_s
+
+    def _trim_window(self, now: float) -> None:
+        horizon = now - 60.0
+        while self._request_times and self._request_times[0] <= horizon:
+            self._request_times.popleft()
+        while self._token_window and self._token_window[0][0] <= horizon:
+            self._token_window.popleft()
+
+
+class RateLimiterRegistry:
+    """Process-wide limiters keyed by model, so every client shares one budget."""
+
+    def __init__(
+        self,
+        *,
+        default_rpm: int = 0,
+        default_tpm: int = 0,
+        model_limits: dict[str, dict[str, int]] | None = None,
+        max_wait_s: float | None = None,
+    ) -> None:
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.model_limits = model_limits or {}
+        self.max_wait_s = max_wait_s
+        self._limiters: dict[str, ModelRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model: str) -> ModelRateLimiter | None:
+        limits = self.model_limits.get(model, {})
+        rpm = limits.get("rpm", self.default_rpm)
+        tpm = limits.get("tpm", self.default_tpm)
+        if not rpm and not tpm:
+            return None
+
+        with self._lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limiter = ModelRateLimiter(
+                    model,
+                    requests_per_minute=rpm,
+                    tokens_per_minute=tpm,
+                    max_wait_s=self.max_wait_s,
+                )
+                self._limiters[model] = limiter
+            return limiter
+
+    def budgets(self) -> list[dict[str, Any]]:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return [limiter.budget() for limiter in limiters]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class _LeaderGone(Exception):
+    """Published instead of a leader's cancellation: followers elect a new leader."""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key into one execution.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight (followers) wait for the leader's outcome instead
+    of starting their own. Leaders and followers may be plain threads or
+    asyncio tasks on any event loop: the outcome is published through a
+    ``concurrent.futures.Future``. Followers receive a deep copy of the
+    leader's result, or the same exception if the leader failed.
+
+    Cancelling one caller never cancels the others: an async leader runs the
+    work in its own task, which keeps going (and publishes its outcome) when
+    the leader is cancelled. Work that ends without an outcome (its task
+    cancelled, a thread leader interrupted) makes the followers retry, one
+    of them becoming the new leader.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        while True:
+            future, is_leader = self._join(key)
+            if is_leader:
+                break
+            try:
+                return copy.deepcopy(future.result())
+            except _LeaderGone:
+                continue
+
+        try:
+            result = fn()
+        except Exception as exc:
+            self._publish(key, future, exception=exc)
+            raise
+        except BaseException:
+            self._publish(key, future, exception=_LeaderGone())
+            raise
+        self._publish(key, future, result=result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future, is_leader = self._join(key)
+            if is_leader:
+                break
+            try:
+                return copy.deepcopy(await asyncio.wrap_future(future))
+            except _LeaderGone:
+                continue
+
+        task = asyncio.ensure_future(fn())
+        task.add_done_callback(lambda done: self._publish_task(key, future, done))
+        return await asyncio.shield(task)
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return future, False
+            future = Future()
+            # A running future cannot be cancelled: a follower cancelled while
+            # waiting (asyncio.wrap_future propagates it) leaves it intact.
+            future.set_running_or_notify_cancel()
+            self._in_flight[key] = future
+            self.stats.leaders += 1
+            return future, True
+
+    def _publish_task(self, key: str, future: Future, task: asyncio.Future) -> None:
+        if task.cancelled():
+            self._publish(key, future, exception=_LeaderGone())
+        elif task.exception() is not None:
+            self._publish(key, future, exception=task.exception())
+        else:
+            self._publish(key, future, result=task.result())
+
+    def _publish(
+        self,
+        key: str,
+        future: Future,
+        *,
+        result: Any = None,
+        exception: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
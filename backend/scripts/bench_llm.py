@@ -0,0 +1,112 @@
+"""Measure LLMClient throughput and tail latency against the local stand-in server."""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.llm_client import LLMClient
+from app.services.llm_stub_server import LATENCY_DISTRIBUTIONS, FailureProfile, LatencyProfile, LLMStubServer
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def _request(client: LLMClient, index: int, stream: bool) -> None:
+    input_json = {"bench_request": index}
+    if stream:
+        async for _ in client.astream_prompt("system_prompt", input_json):
+            pass
+    else:
+        await client.arun_prompt("system_prompt", input_json)
+
+
+async def _run(client: LLMClient, requests: int, stream: bool = False) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+
+    async def _timed(index: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            await _request(client, index, stream)
+        except Exception:  # noqa: BLE001 - counted, not raised, during a benchmark
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - started)
+
+    semaphore = asyncio.Semaphore(client.max_concurrency)
+
+    async def _bounded(index: int) -> None:
+        async with semaphore:
+            await _timed(index)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_bounded(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    return latencies, errors, elapsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--timeout-s", type=float, default=20.0)
+    parser.add_argument("--base-url", default=None, help="Use an already running server instead of an embedded one.")
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-mean-ms", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", action="store_true", help="Consume streamed responses (astream_prompt).")
+    args = parser.parse_args(argv)
+
+    stub = None
+    base_url = args.base_url
+    if base_url is None:
+        stub = LLMStubServer(
+            latency=LatencyProfile(args.latency_distribution, args.latency_mean_ms / 1000),
+            failures=FailureProfile(error_rate=args.error_rate, retry_after_s=0),
+            seed=args.seed,
+        ).start()
+        base_url = stub.url
+
+    client = LLMClient(
+        api_key="bench",
+        mock=False,
+        base_url=base_url,
+        retries=args.retries,
+        timeout_s=args.timeout_s,
+        max_concurrency=args.concurrency,
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+        single_flight=False,
+    )
+    try:
+        latencies, errors, elapsed = asyncio.run(_run(client, args.requests, args.stream))
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} errors={errors} elapsed={elapsed:.2f}s")
+    if not latencies:
+        print("every request failed: no throughput or latency to report")
+        return 1
+    # Failed requests return early (errors, circuit open): only successes count.
+    print(f"throughput={len(latencies) / elapsed:.1f} successful req/s")
+    print(
+        "latency_ms "
+        f"mean={statistics.mean(latencies) * 1000:.1f} "
+        f"p50={_percentile(latencies, 0.50) * 1000:.1f} "
+        f"p95={_percentile(latencies, 0.95) * 1000:.1f} "
+        f"p99={_percentile(latencies, 0.99) * 1000:.1f} "
+        f"max={max(latencies) * 1000:.1f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
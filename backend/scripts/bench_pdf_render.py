@@ -0,0 +1,95 @@
+"""Micro-benchmark of plan PDF rendering: fixed per-document costs before and after the shared render context.
+
+"before" rebuilds the render context (reportlab imports, sample style sheet,
+page template settings) for every document, as the renderer used to;
+"after" reuses the per-process context. The first render of a fresh process
+is also measured with and without ``warm_pdf_renderer`` having run at
+startup, each in its own interpreter.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from app.models import ChecklistResult
+from app.services.pdf_export import build_render_context, generate_plan_pdf, get_render_context, warm_pdf_renderer
+
+PLAN = {
+    "objective": "Décrocher un poste de data analyst en 90 jours",
+    "monthly_objectives": [
+        {"month": 1, "objective": "Positionnement", "deliverables": ["CV ciblé", "Portfolio de 2 projets"]},
+        {"month": 2, "objective": "Prospection", "deliverables": ["20 candidatures", "10 prises de contact"]},
+        {"month": 3, "objective": "Entretiens", "deliverables": ["3 simulations", "Négociation de l'offre"]},
+    ],
+    "kpis": ["5 entretiens obtenus", "1 offre signée"],
+    "risks": ["Manque de temps", "Marché tendu"],
+}
+CHECKLIST = ChecklistResult(
+    id=1,
+    plan_id=1,
+    clarity=True,
+    focus=True,
+    actionability=True,
+    feasibility=True,
+    risk_awareness=True,
+    coherence=True,
+    verdict="approved",
+    feedback="Plan clair et actionnable.",
+)
+
+
+def _time_ms(render) -> float:
+    started = time.perf_counter()
+    render()
+    return (time.perf_counter() - started) * 1000
+
+
+def _summary(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+    return f"median {statistics.median(ordered):7.3f} ms   p95 {p95:7.3f} ms"
+
+
+def _first_render_ms(warmed: bool) -> float:
+    output = subprocess.run(
+        [sys.executable, __file__, "--first-render", "warmed" if warmed else "cold"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--first-render", choices=["cold", "warmed"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.first_render:
+        if args.first_render == "warmed":
+            warm_pdf_renderer()
+        print(_time_ms(lambda: generate_plan_pdf(PLAN, CHECKLIST)))
+        return
+
+    warm_pdf_renderer()
+    get_render_context()
+    # Interleave both variants so drift (CPU frequency, GC) hits them equally.
+    before: list[float] = []
+    after: list[float] = []
+    for _ in range(args.documents):
+        before.append(_time_ms(lambda: generate_plan_pdf(PLAN, CHECKLIST, build_render_context())))
+        after.append(_time_ms(lambda: generate_plan_pdf(PLAN, CHECKLIST)))
+
+    print(f"per document, {args.documents} documents")
+    print(f"  before (context per document)  {_summary(before)}")
+    print(f"  after  (shared context)        {_summary(after)}")
+    print("first document of a fresh process")
+    print(f"  cold                           {_first_render_ms(warmed=False):7.3f} ms")
+    print(f"  after warm_pdf_renderer()      {_first_render_ms(warmed=True):7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Compare query plans and latency of the hot lookups before and after the index migrations.
+
+A throwaway SQLite database is built with the pre-migration schema (single
+column indexes only) and populated, then both lookups are explained and
+timed, the migrations are applied online and the measurement is repeated.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, select
+
+from app.db.migrations import MIGRATIONS, run_migrations
+from app.db.session import build_engine
+from app.models import ChecklistResult, Plan90Days, PlanStatus, User
+
+_LEGACY_INDEXES = {
+    "ix_plan90days_user_id": "plan90days (user_id)",
+    "ix_checklistresult_plan_id": "checklistresult (plan_id)",
+}
+
+
+def _latest_draft(user_id: int):
+    return (
+        select(Plan90Days)
+        .where(Plan90Days.user_id == user_id)
+        .where(Plan90Days.status == PlanStatus.draft)
+        .order_by(Plan90Days.created_at.desc())
+        .limit(1)
+    )
+
+
+def _latest_checklist(plan_id: int):
+    return (
+        select(ChecklistResult)
+        .where(ChecklistResult.plan_id == plan_id)
+        .order_by(ChecklistResult.created_at.desc(), ChecklistResult.id.desc())
+        .limit(1)
+    )
+
+
+def _build_legacy_schema(engine: Engine) -> None:
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for migration in MIGRATIONS:
+            for index in migration.create_indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        for name, target in _LEGACY_INDEXES.items():
+            connection.execute(text(f"CREATE INDEX {name} ON {target}"))
+
+
+def _populate(engine: Engine, users: int, plans_per_user: int, checklists_per_plan: int, seed: int) -> None:
+    rng = random.Random(seed)
+    started_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    statuses = [PlanStatus.draft.name, PlanStatus.approved.name, PlanStatus.rejected.name]
+    plan_json = {"objective": "bench", "monthly_objectives": [], "kpis": [], "risks": []}
+
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": user_id} for user_id in range(1, users + 1)])
+        plans = [
+            {
+                "user_id": rng.randint(1, users),
+                "status": rng.choice(statuses),
+                "plan_json": plan_json,
+                "created_at": started_at + timedelta(minutes=index),
+            }
+            for index in range(users * plans_per_user)
+        ]
+        connection.execute(insert(Plan90Days), plans)
+        checklists = [
+            {
+                "plan_id": rng.randint(1, len(plans)),
+                "verdict": "approved",
+                "feedback": "bench",
+                "created_at": started_at + timedelta(minutes=index),
+            }
+            for index in range(len(plans) * checklists_per_plan)
+        ]
+        connection.execute(insert(ChecklistResult), checklists)
+
+
+def _measure(engine: Engine, label: str, users: int, plans: int, repeat: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"\n== {label}")
+    with engine.connect() as connection:
+        lookups = (("latest draft plan (/bets)", _latest_draft), ("latest checklist (PDF export)", _latest_checklist))
+        for name, build in lookups:
+            statement = build(1).compile(engine, compile_kwargs={"literal_binds": True})
+            plan_rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}").all()
+            upper = users if build is _latest_draft else plans
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.execute(build(rng.randint(1, upper))).first()
+                timings.append((time.perf_counter() - started) * 1000)
+            p95 = sorted(timings)[int(0.95 * len(timings))]
+            print(f"{name}: median {statistics.median(timings):.3f} ms, p95 {p95:.3f} ms")
+            for row in plan_rows:
+                print(f"    {row[-1]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--plans-per-user", type=int, default=5000)
+    parser.add_argument("--checklists-per-plan", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{Path(directory) / 'bench.db'}")
+        _build_legacy_schema(engine)
+        _populate(engine, args.users, args.plans_per_user, args.checklists_per_plan, args.seed)
+        plans = args.users * args.plans_per_user
+        print(f"{plans} plans, {plans * args.checklists_per_plan} checklist results")
+
+        _measure(engine, "before migrations", args.users, plans, args.repeat, args.seed)
+        started = time.perf_counter()
+        applied = run_migrations(engine)
+        print(f"\napplied migrations {applied} in {time.perf_counter() - started:.2f}s")
+        _measure(engine, "after migrations", args.users, plans, args.repeat, args.seed)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
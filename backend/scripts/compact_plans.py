@@ -0,0 +1,55 @@
+"""Apply the draft/rejected plan retention policy once (see DB_RETENTION_*).
+
+Options override the environment for this run only. Suitable for cron when
+the in-process job (DB_RETENTION_INTERVAL_S) is disabled.
+"""
+
+import argparse
+from dataclasses import replace
+
+from app.db import engine
+from app.db.retention import RetentionPolicy, compact_plans
+
+
+def _enable_incremental_vacuum() -> None:
+    """Switch an existing SQLite database to auto_vacuum=incremental (one full VACUUM)."""
+
+    if engine.dialect.name != "sqlite":
+        print("Only needed on SQLite; skipped.")
+        return
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum=incremental")
+        connection.exec_driver_sql("VACUUM")
+    print("auto_vacuum=incremental enabled.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keep-drafts", type=int, help="Most recent drafts kept per user (0 keeps all).")
+    parser.add_argument("--rejected-ttl-days", type=float, help="Age after which rejected plans go (0 keeps all).")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--archive", help="Append the deleted rows to this NDJSON file first.")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="Convert an existing SQLite database so that freed pages can be returned incrementally.",
+    )
+    args = parser.parse_args()
+
+    if args.enable_incremental_vacuum:
+        _enable_incremental_vacuum()
+
+    overrides = {
+        "keep_drafts": args.keep_drafts,
+        "rejected_ttl_days": args.rejected_ttl_days,
+        "batch_size": args.batch_size,
+        "archive_path": args.archive,
+    }
+    policy = replace(RetentionPolicy.from_settings(), **{k: v for k, v in overrides.items() if v is not None})
+    stats = compact_plans(engine, policy)
+    for name, value in stats.as_dict().items():
+        print(f"{name:>26}  {value:g}" if isinstance(value, float) else f"{name:>26}  {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Rewrite existing JSON columns with the codec set in DB_JSON_COMPRESSION.
+
+Run it once after enabling compression: new writes are compressed
+immediately, this converts rows written before. Rows are rewritten in
+primary-key batches, each in its own short transaction.
+"""
+
+import argparse
+
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401 - ensure SQLModel metadata is populated
+from app.core.config import settings
+from app.db import engine
+from app.models.types import CompressedJSON
+
+
+def _compressed_columns() -> list[tuple[str, str]]:
+    return [
+        (table.name, column.name)
+        for table in SQLModel.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, CompressedJSON)
+    ]
+
+
+def _stored_bytes(engine: Engine, table_name: str, column_name: str) -> int:
+    if engine.dialect.name == "postgresql":
+        size = f"pg_column_size({column_name})"
+    else:
+        size = f"length(CAST({column_name} AS BLOB))"
+    with engine.connect() as connection:
+        return connection.scalar(text(f"SELECT COALESCE(SUM({size}), 0) FROM {table_name}")) or 0
+
+
+def _ensure_binary_column(engine: Engine, table_name: str, column_name: str) -> None:
+    """Postgres stores the former JSON columns as ``json``; switch them to ``bytea`` first."""
+
+    if engine.dialect.name != "postgresql":
+        return
+    column_types = {column["name"]: str(column["type"]).lower() for column in inspect(engine).get_columns(table_name)}
+    if column_types.get(column_name) in {"json", "jsonb"}:
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                    f"TYPE bytea USING convert_to({column_name}::text, 'UTF8')"
+                )
+            )
+
+
+def _rewrite(engine: Engine, table_name: str, column_name: str, batch_size: int) -> int:
+    table = SQLModel.metadata.tables[table_name]
+    primary_key = list(table.primary_key.columns)[0]
+    column = table.c[column_name]
+    rewritten = 0
+    last_key = None
+    while True:
+        with engine.begin() as connection:
+            statement = select(primary_key, column).order_by(primary_key).limit(batch_size)
+            if last_key is not None:
+                statement = statement.where(primary_key > last_key)
+            rows = connection.execute(statement).all()
+            if not rows:
+                return rewritten
+            for key, value in rows:
+                connection.execute(update(table).where(primary_key == key).values({column_name: value}))
+            last_key = rows[-1][0]
+            rewritten += len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--vacuum", action="store_true", help="Reclaim the freed pages afterwards (SQLite VACUUM).")
+    args = parser.parse_args()
+
+    columns = _compressed_columns()
+    if not columns:
+        print("DB_JSON_COMPRESSION=none : aucune colonne à compresser.")
+        return
+
+    for table_name, column_name in columns:
+        _ensure_binary_column(engine, table_name, column_name)
+        before = _stored_bytes(engine, table_name, column_name)
+        rows = _rewrite(engine, table_name, column_name, args.batch_size)
+        after = _stored_bytes(engine, table_name, column_name)
+        print(
+            f"{table_name}.{column_name}: {rows} rows, {before} -> {after} bytes "
+            f"({settings.db_json_compression})"
+        )
+
+    if args.vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Apply pending schema migrations (online index builds) to DATABASE_URL."""
+
+import argparse
+
+from app.db import engine
+from app.db.migrations import pending_migrations, run_migrations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--status", action="store_true", help="List pending migrations without applying them.")
+    args = parser.parse_args()
+
+    pending = pending_migrations(engine)
+    if args.status or not pending:
+        for migration in pending:
+            print(f"pending  {migration.version:>4}  {migration.description}")
+        if not pending:
+            print("Schema is up to date.")
+        return
+
+    for version in run_migrations(engine):
+        print(f"applied  {version:>4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Regenerate stored 90-day plans through one offline LLM batch job."""
+
+import argparse
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db import create_db_and_tables, engine
+from app.models import Plan90Days, PlanStatus
+from app.services.llm_client import LLMClient
+from app.services.plan_batch import REGENERABLE_STATUSES, apply_plan_batch_results, build_plan_batch_requests
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompt", default="system_prompt", help="Prompt template used for every plan.")
+    parser.add_argument(
+        "--status",
+        choices=sorted(status.value for status in REGENERABLE_STATUSES),
+        default=PlanStatus.draft.value,
+        help="Approved plans are never regenerated.",
+    )
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--poll-interval-s", type=float, default=30.0)
+    parser.add_argument("--timeout-s", type=float, default=None)
+    parser.add_argument(
+        "--base-url",
+        default=settings.llm_base_url or None,
+        help="Override the API base URL (e.g. a local stand-in); defaults to LLM_BASE_URL.",
+    )
+    args = parser.parse_args(argv)
+
+    if settings.llm_mock:
+        # Mock outputs are placeholders: applying them would overwrite every plan.
+        parser.error("LLM_MOCK is enabled; refusing to overwrite plans with mock responses.")
+
+    create_db_and_tables()
+    client = LLMClient(
+        timeout_s=settings.llm_timeout_s,
+        model=settings.llm_model,
+        mock=False,
+        base_url=args.base_url,
+    )
+
+    with Session(engine) as session:
+        query = select(Plan90Days).where(Plan90Days.status == PlanStatus(args.status)).order_by(Plan90Days.id)
+        if args.limit:
+            query = query.limit(args.limit)
+        requests = build_plan_batch_requests(session.exec(query).all(), args.prompt)
+        if not requests:
+            print("No plan to regenerate.")
+            return
+
+        results = client.run_batch(requests, poll_interval_s=args.poll_interval_s, timeout_s=args.timeout_s)
+        counts = apply_plan_batch_results(session, results)
+
+    print(f"Batch finished: {counts['updated']} updated, {counts['failed']} failed, {counts['skipped']} skipped.")
+
+
+if __name__ == "__main__":
+    main()
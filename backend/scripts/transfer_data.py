@@ -0,0 +1,58 @@
+"""Export the database to NDJSON, or import an NDJSON export, in bounded memory."""
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlmodel import Session
+
+from app.db import create_db_and_tables, engine
+from app.services.data_transfer import (
+    DEFAULT_IMPORT_BATCH_SIZE,
+    ImportFormatError,
+    export_ndjson,
+    import_ndjson,
+    transfer_tables,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write every row as NDJSON.")
+    export_parser.add_argument("--output", type=Path, default=None, help="Defaults to stdout.")
+    export_parser.add_argument("--table", action="append", dest="tables", help="Restrict to this table (repeatable).")
+
+    import_parser = commands.add_parser("import", help="Insert the rows of an NDJSON export.")
+    import_parser.add_argument("--input", type=Path, default=None, help="Defaults to stdin.")
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.command == "export":
+            handle = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+            try:
+                for line in export_ndjson(session, transfer_tables(args.tables)):
+                    handle.write(line)
+            finally:
+                if args.output:
+                    handle.close()
+            return
+
+        create_db_and_tables()
+        handle = args.input.open(encoding="utf-8") if args.input else sys.stdin
+        try:
+            counts = import_ndjson(session, handle, batch_size=args.batch_size)
+        except ImportFormatError as exc:
+            # Batches before the failing line are committed: fix it and re-run.
+            raise SystemExit(f"Import stopped at {exc}") from exc
+        finally:
+            if args.input:
+                handle.close()
+        for table, count in counts.items():
+            print(f"{table}: {count} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
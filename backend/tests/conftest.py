@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+@pytest.fixture()
+def session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    asyncio.run(_create_tables(engine))
+    db_session = AsyncSession(engine, expire_on_commit=False)
+    yield db_session
+    asyncio.run(db_session.close())
+    asyncio.run(engine.dispose())
+
+
+async def _create_tables(engine: AsyncEngine) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
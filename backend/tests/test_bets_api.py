@@ -1,20 +1,16 @@
+import asyncio
+import json
+
 import pytest
 from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.bets import StrategicBetsRequest, create_bets
+from app.api.bets import StrategicBetsRequest, create_bets, create_bets_stream
 from app.models import Plan90Days, PlanStatus
 from app.services.strategic_bets import generate_strategic_bets
 
 
-@pytest.fixture()
-def session() -> Session:
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as db_session:
-        yield db_session
-
-
 def _build_payload() -> StrategicBetsRequest:
     return StrategicBetsRequest(
         context={
@@ -41,26 +37,26 @@ def test_generate_strategic_bets_is_stable_and_non_empty() -> None:
     assert all(set(bet.keys()) == {"hypothesis", "success_signal", "main_risk", "fallback"} for bet in first)
 
 
-def test_create_bets_requires_payload_values(session: Session) -> None:
+def test_create_bets_requires_payload_values(session: AsyncSession) -> None:
     request = StrategicBetsRequest(context={}, chosen_option="  ")
 
     with pytest.raises(HTTPException) as exc_info:
-        create_bets(request, session)
+        asyncio.run(create_bets(request, session))
 
     assert exc_info.value.status_code == 400
 
 
-def test_create_bets_persists_draft_plan_json(session: Session) -> None:
+def test_create_bets_persists_draft_plan_json(session: AsyncSession) -> None:
     request = _build_payload()
 
-    response = create_bets(request, session)
+    response = asyncio.run(create_bets(request, session))
 
     assert response.plan_id > 0
     assert response.status == PlanStatus.draft
     assert isinstance(response.bets, list)
     assert len(response.bets) >= 1
 
-    plans = session.exec(select(Plan90Days)).all()
+    plans = asyncio.run(session.exec(select(Plan90Days))).all()
     assert len(plans) == 1
 
     stored = plans[0]
@@ -69,3 +65,39 @@ def test_create_bets_persists_draft_plan_json(session: Session) -> None:
     assert stored.plan_json["context"] == request.context
     assert isinstance(stored.plan_json["bets"], list)
     assert len(stored.plan_json["bets"]) >= 1
+
+
+def test_create_bets_stream_emits_bets_then_persists(session: AsyncSession) -> None:
+    request = _build_payload()
+    response = asyncio.run(create_bets_stream(request, session))
+
+    async def _read_events() -> list[dict]:
+        return [json.loads(chunk) async for chunk in response.body_iterator]
+
+    events = asyncio.run(_read_events())
+    bet_events = [event for event in events if event["event"] == "bet"]
+
+    assert events[-1]["event"] == "done"
+    assert len(bet_events) >= 1
+    assert events[-1]["data"]["bets"] == [event["data"] for event in bet_events]
+
+    stored = asyncio.run(session.get(Plan90Days, events[-1]["data"]["plan_id"]))
+    assert stored is not None
+    assert stored.plan_json["bets"] == [event["data"] for event in bet_events]
+
+
+def test_create_bets_stream_ends_with_error_when_storing_fails(session: AsyncSession, monkeypatch) -> None:
+    async def _failing_commit() -> None:
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(session, "commit", _failing_commit)
+    response = asyncio.run(create_bets_stream(_build_payload(), session))
+
+    async def _read_events() -> list[dict]:
+        return [json.loads(chunk) async for chunk in response.body_iterator]
+
+    events = asyncio.run(_read_events())
+
+    assert events[0]["event"] == "bet"
+    assert events[-1]["event"] == "error"
+    assert "done" not in [event["event"] for event in events]
@@ -1,21 +1,14 @@
+import asyncio
 from datetime import datetime
 
 import pytest
 from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.context import CareerContextUpsertRequest, get_context, upsert_context
 
 
-@pytest.fixture()
-def session() -> Session:
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as db_session:
-        yield db_session
-
-
-def test_upsert_and_get_context_ok(session: Session) -> None:
+def test_upsert_and_get_context_ok(session: AsyncSession) -> None:
     payload = CareerContextUpsertRequest(
         primary_goal="Reconversion vers data",
         success_definition="Avoir une offre signée",
@@ -23,7 +16,7 @@ def test_upsert_and_get_context_ok(session: Session) -> None:
         horizon_days=60,
     )
 
-    created = upsert_context(payload, session)
+    created = asyncio.run(upsert_context(payload, session))
 
     assert created.primary_goal == payload.primary_goal
     assert created.success_definition == payload.success_definition
@@ -31,12 +24,12 @@ def test_upsert_and_get_context_ok(session: Session) -> None:
     assert created.horizon_days == payload.horizon_days
     assert isinstance(created.updated_at, datetime)
 
-    fetched = get_context(session)
+    fetched = asyncio.run(get_context(session))
     assert fetched.user_id == created.user_id
     assert fetched.primary_goal == payload.primary_goal
 
 
-def test_upsert_context_invalid_payload_returns_400(session: Session) -> None:
+def test_upsert_context_invalid_payload_returns_400(session: AsyncSession) -> None:
     payload = CareerContextUpsertRequest(
         primary_goal="   ",
         success_definition="",
@@ -45,7 +38,7 @@ def test_upsert_context_invalid_payload_returns_400(session: Session) -> None:
     )
 
     with pytest.raises(HTTPException) as exc_info:
-        upsert_context(payload, session)
+        asyncio.run(upsert_context(payload, session))
 
     assert exc_info.value.status_code == 400
     errors = exc_info.value.detail
@@ -55,9 +48,9 @@ def test_upsert_context_invalid_payload_returns_400(session: Session) -> None:
     assert "`horizon_days` doit être inférieur ou égal à 90." in errors
 
 
-def test_get_context_not_found(session: Session) -> None:
+def test_get_context_not_found(session: AsyncSession) -> None:
     with pytest.raises(HTTPException) as exc_info:
-        get_context(session)
+        asyncio.run(get_context(session))
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "CareerContext introuvable."
@@ -0,0 +1,140 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlmodel import Session, SQLModel
+
+from app.core.config import Settings
+from app.db.session import (
+    async_database_url,
+    build_async_engine,
+    build_engine,
+    engine_options,
+    read_only_database_url,
+)
+from app.models import User
+
+
+def test_sqlite_file_profile_applies_pragmas_and_pool(tmp_path) -> None:
+    engine = build_engine(f"sqlite:///{tmp_path / 'profile.db'}", Settings(db_pool_size=3))
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -65536
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+
+
+def test_sqlite_file_profile_handles_concurrent_writers(tmp_path) -> None:
+    engine = build_engine(f"sqlite:///{tmp_path / 'writers.db'}", Settings(db_sqlite_begin_immediate=True))
+    SQLModel.metadata.create_all(engine)
+
+    def _write(index: int) -> None:
+        with Session(engine) as session:
+            session.add(User(email=f"user{index}@example.com"))
+            session.commit()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_write, range(40)))
+
+    with Session(engine) as session:
+        assert session.exec(text("SELECT COUNT(*) FROM user")).one()[0] == 40
+
+
+def test_in_memory_sqlite_shares_one_connection() -> None:
+    options = engine_options("sqlite://", Settings())
+
+    assert options["poolclass"] is StaticPool
+    assert "pool_size" not in options
+
+
+def test_postgres_profile_sets_pool_and_server_options() -> None:
+    options = engine_options(
+        "postgresql+psycopg://app@db/copilot",
+        Settings(db_pool_size=20, db_postgres_statement_timeout_ms=5000),
+    )
+
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert "statement_timeout=5000" in options["connect_args"]["options"]
+    assert "application_name=life-career-copilot" in options["connect_args"]["options"]
+
+
+def test_async_database_url_swaps_in_asyncio_drivers() -> None:
+    assert async_database_url("sqlite:///./copilot.db") == "sqlite+aiosqlite:///./copilot.db"
+    assert async_database_url("postgresql://app:secret@db/copilot") == "postgresql+asyncpg://app:secret@db/copilot"
+    assert async_database_url("postgresql+psycopg://app@db/copilot") == "postgresql+psycopg://app@db/copilot"
+
+
+def test_async_engine_applies_sqlite_profile(tmp_path) -> None:
+    engine = build_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+
+    async def _pragmas() -> tuple[str, int]:
+        async with engine.connect() as connection:
+            journal_mode = (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            busy_timeout = (await connection.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+        await engine.dispose()
+        return journal_mode, busy_timeout
+
+    assert asyncio.run(_pragmas()) == ("wal", 5000)
+
+
+def test_asyncpg_profile_uses_server_settings() -> None:
+    options = engine_options("postgresql+asyncpg://app@db/copilot", Settings(db_postgres_statement_timeout_ms=5000))
+
+    assert options["connect_args"] == {
+        "server_settings": {"application_name": "life-career-copilot", "statement_timeout": "5000"}
+    }
+
+
+def test_read_only_url_reopens_sqlite_file_in_read_only_mode(tmp_path) -> None:
+    read_url = make_url(read_only_database_url(f"sqlite:///{tmp_path / 'app.db'}"))
+
+    assert read_url.database == f"file:{tmp_path / 'app.db'}"
+    assert dict(read_url.query) == {"mode": "ro", "uri": "true"}
+    assert read_only_database_url("sqlite://") is None
+    assert read_only_database_url("sqlite:///x.db", "postgresql+psycopg://replica/copilot") == (
+        "postgresql+psycopg://replica/copilot"
+    )
+
+
+def test_read_only_sqlite_engine_sees_commits_and_rejects_writes(tmp_path) -> None:
+    database_url = f"sqlite:///{tmp_path / 'routing.db'}"
+    writer = build_engine(database_url, Settings(db_sqlite_begin_immediate=True))
+    SQLModel.metadata.create_all(writer)
+
+    async def _scenario():
+        reader = build_async_engine(read_only_database_url(database_url), Settings(), read_only=True)
+        async with reader.connect() as connection:
+            # A read transaction stays open while the writer commits.
+            before = (await connection.execute(text("SELECT COUNT(*) FROM user"))).scalar()
+            with Session(writer) as session:
+                session.add(User(email="writer@example.com"))
+                session.commit()
+            await connection.rollback()
+            after = (await connection.execute(text("SELECT COUNT(*) FROM user"))).scalar()
+            try:
+                await connection.execute(text("INSERT INTO user (created_at) VALUES ('2024-01-01')"))
+            except OperationalError as exc:
+                write_error = str(exc)
+            else:
+                write_error = ""
+        await reader.dispose()
+        return before, after, write_error
+
+    before, after, write_error = asyncio.run(_scenario())
+
+    assert (before, after) == (0, 1)
+    assert "readonly" in write_error
+
+
+def test_postgres_read_only_profile_makes_transactions_read_only() -> None:
+    options = engine_options("postgresql+asyncpg://app@replica/copilot", Settings(), read_only=True)
+
+    assert options["connect_args"]["server_settings"]["default_transaction_read_only"] == "on"
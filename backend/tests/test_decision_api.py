@@ -1,6 +1,9 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.context import CareerContextUpsertRequest, upsert_context
 from app.api.decision import DecisionChooseRequest, decision_choose, decision_options
@@ -8,22 +11,14 @@ from app.models import Decision
 from app.services.decision_engine import check_constraints, force_tradeoff, generate_options
 
 
-@pytest.fixture()
-def session() -> Session:
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as db_session:
-        yield db_session
-
-
-def _seed_context(session: Session) -> None:
+def _seed_context(session: AsyncSession) -> None:
     payload = CareerContextUpsertRequest(
         primary_goal="Décrocher un poste data",
         success_definition="Signer une offre",
         constraints={"temps": "8h/semaine", "budget": "500€"},
         horizon_days=60,
     )
-    upsert_context(payload, session)
+    asyncio.run(upsert_context(payload, session))
 
 
 def test_generate_options_is_capped_to_three() -> None:
@@ -41,17 +36,17 @@ def test_generate_options_is_capped_to_three() -> None:
     assert len(options["options"]) <= 3
 
 
-def test_decision_options_requires_existing_context(session: Session) -> None:
+def test_decision_options_requires_existing_context(session: AsyncSession) -> None:
     with pytest.raises(HTTPException) as exc_info:
-        decision_options(session)
+        asyncio.run(decision_options(session))
 
     assert exc_info.value.status_code == 404
 
 
-def test_decision_options_returns_structured_json(session: Session) -> None:
+def test_decision_options_returns_structured_json(session: AsyncSession) -> None:
     _seed_context(session)
 
-    response = decision_options(session)
+    response = asyncio.run(decision_options(session))
 
     assert response.constraint_check.ok is True
     assert isinstance(response.options, list)
@@ -59,7 +54,7 @@ def test_decision_options_returns_structured_json(session: Session) -> None:
     assert all(option.title for option in response.options)
 
 
-def test_decision_choose_rejects_missing_justification(session: Session) -> None:
+def test_decision_choose_rejects_missing_justification(session: AsyncSession) -> None:
     _seed_context(session)
 
     request = DecisionChooseRequest(
@@ -70,13 +65,13 @@ def test_decision_choose_rejects_missing_justification(session: Session) -> None
     )
 
     with pytest.raises(HTTPException) as exc_info:
-        decision_choose(request, session)
+        asyncio.run(decision_choose(request, session))
 
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == "Impossible de choisir sans justification."
 
 
-def test_decision_choose_stores_decision(session: Session) -> None:
+def test_decision_choose_stores_decision(session: AsyncSession) -> None:
     _seed_context(session)
 
     request = DecisionChooseRequest(
@@ -86,13 +81,13 @@ def test_decision_choose_stores_decision(session: Session) -> None:
         justification="Meilleur ratio impact/effort.",
     )
 
-    response = decision_choose(request, session)
+    response = asyncio.run(decision_choose(request, session))
 
     assert response.validated is True
     assert response.chosen_option == "Option 2"
     assert response.abandoned_options == ["Option 1", "Option 3"]
 
-    persisted = session.exec(select(Decision)).one()
+    persisted = asyncio.run(session.exec(select(Decision))).one()
     assert persisted.chosen_option == "Option 2"
     assert persisted.justification == "Meilleur ratio impact/effort."
 
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.history import list_checklist_results, list_decisions, list_plans
+from app.db.session import build_engine
+from app.models import ChecklistResult, Decision, Plan90Days, PlanStatus, User
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _seed_plans(session: AsyncSession, count: int) -> None:
+    async def _seed() -> None:
+        session.add(User(id=1))
+        session.add(User(id=2))
+        for index in range(count):
+            session.add(
+                Plan90Days(
+                    user_id=1,
+                    plan_json={"index": index},
+                    status=PlanStatus.approved if index % 2 else PlanStatus.draft,
+                    # Pairs of plans share a timestamp: the id breaks the tie.
+                    created_at=START + timedelta(minutes=index // 2),
+                )
+            )
+        session.add(Plan90Days(user_id=2, plan_json={}, created_at=START))
+        await session.commit()
+
+    asyncio.run(_seed())
+
+
+def _all_pages(fetch) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        page = asyncio.run(fetch(cursor))
+        pages.append(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_list_plans_walks_every_plan_newest_first_without_plan_json(session: AsyncSession) -> None:
+    _seed_plans(session, 7)
+
+    pages = _all_pages(lambda cursor: list_plans(None, cursor, 3, None, session))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    items = [item for page in pages for item in page]
+    assert [item["id"] for item in items] == [7, 6, 5, 4, 3, 2, 1]
+    assert set(items[0]) == {"id", "status", "created_at"}
+
+
+def test_list_plans_projects_requested_fields_and_filters_status(session: AsyncSession) -> None:
+    _seed_plans(session, 6)
+
+    page = asyncio.run(list_plans(PlanStatus.approved, None, 20, ["plan_json"], session))
+
+    assert [item["id"] for item in page.items] == [6, 4, 2]
+    assert set(page.items[0]) == {"id", "plan_json", "created_at"}
+    assert page.items[0]["plan_json"] == {"index": 5}
+    assert page.next_cursor is None
+
+
+def test_list_plans_rejects_bad_cursor_and_unknown_fields(session: AsyncSession) -> None:
+    with pytest.raises(HTTPException) as cursor_error:
+        asyncio.run(list_plans(None, "not-a-cursor", 20, None, session))
+    with pytest.raises(HTTPException) as fields_error:
+        asyncio.run(list_plans(None, None, 20, ["user_id"], session))
+
+    assert cursor_error.value.status_code == 400
+    assert fields_error.value.status_code == 400
+
+
+def test_list_decisions_and_checklist_results(session: AsyncSession) -> None:
+    async def _seed() -> None:
+        session.add(User(id=1))
+        session.add(Plan90Days(id=1, user_id=1, plan_json={}))
+        for index in range(3):
+            session.add(
+                Decision(
+                    user_id=1,
+                    options=["A", "B"],
+                    chosen_option="A",
+                    abandoned_options=["B"],
+                    justification=f"Raison {index}",
+                    created_at=START + timedelta(minutes=index),
+                )
+            )
+            session.add(
+                ChecklistResult(plan_id=1, verdict="rejected", feedback=f"Retour {index}", created_at=START)
+            )
+        await session.commit()
+
+    asyncio.run(_seed())
+
+    decisions = _all_pages(lambda cursor: list_decisions(cursor, 2, None, session))
+    checklist_results = _all_pages(lambda cursor: list_checklist_results(1, cursor, 2, ["verdict"], session))
+
+    assert [item["justification"] for page in decisions for item in page] == ["Raison 2", "Raison 1", "Raison 0"]
+    assert "options" not in decisions[0][0]
+    assert [item["id"] for page in checklist_results for item in page] == [3, 2, 1]
+    assert set(checklist_results[0][0]) == {"id", "verdict", "created_at"}
+
+
+def test_checklist_results_of_an_unknown_plan_are_a_404(session: AsyncSession) -> None:
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(list_checklist_results(999, None, 2, None, session))
+
+    assert error.value.status_code == 404
+
+
+def test_history_pages_are_index_range_scans(tmp_path) -> None:
+    engine = build_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1))
+        session.commit()
+
+    with engine.connect() as connection:
+        for table in ("plan90days", "decision"):
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN SELECT id, created_at FROM {table} WHERE user_id = 1 "
+                "AND (created_at, id) < ('2024-01-01 00:00:00.000000', 10) "
+                "ORDER BY created_at DESC, id DESC LIMIT 21"
+            ).all()
+            details = " ".join(row[-1] for row in plan)
+            assert f"ix_{table}_user_id_created_at_id" in details
+            assert "TEMP B-TREE" not in details
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, select, text
+
+from app.models.types import CompressedJSON, decode_json, encode_json
+from app.services.plan_generator import generate_plan_90_days
+
+
+def _plan() -> dict:
+    return generate_plan_90_days(
+        {"primary_goal": "Décrocher un poste data", "success_definition": "Avoir 3 entretiens qualifiés"},
+        "Trajectoire équilibrée",
+    )
+
+
+def test_encode_json_round_trips_and_shrinks_plans() -> None:
+    plan = _plan()
+
+    payload = encode_json(plan, "zlib")
+
+    assert decode_json(payload) == plan
+    assert len(payload) < len(json.dumps(plan).encode("utf-8")) * 0.7
+
+
+def test_encode_json_keeps_small_values_uncompressed() -> None:
+    payload = encode_json(["A", "B"], "zlib")
+
+    assert payload == b'["A","B"]'
+    assert decode_json(payload) == ["A", "B"]
+
+
+def test_encode_json_rejects_unknown_codec() -> None:
+    with pytest.raises(ValueError):
+        encode_json({}, "lz4")
+
+
+def test_compressed_column_reads_rows_written_as_json_text() -> None:
+    engine = create_engine("sqlite://")
+    table = Table("doc", MetaData(), Column("id", Integer, primary_key=True), Column("body", CompressedJSON()))
+    plan = _plan()
+
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE doc (id INTEGER PRIMARY KEY, body JSON)"))
+        connection.execute(text("INSERT INTO doc VALUES (1, :body)"), {"body": json.dumps({"legacy": True})})
+        connection.execute(table.insert().values(id=2, body=plan))
+
+        rows = dict(connection.execute(select(table.c.id, table.c.body)).all())
+        stored_types = connection.execute(text("SELECT typeof(body) FROM doc ORDER BY id")).scalars().all()
+
+    assert rows == {1: {"legacy": True}, 2: plan}
+    assert stored_types == ["text", "blob"]
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import Plan90Days, PlanStatus
+from app.services.llm_client import LLMClient
+from app.services.llm_stub_server import LLMStubServer, echo_responder
+from app.core.config import settings
+from app.services.llm_batch import BatchResult, parse_batch_output
+from app.services.plan_batch import apply_plan_batch_results, build_plan_batch_requests
+from scripts.regenerate_plans import main as regenerate_plans
+
+
+def _responder(body: dict) -> str:
+    payload = json.loads(echo_responder(body))
+    if payload.get("objective") == "fail me":
+        raise ValueError("invalid plan")
+    return json.dumps({**payload, "objective": payload["objective"].upper()})
+
+
+def test_run_batch_maps_results_back_to_plans() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session, LLMStubServer(responder=_responder, batch_delay_s=0.05) as stub:
+        plans = [
+            Plan90Days(user_id=1, status=PlanStatus.draft, plan_json={"objective": "land a data role"}),
+            Plan90Days(user_id=1, status=PlanStatus.draft, plan_json={"objective": "fail me"}),
+        ]
+        session.add_all(plans)
+        session.commit()
+        for plan in plans:
+            session.refresh(plan)
+
+        client = LLMClient(mock=False, api_key="test-key", base_url=stub.url)
+        requests = build_plan_batch_requests(plans, "system_prompt")
+        results = client.run_batch(requests, poll_interval_s=0.01, timeout_s=5)
+        counts = apply_plan_batch_results(session, results)
+
+        assert counts == {"updated": 1, "failed": 1, "skipped": 0}
+        assert session.get(Plan90Days, plans[0].id).plan_json == {"objective": "LAND A DATA ROLE"}
+        assert session.get(Plan90Days, plans[1].id).plan_json == {"objective": "fail me"}
+        assert len(stub.batches) == 1
+
+
+def test_parse_batch_output_tolerates_errors_that_are_not_objects() -> None:
+    lines = [
+        {"custom_id": "plan-1", "error": {"code": "invalid", "message": "bad prompt"}},
+        {"custom_id": "plan-2", "error": "upstream timeout"},
+        {"custom_id": "plan-3", "error": ["rate", "limited"]},
+        {"custom_id": "plan-4", "response": {"status_code": 200, "body": {"output_text": "ok"}}},
+    ]
+
+    parsed = list(parse_batch_output("\n".join(json.dumps(line) for line in lines)))
+
+    assert parsed == [
+        ("plan-1", None, "bad prompt"),
+        ("plan-2", None, "upstream timeout"),
+        ("plan-3", None, '["rate", "limited"]'),
+        ("plan-4", {"output_text": "ok"}, None),
+    ]
+
+
+def test_run_batch_in_mock_mode_needs_no_server() -> None:
+    client = LLMClient(mock=True)
+    plan = Plan90Days(id=7, user_id=1, plan_json={"objective": "x"})
+
+    results = client.run_batch(build_plan_batch_requests([plan], "system_prompt"))
+
+    assert results["plan-7"].ok
+    assert results["plan-7"].output["mode"] == "mock"
+
+
+def test_approved_plans_are_never_regenerated() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        draft = Plan90Days(user_id=1, status=PlanStatus.draft, plan_json={"objective": "draft"})
+        approved = Plan90Days(user_id=1, status=PlanStatus.approved, plan_json={"objective": "signed off"})
+        session.add_all([draft, approved])
+        session.commit()
+        for plan in (draft, approved):
+            session.refresh(plan)
+
+        requests = build_plan_batch_requests([draft, approved], "system_prompt")
+        assert [request.custom_id for request in requests] == [f"plan-{draft.id}"]
+
+        # The draft is approved while the batch runs: its result is dropped.
+        draft.status = PlanStatus.approved
+        session.add(draft)
+        session.commit()
+        results = {
+            f"plan-{plan.id}": BatchResult(custom_id=f"plan-{plan.id}", output={"objective": "regenerated"})
+            for plan in (draft, approved)
+        }
+        counts = apply_plan_batch_results(session, results)
+
+        assert counts == {"updated": 0, "failed": 0, "skipped": 2}
+        assert session.get(Plan90Days, draft.id).plan_json == {"objective": "draft"}
+        assert session.get(Plan90Days, approved.id).plan_json == {"objective": "signed off"}
+
+
+def test_regenerate_script_refuses_mock_mode_and_approved_plans(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "llm_mock", True)
+    with pytest.raises(SystemExit) as exc_info:
+        regenerate_plans([])
+    assert exc_info.value.code == 2
+
+    monkeypatch.setattr(settings, "llm_mock", False)
+    with pytest.raises(SystemExit) as exc_info:
+        regenerate_plans(["--status", "approved"])
+    assert exc_info.value.code == 2
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from app.services.llm_cache import MemoryLRUCache, SQLiteCache, TieredCache, make_cache_key
+
+
+def test_make_cache_key_depends_on_model_prompt_and_input() -> None:
+    base = make_cache_key(model="gpt-4o-mini", prompt_hash="abc", canonical_input='{"a": 1}')
+
+    assert base == make_cache_key(model="gpt-4o-mini", prompt_hash="abc", canonical_input='{"a": 1}')
+    assert base != make_cache_key(model="gpt-4o", prompt_hash="abc", canonical_input='{"a": 1}')
+    assert base != make_cache_key(model="gpt-4o-mini", prompt_hash="abd", canonical_input='{"a": 1}')
+    assert base != make_cache_key(model="gpt-4o-mini", prompt_hash="abc", canonical_input='{"a": 2}')
+
+
+def test_memory_cache_evicts_least_recently_used_and_returns_copies() -> None:
+    cache = MemoryLRUCache(max_entries=2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    cache.get("a")["value"] = 99
+    cache.set("c", {"value": 3})
+
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("b") is None
+    assert cache.stats.evictions == 1
+    assert cache.stats.misses == 1
+
+
+def test_memory_cache_honours_ttl() -> None:
+    cache = MemoryLRUCache(ttl_s=-1)
+    cache.set("a", "value")
+
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path: Path) -> None:
+    disk = SQLiteCache(tmp_path / "llm_cache.db", max_entries=2)
+    TieredCache(MemoryLRUCache(), disk).set("key", ["persisted"])
+
+    restarted = TieredCache(MemoryLRUCache(), SQLiteCache(tmp_path / "llm_cache.db"))
+
+    assert restarted.get("key") == ["persisted"]
+    assert restarted.get("key") == ["persisted"]
+    assert restarted.get("missing") is None
+    assert restarted.stats.as_dict()["disk_hits"] == 1
+    assert restarted.stats.memory_hits == 1
+    assert restarted.stats.misses == 1
+
+
+def test_sqlite_cache_is_size_bounded(tmp_path: Path) -> None:
+    disk = SQLiteCache(tmp_path / "llm_cache.db", max_entries=2)
+    for index in range(5):
+        disk.set(f"key-{index}", index)
+
+    assert len(disk) == 2
+    assert disk.get("key-4") == 4
+    assert disk.stats.evictions == 3
@@ -0,0 +1,340 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_cache import MemoryLRUCache, TieredCache
+from app.services.llm_client import LLMClient
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from app.services.rate_limiter import ModelRateLimiter, RateLimitExceeded
+
+
+class _ProviderError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"provider returned {status_code}")
+        self.status_code = status_code
+
+
+class _FakeAsyncResponses:
+    def __init__(self, failures: int = 0, delay_s: float = 0.01, status_code: int = 503) -> None:
+        self.failures = failures
+        self.delay_s = delay_s
+        self.status_code = status_code
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, *, model, input, timeout):  # noqa: A002 - mirrors SDK signature
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_s)
+            if self.failures > 0:
+                self.failures -= 1
+                raise _ProviderError(self.status_code)
+            return SimpleNamespace(output_text=input[1]["content"])
+        finally:
+            self.in_flight -= 1
+
+
+def _client_with(responses: _FakeAsyncResponses, **kwargs) -> LLMClient:
+    client = LLMClient(mock=False, api_key="test-key", **kwargs)
+    client._async_client = SimpleNamespace(responses=responses)
+    return client
+
+
+def test_arun_prompt_mock_matches_sync_output() -> None:
+    client = LLMClient(mock=True)
+    payload = {"primary_goal": "Décrocher un poste data"}
+
+    async_output = asyncio.run(client.arun_prompt("system_prompt", payload))
+
+    assert async_output == client.run_prompt("system_prompt", payload)
+
+
+def test_arun_prompt_retries_then_parses_json() -> None:
+    responses = _FakeAsyncResponses(failures=1)
+    client = _client_with(responses, retries=1, retry_policy=RetryPolicy(base_delay_s=0))
+
+    output = asyncio.run(client.arun_prompt("system_prompt", {"a": 1}))
+
+    assert output == {"a": 1}
+    assert responses.calls == 2
+
+
+def test_run_prompt_many_preserves_order_and_bounds_concurrency() -> None:
+    responses = _FakeAsyncResponses()
+    client = _client_with(responses, max_concurrency=3)
+    prompts = [("system_prompt", {"index": index}) for index in range(10)]
+
+    outputs = asyncio.run(client.run_prompt_many(prompts))
+
+    assert outputs == [{"index": index} for index in range(10)]
+    assert responses.max_in_flight == 3
+
+
+def test_arun_prompt_serves_repeated_inputs_from_cache() -> None:
+    responses = _FakeAsyncResponses()
+    client = _client_with(responses, cache=TieredCache(MemoryLRUCache()))
+
+    first = asyncio.run(client.arun_prompt("system_prompt", {"a": 1, "b": 2}))
+    second = asyncio.run(client.arun_prompt("system_prompt", {"b": 2, "a": 1}))
+
+    assert first == second == {"a": 1, "b": 2}
+    assert responses.calls == 1
+    assert client.cache.stats.hits == 1
+
+
+def test_arun_prompt_coalesces_identical_in_flight_calls() -> None:
+    responses = _FakeAsyncResponses(delay_s=0.05)
+    client = _client_with(responses)
+
+    async def _burst() -> list:
+        return await asyncio.gather(*(client.arun_prompt("system_prompt", {"a": 1}) for _ in range(5)))
+
+    outputs = asyncio.run(_burst())
+
+    assert outputs == [{"a": 1}] * 5
+    assert responses.calls == 1
+    assert client.single_flight.stats.coalesced == 4
+
+
+class _FakeStream:
+    def __init__(self, deltas: list[str], delay_s: float = 0, error: Exception | None = None) -> None:
+        self.deltas = deltas
+        self.delay_s = delay_s
+        self.error = error
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        yield SimpleNamespace(type="response.created")
+        for delta in self.deltas:
+            await asyncio.sleep(self.delay_s)
+            yield SimpleNamespace(type="response.output_text.delta", delta=delta)
+        if self.error is not None:
+            raise self.error
+        usage = SimpleNamespace(input_tokens=7, output_tokens=3)
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(usage=usage))
+
+
+class _StreamingResponses:
+    def __init__(self, deltas: list[str], **stream_kwargs) -> None:
+        self.deltas = deltas
+        self.stream_kwargs = stream_kwargs
+        self.calls = 0
+
+    async def create(self, *, model, input, timeout, stream):  # noqa: A002 - mirrors SDK signature
+        self.calls += 1
+        return _FakeStream(self.deltas, **self.stream_kwargs)
+
+
+async def _collect_stream(client: LLMClient, payload: dict) -> list[str]:
+    return [delta async for delta in client.astream_prompt("system_prompt", payload)]
+
+
+def test_astream_prompt_yields_deltas_and_caches_full_output() -> None:
+    responses = _StreamingResponses(['{"bets": ', "[1, 2]", "}"])
+    client = _client_with(responses, cache=TieredCache(MemoryLRUCache()))
+
+    assert asyncio.run(_collect_stream(client, {"a": 1})) == ['{"bets": ', "[1, 2]", "}"]
+    assert asyncio.run(client.arun_prompt("system_prompt", {"a": 1})) == {"bets": [1, 2]}
+    assert responses.calls == 1
+
+
+def test_astream_prompt_goes_through_the_limiter_breaker_and_metrics() -> None:
+    from app.services.metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    limiter = ModelRateLimiter("gpt-4o-mini", requests_per_minute=100, tokens_per_minute=100_000)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=60)
+    responses = _StreamingResponses(['"ok"'])
+    client = _client_with(responses, rate_limiter=limiter, circuit_breaker=breaker, metrics=metrics)
+
+    assert asyncio.run(_collect_stream(client, {"a": 1})) == ['"ok"']
+    assert limiter.stats.requests == 1
+    assert metrics.counter_value("llm_requests_total", prompt_name="system_prompt", model=client.model, outcome="success") == 1
+    assert metrics.counter_value("llm_output_tokens_total", prompt_name="system_prompt", model=client.model) == 3
+
+    responses.stream_kwargs = {"error": _ProviderError(503)}
+    with pytest.raises(_ProviderError):
+        asyncio.run(_collect_stream(client, {"a": 2}))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert metrics.counter_value("llm_requests_total", prompt_name="system_prompt", model=client.model, outcome="error") == 1
+
+    # The open circuit refuses the next stream before it spends any budget.
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_collect_stream(client, {"a": 3}))
+    assert responses.calls == 2
+    assert limiter.stats.requests == 2
+
+
+def test_concurrent_identical_streams_are_coalesced() -> None:
+    responses = _StreamingResponses(['{"a": ', "1}"], delay_s=0.02)
+    client = _client_with(responses)
+
+    async def _burst() -> list[list[str]]:
+        return await asyncio.gather(*(_collect_stream(client, {"a": 1}) for _ in range(3)))
+
+    leader, *followers = asyncio.run(_burst())
+
+    assert leader == ['{"a": ', "1}"]
+    assert followers == [['{"a": 1}']] * 2
+    assert responses.calls == 1
+
+
+def test_arun_prompt_does_not_retry_client_errors() -> None:
+    responses = _FakeAsyncResponses(failures=1, status_code=400)
+    client = _client_with(responses, retries=2, retry_policy=RetryPolicy(base_delay_s=0))
+
+    with pytest.raises(_ProviderError):
+        asyncio.run(client.arun_prompt("system_prompt", {"a": 1}))
+
+    assert responses.calls == 1
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_arun_prompt_fails_fast_once_circuit_is_open() -> None:
+    responses = _FakeAsyncResponses(failures=10)
+    client = _client_with(
+        responses,
+        retries=5,
+        retry_policy=RetryPolicy(base_delay_s=0),
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout_s=60),
+    )
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.arun_prompt("system_prompt", {"a": 1}))
+
+    assert responses.calls == 2
+
+
+def test_calls_refused_by_the_open_circuit_spend_no_rate_budget() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=60)
+    breaker.record_failure()
+    limiter = ModelRateLimiter("gpt-4o-mini", requests_per_minute=100)
+    client = _client_with(_FakeAsyncResponses(), circuit_breaker=breaker, rate_limiter=limiter)
+
+    for payload in ({"a": 1}, {"a": 2}):
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(client.arun_prompt("system_prompt", payload))
+
+    assert limiter.stats.requests == 0
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_cancelled_half_open_probe_releases_the_circuit() -> None:
+    responses = _FakeAsyncResponses(delay_s=1.0)
+    client = _client_with(responses, circuit_breaker=_half_open_breaker())
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(client.arun_prompt("system_prompt", {"a": 1}), timeout=0.05))
+
+    responses.delay_s = 0.01
+    assert asyncio.run(client.arun_prompt("system_prompt", {"a": 2})) == {"a": 2}
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_half_open_probe_releases_the_circuit() -> None:
+    limiter = ModelRateLimiter("gpt-4o-mini", requests_per_minute=1, max_wait_s=0)
+    limiter.acquire(1)
+    responses = _FakeAsyncResponses()
+    client = _client_with(responses, circuit_breaker=_half_open_breaker(), rate_limiter=limiter)
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(client.arun_prompt("system_prompt", {"a": 1}))
+
+    assert responses.calls == 0
+    # The rejected call never took the probe: the next one can still probe.
+    assert client.circuit_breaker.state != CircuitBreaker.CLOSED
+    assert client.circuit_breaker.before_call() is True
+
+
+def test_arun_prompt_hedges_slow_calls() -> None:
+    class _SlowThenFastResponses:
+        calls = 0
+
+        async def create(self, *, model, input, timeout):  # noqa: A002 - mirrors SDK signature
+            self.calls += 1
+            await asyncio.sleep(1.0 if self.calls == 1 else 0.01)
+            return SimpleNamespace(output_text='"fast"')
+
+    responses = _SlowThenFastResponses()
+    client = _client_with(responses, hedge_quantile=0.95, hedge_min_samples=1)
+    client.latencies.record(0.02)
+
+    output = asyncio.run(asyncio.wait_for(client.arun_prompt("system_prompt", {"a": 1}), timeout=0.5))
+
+    assert output == "fast"
+    assert responses.calls == 2
+
+
+def test_hedged_requests_are_charged_to_the_rate_limiter() -> None:
+    class _SlowResponses:
+        calls = 0
+
+        async def create(self, *, model, input, timeout):  # noqa: A002 - mirrors SDK signature
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(output_text='"slow"')
+
+    def _hedging_client(limiter: ModelRateLimiter) -> tuple[LLMClient, _SlowResponses]:
+        responses = _SlowResponses()
+        client = _client_with(responses, hedge_quantile=0.95, hedge_min_samples=1, rate_limiter=limiter)
+        client.latencies.record(0.001)
+        return client, responses
+
+    limiter = ModelRateLimiter("gpt-4o-mini", requests_per_minute=100)
+    client, responses = _hedging_client(limiter)
+    assert asyncio.run(client.arun_prompt("system_prompt", {"a": 1})) == "slow"
+    assert responses.calls == 2
+    assert limiter.stats.requests == 2
+
+    # Without budget left the hedge is not sent and the first request still answers.
+    exhausted = ModelRateLimiter("gpt-4o-mini", requests_per_minute=1, max_wait_s=0)
+    client, responses = _hedging_client(exhausted)
+    assert asyncio.run(client.arun_prompt("system_prompt", {"a": 1})) == "slow"
+    assert responses.calls == 1
+    assert exhausted.stats.requests == 1
+
+
+def test_arun_prompt_records_outcomes_tokens_and_latency() -> None:
+    from app.services.metrics import MetricsRegistry
+
+    class _UsageResponses(_FakeAsyncResponses):
+        async def create(self, *, model, input, timeout):  # noqa: A002 - mirrors SDK signature
+            response = await super().create(model=model, input=input, timeout=timeout)
+            response.usage = SimpleNamespace(input_tokens=12, output_tokens=5)
+            return response
+
+    metrics = MetricsRegistry()
+    responses = _UsageResponses(failures=1)
+    client = _client_with(
+        responses,
+        retries=1,
+        retry_policy=RetryPolicy(base_delay_s=0),
+        cache=TieredCache(MemoryLRUCache()),
+        metrics=metrics,
+    )
+
+    asyncio.run(client.arun_prompt("system_prompt", {"a": 1}))
+    asyncio.run(client.arun_prompt("system_prompt", {"a": 1}))
+
+    labels = {"prompt_name": "system_prompt", "model": client.model}
+    assert metrics.counter_value("llm_attempts_total", **labels) == 2
+    assert metrics.counter_value("llm_requests_total", outcome="success", **labels) == 1
+    assert metrics.counter_value("llm_requests_total", outcome="cache_hit", **labels) == 1
+    assert metrics.counter_value("llm_input_tokens_total", **labels) == 12
+    assert metrics.counter_value("llm_output_tokens_total", **labels) == 5
+    histogram = next(
+        entry for entry in metrics.snapshot()["histograms"] if entry["name"] == "llm_request_duration_seconds"
+    )
+    assert histogram["count"] == 1
+    assert client.stats()["cache"]["hit_rate"] == 0.5
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable, retry_after_s
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None) -> None:
+        super().__init__(str(status_code))
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+@pytest.mark.parametrize(
+    ("exc", "expected"),
+    [
+        (_StatusError(429), True),
+        (_StatusError(503), True),
+        (_StatusError(400), False),
+        (_StatusError(401), False),
+        (TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (ValueError("bad payload"), False),
+    ],
+)
+def test_is_retryable_classifies_errors(exc: Exception, expected: bool) -> None:
+    assert is_retryable(exc) is expected
+
+
+def test_retry_policy_honours_retry_after_and_caps_backoff() -> None:
+    policy = RetryPolicy(base_delay_s=1.0, max_delay_s=4.0, rng=lambda low, high: high)
+
+    assert retry_after_s(_StatusError(429, {"retry-after-ms": "250"})) == 0.25
+    assert policy.delay(0, _StatusError(429, {"retry-after": "3"})) == 3.0
+    assert [policy.delay(attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 4.0]
+
+
+def test_circuit_breaker_opens_then_half_opens_with_single_probe() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 10.0
+    assert breaker.before_call() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_circuit_breaker_released_probe_lets_the_next_call_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0)
+    breaker.record_failure()
+
+    assert breaker.before_call() is True
+    breaker.release_probe()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.before_call() is True
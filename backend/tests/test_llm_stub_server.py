@@ -0,0 +1,84 @@
+import asyncio
+import random
+
+import pytest
+
+from app.services.llm_client import LLMClient
+from app.services.llm_resilience import RetryPolicy
+from app.services.llm_stub_server import FailureProfile, LatencyProfile, LLMStubServer
+from scripts.bench_llm import main as bench_llm
+
+
+@pytest.mark.parametrize("distribution", ["fixed", "uniform", "exponential", "lognormal"])
+def test_latency_profile_samples_keep_requested_mean(distribution: str) -> None:
+    rng = random.Random(0)
+    profile = LatencyProfile(distribution, mean_s=0.2)
+
+    samples = [profile.sample(rng) for _ in range(5000)]
+
+    assert min(samples) >= 0
+    assert sum(samples) / len(samples) == pytest.approx(0.2, rel=0.1)
+
+
+def test_stub_serves_responses_api_through_the_client() -> None:
+    with LLMStubServer(output_tokens=42) as stub:
+        client = LLMClient(mock=False, api_key="test-key", base_url=stub.url)
+        response = client._openai_client().responses.create(model="gpt-4o-mini", input="ping")
+
+        assert client.run_prompt("system_prompt", {"goal": "data"}) == {"goal": "data"}
+        assert response.output_text == "ping"
+        assert response.usage.output_tokens == 42
+        assert stub.stats.requests == 2
+
+
+def test_stub_serves_the_pooled_async_client_over_http() -> None:
+    async def _scenario(client: LLMClient) -> tuple[list, str]:
+        try:
+            outputs = await client.run_prompt_many(
+                [("system_prompt", {"goal": index}) for index in range(3)], max_concurrency=2
+            )
+            chunks = [chunk async for chunk in client.astream_prompt("system_prompt", {"goal": "stream"})]
+            return outputs, "".join(chunks)
+        finally:
+            await client.aclose()
+
+    with LLMStubServer() as stub:
+        client = LLMClient(mock=False, api_key="test-key", base_url=stub.url, max_connections=2)
+        outputs, streamed = asyncio.run(_scenario(client))
+
+        assert outputs == [{"goal": 0}, {"goal": 1}, {"goal": 2}]
+        assert streamed == '{"goal": "stream"}'
+        assert stub.stats.requests == 4
+
+
+def test_stub_failures_exercise_client_retries() -> None:
+    failures = FailureProfile(error_rate=1.0, status_codes=(503,), retry_after_s=0)
+    with LLMStubServer(failures=failures) as stub:
+        client = LLMClient(
+            mock=False,
+            api_key="test-key",
+            base_url=stub.url,
+            retries=2,
+            retry_policy=RetryPolicy(base_delay_s=0),
+        )
+
+        with pytest.raises(Exception) as exc_info:
+            client.run_prompt("system_prompt", {"goal": "data"})
+
+        assert getattr(exc_info.value, "status_code", None) == 503
+        assert stub.stats.requests == 3
+        assert stub.stats.status_counts == {503: 3}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_bench_llm_reports_successful_requests_only(stream: bool, capsys) -> None:
+    argv = ["--requests", "6", "--concurrency", "3", "--latency-distribution", "fixed", "--latency-mean-ms", "1"]
+
+    assert bench_llm(argv + (["--stream"] if stream else [])) == 0
+    output = capsys.readouterr().out
+    assert "errors=0" in output
+    assert "successful req/s" in output
+    assert "latency_ms" in output
+
+    assert bench_llm(argv + ["--error-rate", "1", "--retries", "0"]) == 1
+    assert "every request failed" in capsys.readouterr().out
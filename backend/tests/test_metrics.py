@@ -0,0 +1,64 @@
+from app.api.metrics import get_metrics
+from app.services.metrics import MetricsRegistry, metrics_registry
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    for value in (0.01, 0.2, 0.2, 3.0, 100.0):
+        registry.observe("llm_request_duration_seconds", value, prompt_name="p")
+
+    (histogram,) = registry.snapshot()["histograms"]
+
+    assert histogram["count"] == 5
+    assert histogram["buckets"]["0.05"] == 1
+    assert histogram["buckets"]["0.25"] == 3
+    assert histogram["buckets"]["5"] == 4
+    assert histogram["buckets"]["+Inf"] == 5
+
+
+def test_render_prometheus_includes_counters_histograms_and_labels() -> None:
+    registry = MetricsRegistry()
+    registry.inc("llm_requests_total", prompt_name="p", outcome="success")
+    registry.observe("llm_request_duration_seconds", 0.3, prompt_name="p")
+
+    text = registry.render_prometheus()
+
+    assert 'llm_requests_total{outcome="success",prompt_name="p"} 1' in text
+    assert 'llm_request_duration_seconds_bucket{prompt_name="p",le="0.5"} 1' in text
+    assert 'llm_request_duration_seconds_count{prompt_name="p"} 1' in text
+    assert "# TYPE llm_requests_total counter" in text
+    assert "# HELP llm_requests_total " in text
+    assert "# TYPE llm_request_duration_seconds histogram" in text
+
+
+def test_render_prometheus_exports_collectors_as_gauges() -> None:
+    registry = MetricsRegistry()
+    registry.register_collector(
+        "llm_rate_limits",
+        lambda: [
+            {"model": "gpt-a", "requests_available": 3.5, "tokens_per_minute": None},
+            {"model": "gpt-b", "requests_available": 10},
+        ],
+    )
+    registry.register_collector("pdf_cache", lambda: {"hits": 4, "disk": {"enabled": True}})
+
+    lines = registry.render_prometheus().splitlines()
+
+    assert lines.count("# TYPE llm_rate_limits_requests_available gauge") == 1
+    assert 'llm_rate_limits_requests_available{model="gpt-a"} 3.5' in lines
+    assert 'llm_rate_limits_requests_available{model="gpt-b"} 10' in lines
+    assert not any(line.startswith("llm_rate_limits_tokens_per_minute") for line in lines)
+    assert "pdf_cache_hits 4" in lines
+    assert "pdf_cache_disk_enabled 1" in lines
+
+
+def test_metrics_endpoint_serves_json_and_prometheus() -> None:
+    metrics_registry.register_collector("test_component", lambda: {"ready": True})
+    metrics_registry.inc("test_events_total")
+
+    snapshot = get_metrics()
+    prometheus = get_metrics(format="prometheus")
+
+    assert snapshot["test_component"] == {"ready": True}
+    assert any(counter["name"] == "test_events_total" for counter in snapshot["counters"])
+    assert "test_events_total" in prometheus.body.decode()
@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlmodel import Session, SQLModel
+
+from app.db import migrations
+from app.db.migrations import MIGRATIONS, pending_migrations, run_migrations, schema_migrations
+from app.db.session import build_engine
+from app.models import Plan90Days, PlanStatus, User
+
+
+def _legacy_engine(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for migration in MIGRATIONS:
+            for index in migration.create_indexes:
+                connection.execute(text(f"DROP INDEX {index.name}"))
+        connection.execute(text("CREATE INDEX ix_plan90days_user_id ON plan90days (user_id)"))
+        connection.execute(text("CREATE INDEX ix_checklistresult_plan_id ON checklistresult (plan_id)"))
+        connection.execute(text("CREATE INDEX ix_decision_user_id ON decision (user_id)"))
+    return engine
+
+
+def _index_names(engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_run_migrations_builds_composite_indexes_on_populated_tables(tmp_path) -> None:
+    engine = _legacy_engine(tmp_path)
+
+    with Session(engine) as session:
+        session.add(User(id=1))
+        session.add_all(Plan90Days(user_id=1, plan_json={}, status=PlanStatus.draft) for _ in range(50))
+        session.commit()
+
+    assert run_migrations(engine) == [1, 2]
+
+    assert _index_names(engine, "plan90days") == {
+        "ix_plan90days_user_id_status_created_at",
+        "ix_plan90days_user_id_created_at_id",
+    }
+    assert _index_names(engine, "checklistresult") == {"ix_checklistresult_plan_id_created_at_id"}
+    assert _index_names(engine, "decision") == {"ix_decision_user_id_created_at_id"}
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM plan90days WHERE user_id = 1 AND status = 'draft' "
+            "ORDER BY created_at DESC LIMIT 1"
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_plan90days_user_id_status_created_at" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_run_migrations_is_recorded_and_idempotent(tmp_path) -> None:
+    engine = _legacy_engine(tmp_path)
+
+    run_migrations(engine)
+
+    assert pending_migrations(engine) == []
+    assert run_migrations(engine) == []
+
+
+def test_migrations_claimed_by_a_concurrent_worker_are_skipped(tmp_path, monkeypatch) -> None:
+    engine = _legacy_engine(tmp_path)
+    real_pending = migrations.pending_migrations
+    other_worker: list[int] = []
+
+    def _pending_then_other_worker_applies(engine, migrations=MIGRATIONS):
+        pending = real_pending(engine, migrations)
+        # Another worker started at the same time and won every claim.
+        monkeypatch.setattr("app.db.migrations.pending_migrations", real_pending)
+        other_worker.extend(run_migrations(engine, migrations))
+        return pending
+
+    monkeypatch.setattr("app.db.migrations.pending_migrations", _pending_then_other_worker_applies)
+
+    assert run_migrations(engine) == []
+    assert other_worker == [1, 2]
+    with engine.connect() as connection:
+        assert list(connection.scalars(select(schema_migrations.c.version))) == [1, 2]
+
+
+def test_worker_losing_a_claim_leaves_later_versions_to_the_winner(tmp_path, monkeypatch) -> None:
+    engine = _legacy_engine(tmp_path)
+    real_apply = migrations._apply
+    building = threading.Event()
+    release = threading.Event()
+
+    def _slow_version_1(engine, migration):
+        if migration.version == 1:
+            building.set()
+            assert release.wait(timeout=5)
+        real_apply(engine, migration)
+
+    monkeypatch.setattr("app.db.migrations._apply", _slow_version_1)
+    first_worker: list[int] = []
+    thread = threading.Thread(target=lambda: first_worker.extend(run_migrations(engine)))
+    thread.start()
+    try:
+        assert building.wait(timeout=5)
+        # Version 1 is still being built: not applied, and not overtaken by version 2.
+        assert [migration.version for migration in pending_migrations(engine)] == [1, 2]
+        assert run_migrations(engine) == []
+    finally:
+        release.set()
+        thread.join(timeout=5)
+
+    assert first_worker == [1, 2]
+    assert pending_migrations(engine) == []
+
+
+def test_migrations_table_created_before_completed_at_is_upgraded(tmp_path) -> None:
+    engine = _legacy_engine(tmp_path)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, "
+                "applied_at DATETIME NOT NULL)"
+            )
+        )
+        connection.execute(text("INSERT INTO schema_migrations VALUES (1, 'indexes', '2024-01-01 00:00:00')"))
+
+    assert [migration.version for migration in pending_migrations(engine)] == [2]
+    assert run_migrations(engine) == [2]
+
+
+def test_failed_migration_is_retried_on_next_start(tmp_path, monkeypatch) -> None:
+    engine = _legacy_engine(tmp_path)
+    real_apply = migrations._apply
+
+    def _fail_on_version_2(engine, migration):
+        if migration.version == 2:
+            raise RuntimeError("index build interrupted")
+        real_apply(engine, migration)
+
+    monkeypatch.setattr("app.db.migrations._apply", _fail_on_version_2)
+    with pytest.raises(RuntimeError):
+        run_migrations(engine)
+
+    assert [migration.version for migration in pending_migrations(engine)] == [2]
+    monkeypatch.setattr("app.db.migrations._apply", real_apply)
+    assert run_migrations(engine) == [2]
@@ -0,0 +1,48 @@
+from app.services.pdf_cache import PdfCache, pdf_cache_key
+
+
+def test_pdf_cache_key_depends_on_plan_content_and_checklist() -> None:
+    key = pdf_cache_key({"objective": "A", "kpis": ["x"]}, 1)
+
+    assert key == pdf_cache_key({"kpis": ["x"], "objective": "A"}, 1)
+    assert key != pdf_cache_key({"objective": "B", "kpis": ["x"]}, 1)
+    assert key != pdf_cache_key({"objective": "A", "kpis": ["x"]}, 2)
+
+
+def test_memory_lru_is_bounded_by_bytes() -> None:
+    cache = PdfCache(max_bytes=25)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    assert cache.get("a") == b"a" * 10
+
+    cache.put("c", b"c" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats.memory_bytes == 20
+    assert cache.stats.evictions == 1
+
+
+def test_evicted_documents_spill_to_disk_and_are_promoted_back(tmp_path) -> None:
+    cache = PdfCache(max_bytes=15, spill_dir=tmp_path)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+
+    assert (tmp_path / "a.pdf").read_bytes() == b"a" * 10
+    assert cache.get("a") == b"a" * 10
+    assert cache.stats.disk_hits == 1
+    assert cache.get("a") == b"a" * 10
+    assert cache.stats.memory_hits == 1
+
+    # A fresh process starts from what was spilled.
+    assert PdfCache(max_bytes=15, spill_dir=tmp_path).get("b") == b"b" * 10
+
+
+def test_spill_directory_is_bounded_by_bytes(tmp_path) -> None:
+    cache = PdfCache(max_bytes=0, spill_dir=tmp_path, disk_max_bytes=25)
+    for key in "abc":
+        cache.put(key, key.encode() * 10)
+
+    assert sorted(path.name for path in tmp_path.glob("*.pdf")) == ["b.pdf", "c.pdf"]
+    assert cache.stats.disk_bytes == 20
+    assert cache.stats.disk_evictions == 1
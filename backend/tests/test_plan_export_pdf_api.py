@@ -1,21 +1,57 @@
+import asyncio
+import io
+import time
+import zipfile
+from datetime import datetime
+
 import pytest
 from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 pytest.importorskip("reportlab")
 
-from app.api.plan import export_plan_pdf
+from app.api.plan import (
+    PlanBulkExportRequest,
+    create_export_job,
+    evaluate_plan,
+    export_plan_pdf,
+    export_plans_zip,
+    get_export_job,
+)
 from app.models import ChecklistResult, Plan90Days, PlanStatus
+from app.services import export_jobs, pdf_render
+from app.services.pdf_archive import PdfArchiveEntry, stream_pdf_archive
+from app.services.pdf_cache import PdfCache, pdf_cache_key
+from app.services.pdf_export import build_render_context, generate_plan_pdf, get_render_context
+from app.services.pdf_render import PdfRenderer
+
+
+@pytest.fixture(autouse=True)
+def renderer(monkeypatch) -> PdfRenderer:
+    # Thread rendering and a private cache: no worker processes to spawn and
+    # no documents shared between tests.
+    test_renderer = PdfRenderer(processes=0, cache=PdfCache())
+    monkeypatch.setattr(pdf_render, "_default_renderer", test_renderer)
+    monkeypatch.setattr(export_jobs, "_default_store", None)
+    return test_renderer
 
 
-def _create_session() -> Session:
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-    return Session(engine)
+async def _create_session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    return AsyncSession(engine, expire_on_commit=False)
 
 
 def test_export_pdf_returns_403_when_plan_not_approved() -> None:
-    with _create_session() as session:
+    asyncio.run(_export_unapproved_plan())
+
+
+async def _export_unapproved_plan() -> None:
+    async with await _create_session() as session:
         plan = Plan90Days(
             user_id=1,
             status=PlanStatus.draft,
@@ -27,17 +63,21 @@ def test_export_pdf_returns_403_when_plan_not_approved() -> None:
             },
         )
         session.add(plan)
-        session.commit()
-        session.refresh(plan)
+        await session.commit()
+        await session.refresh(plan)
 
         with pytest.raises(HTTPException) as exc_info:
-            export_plan_pdf(plan.id or 0, session)
+            await export_plan_pdf(plan.id or 0, session)
 
         assert exc_info.value.status_code == 403
 
 
 def test_export_pdf_returns_pdf_when_plan_approved() -> None:
-    with _create_session() as session:
+    asyncio.run(_export_approved_plan())
+
+
+async def _export_approved_plan() -> None:
+    async with await _create_session() as session:
         plan = Plan90Days(
             user_id=1,
             status=PlanStatus.approved,
@@ -53,8 +93,8 @@ def test_export_pdf_returns_pdf_when_plan_approved() -> None:
             },
         )
         session.add(plan)
-        session.commit()
-        session.refresh(plan)
+        await session.commit()
+        await session.refresh(plan)
 
         session.add(
             ChecklistResult(
@@ -69,10 +109,282 @@ def test_export_pdf_returns_pdf_when_plan_approved() -> None:
                 feedback="Good plan.",
             )
         )
-        session.commit()
+        await session.commit()
 
-        response = export_plan_pdf(plan.id or 0, session)
+        response = await export_plan_pdf(plan.id or 0, session)
 
         assert response.status_code == 200
         assert response.media_type == "application/pdf"
         assert response.body.startswith(b"%PDF")
+
+
+def test_export_pdf_serves_cache_and_answers_conditional_requests(renderer: PdfRenderer) -> None:
+    asyncio.run(_export_twice_then_revalidate())
+    assert renderer.stats.renders == 1
+    assert renderer.stats.cache_hits == 2
+
+
+async def _export_twice_then_revalidate() -> None:
+    async with await _create_session() as session:
+        plan = Plan90Days(
+            user_id=1,
+            status=PlanStatus.approved,
+            plan_json={"objective": "Cache me", "monthly_objectives": [], "kpis": [], "risks": []},
+        )
+        session.add(plan)
+        await session.commit()
+        await session.refresh(plan)
+
+        first = await export_plan_pdf(plan.id or 0, session)
+        second = await export_plan_pdf(plan.id or 0, session)
+        etag = first.headers["etag"]
+        not_modified = await export_plan_pdf(plan.id or 0, session, if_none_match=f"W/{etag}")
+        changed = await export_plan_pdf(plan.id or 0, session, if_none_match='"stale"')
+
+        assert second.body == first.body
+        assert second.headers["etag"] == etag
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+        assert changed.status_code == 200
+
+
+async def _approved_plan(session: AsyncSession, objective: str) -> Plan90Days:
+    plan = Plan90Days(
+        user_id=1,
+        status=PlanStatus.approved,
+        plan_json={"objective": objective, "monthly_objectives": [], "kpis": [], "risks": []},
+    )
+    session.add(plan)
+    await session.commit()
+    await session.refresh(plan)
+    return plan
+
+
+def test_export_job_renders_in_background_and_serves_the_pdf() -> None:
+    asyncio.run(_run_export_job())
+
+
+async def _run_export_job() -> None:
+    async with await _create_session() as session:
+        plan = await _approved_plan(session, "Job export")
+
+        job = await create_export_job(plan.id or 0, session)
+        pending = await get_export_job(job.job_id)
+        await export_jobs.get_export_jobs().get(job.job_id).task
+        done = await get_export_job(job.job_id)
+
+        assert job.status == "pending"
+        assert job.result_url == f"/export-jobs/{job.job_id}"
+        assert pending.status_code == 202
+        assert done.status_code == 200
+        assert done.body.startswith(b"%PDF")
+        assert done.headers["etag"] == f'"{pdf_cache_key(plan.plan_json, None)}"'
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_export_job("unknown")
+        assert exc_info.value.status_code == 404
+
+
+def test_export_job_rejects_unapproved_plan() -> None:
+    async def _scenario() -> None:
+        async with await _create_session() as session:
+            plan = Plan90Days(user_id=1, status=PlanStatus.draft, plan_json={})
+            session.add(plan)
+            await session.commit()
+            await session.refresh(plan)
+            with pytest.raises(HTTPException) as exc_info:
+                await create_export_job(plan.id or 0, session)
+            assert exc_info.value.status_code == 403
+
+    asyncio.run(_scenario())
+
+
+def test_process_pool_renderer_coalesces_identical_renders() -> None:
+    async def _scenario() -> list[bytes]:
+        renderer = PdfRenderer(processes=1, cache=PdfCache())
+        plan_json = {"objective": "Process pool", "monthly_objectives": [], "kpis": [], "risks": []}
+        checklist = ChecklistResult(id=7, plan_id=1, verdict="approved", feedback="OK")
+        key = pdf_cache_key(plan_json, checklist.id)
+        try:
+            return await asyncio.gather(*(renderer.render(key, plan_json, checklist) for _ in range(3))), renderer
+        finally:
+            renderer.close()
+
+    pdfs, renderer = asyncio.run(_scenario())
+
+    assert pdfs[0].startswith(b"%PDF")
+    assert pdfs[0] == pdfs[1] == pdfs[2]
+    assert renderer.stats.renders == 1
+    assert renderer.single_flight.stats.coalesced == 2
+
+
+def test_shared_render_context_renders_the_same_document() -> None:
+    plan_json = {"objective": "Contexte partagé", "monthly_objectives": [], "kpis": ["k"], "risks": ["r"]}
+
+    assert get_render_context() is get_render_context()
+    assert generate_plan_pdf(plan_json, None) == generate_plan_pdf(plan_json, None, build_render_context())
+
+
+APPROVABLE_PLAN = {
+    "objective": "Décrocher un poste de data analyst en trois mois",
+    "monthly_objectives": [
+        {"month": 1, "objective": "Clarifier le positionnement cible", "deliverables": ["CV ciblé data"]},
+        {"month": 2, "objective": "Prospecter les entreprises visées", "deliverables": ["20 candidatures envoyées"]},
+        {"month": 3, "objective": "Préparer et passer les entretiens", "deliverables": ["3 simulations d'entretien"]},
+    ],
+    "kpis": ["5 entretiens obtenus", "1 offre signée"],
+    "risks": ["Manque de temps disponible"],
+}
+
+
+def test_approval_prerenders_the_pdf_for_the_first_download(renderer: PdfRenderer, tmp_path) -> None:
+    renderer.cache = PdfCache(spill_dir=tmp_path)
+    asyncio.run(_approve_then_download(renderer))
+
+    assert renderer.stats.renders == 1
+    assert renderer.stats.prerenders == 1
+    assert renderer.stats.cache_hits == 1
+    assert len(list(tmp_path.glob("*.pdf"))) == 1
+
+
+async def _approve_then_download(renderer: PdfRenderer) -> None:
+    async with await _create_session() as session:
+        plan = Plan90Days(user_id=1, status=PlanStatus.draft, plan_json=APPROVABLE_PLAN)
+        session.add(plan)
+        await session.commit()
+        await session.refresh(plan)
+
+        evaluation = await evaluate_plan(plan.id or 0, session)
+        assert evaluation.status == PlanStatus.approved
+        await asyncio.gather(*renderer._background)
+
+        response = await export_plan_pdf(plan.id or 0, session)
+        assert response.body.startswith(b"%PDF")
+
+
+def test_download_during_prerender_waits_for_it(renderer: PdfRenderer) -> None:
+    async def _scenario() -> bytes:
+        key = pdf_cache_key(APPROVABLE_PLAN, None)
+        renderer.prerender(key, APPROVABLE_PLAN, None)
+        return await renderer.render(key, APPROVABLE_PLAN, None)
+
+    pdf = asyncio.run(_scenario())
+
+    assert pdf.startswith(b"%PDF")
+    assert renderer.stats.renders == 1
+    assert renderer.single_flight.stats.coalesced == 1
+
+
+def test_bulk_export_streams_a_zip_of_the_plan_pdfs(renderer: PdfRenderer) -> None:
+    async def _scenario() -> tuple[list[Plan90Days], list[bytes], bytes]:
+        async with await _create_session() as session:
+            plans = [await _approved_plan(session, f"Plan {index}") for index in range(5)]
+            cached = await export_plan_pdf(plans[0].id or 0, session)
+            plan_ids = [plan.id or 0 for plan in reversed(plans)] + [plans[0].id or 0]
+            response = await export_plans_zip(PlanBulkExportRequest(plan_ids=plan_ids), session)
+            assert response.media_type == "application/zip"
+            chunks = [chunk async for chunk in response.body_iterator]
+            return plans, chunks, cached.body
+
+    plans, chunks, cached_pdf = asyncio.run(_scenario())
+
+    # One chunk per document, then the central directory.
+    assert len(chunks) == len(plans) + 1
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert archive.namelist() == [f"plan-{plan.id}-decision-grade.pdf" for plan in reversed(plans)]
+    assert archive.read(f"plan-{plans[0].id}-decision-grade.pdf") == cached_pdf
+    assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+    assert renderer.stats.renders == len(plans)
+    assert renderer.stats.cache_hits == 1
+
+
+def test_bulk_export_checks_every_plan_before_streaming() -> None:
+    async def _scenario() -> None:
+        async with await _create_session() as session:
+            approved = await _approved_plan(session, "Approuvé")
+            draft = Plan90Days(user_id=1, status=PlanStatus.draft, plan_json={})
+            session.add(draft)
+            await session.commit()
+            await session.refresh(draft)
+
+            for plan_ids, status_code in (
+                ([], 400),
+                ([approved.id or 0, 999], 404),
+                ([approved.id or 0, draft.id or 0], 403),
+            ):
+                with pytest.raises(HTTPException) as exc_info:
+                    await export_plans_zip(PlanBulkExportRequest(plan_ids=plan_ids), session)
+                assert exc_info.value.status_code == status_code
+
+    asyncio.run(_scenario())
+
+
+def test_bulk_export_renders_ahead_within_the_concurrency_bound(renderer: PdfRenderer, monkeypatch) -> None:
+    started: list[str] = []
+    original_render = renderer.render
+
+    async def _tracking_render(cache_key, plan_json, checklist_result, **kwargs):
+        started.append(cache_key)
+        return await original_render(cache_key, plan_json, checklist_result, **kwargs)
+
+    monkeypatch.setattr(renderer, "render", _tracking_render)
+    entries = [
+        PdfArchiveEntry(
+            filename=f"{index}.pdf",
+            cache_key=pdf_cache_key({"objective": str(index)}, None),
+            plan_json={"objective": str(index)},
+            checklist_result=None,
+            modified_at=datetime(2026, 1, 1),
+        )
+        for index in range(6)
+    ]
+
+    async def _scenario() -> int:
+        stream = stream_pdf_archive(renderer, entries, concurrency=2)
+        await stream.__anext__()
+        await asyncio.sleep(0)
+        # The first document is out: only the next window has been started.
+        scheduled = len(started)
+        await stream.aclose()
+        return scheduled
+
+    scheduled = asyncio.run(_scenario())
+
+    assert scheduled == 3
+    assert renderer.stats.renders < len(entries)
+
+
+def test_closing_the_archive_does_not_cancel_a_shared_render(renderer: PdfRenderer, monkeypatch) -> None:
+    render_document = pdf_render._render_document
+
+    def _slow_render_document(plan_json, checklist_values):
+        # Entry 1 is still rendering once entry 0 has been streamed.
+        time.sleep(0.5 if plan_json["objective"].endswith("1") else 0.01)
+        return render_document(plan_json, checklist_values)
+
+    monkeypatch.setattr(pdf_render, "_render_document", _slow_render_document)
+    entries = [
+        PdfArchiveEntry(
+            filename=f"{index}.pdf",
+            cache_key=pdf_cache_key({"objective": f"partagé {index}"}, None),
+            plan_json={"objective": f"partagé {index}"},
+            checklist_result=None,
+            modified_at=datetime(2026, 1, 1),
+        )
+        for index in range(3)
+    ]
+
+    async def _scenario() -> bytes:
+        stream = stream_pdf_archive(renderer, entries, concurrency=2)
+        await stream.__anext__()
+        # A single download joins the render the archive started for entry 1...
+        download = asyncio.ensure_future(renderer.render(entries[1].cache_key, entries[1].plan_json, None))
+        await asyncio.sleep(0)
+        assert renderer.single_flight.stats.coalesced == 1
+        # ...then the archive client disconnects.
+        await stream.aclose()
+        return await download
+
+    assert asyncio.run(_scenario()).startswith(b"%PDF")
+    assert renderer.cache.get(entries[1].cache_key) is not None
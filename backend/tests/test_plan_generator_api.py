@@ -1,8 +1,13 @@
+import asyncio
+import json
+
 import pytest
 from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.plan import PlanGenerateRequest, evaluate_plan, generate_plan
+from app.api import plan as plan_api
+from app.api.plan import PlanGenerateRequest, evaluate_plan, generate_plan, generate_plan_stream
 from app.models import ChecklistResult, Plan90Days, PlanStatus
 from app.services.plan_generator import (
     FORBIDDEN_DELIVERABLE_TERMS,
@@ -11,14 +16,6 @@ from app.services.plan_generator import (
 )
 
 
-@pytest.fixture()
-def session() -> Session:
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as db_session:
-        yield db_session
-
-
 def _build_payload() -> PlanGenerateRequest:
     return PlanGenerateRequest(
         context={
@@ -50,25 +47,25 @@ def test_generate_plan_90_days_schema_and_forbidden_words() -> None:
             assert not any(term in deliverable.casefold() for term in FORBIDDEN_DELIVERABLE_TERMS)
 
 
-def test_generate_plan_requires_payload_values(session: Session) -> None:
+def test_generate_plan_requires_payload_values(session: AsyncSession) -> None:
     request = PlanGenerateRequest(context={}, chosen_option="  ")
 
     with pytest.raises(HTTPException) as exc_info:
-        generate_plan(request, session)
+        asyncio.run(generate_plan(request, session))
 
     assert exc_info.value.status_code == 400
 
 
-def test_generate_plan_persists_draft_plan(session: Session) -> None:
+def test_generate_plan_persists_draft_plan(session: AsyncSession) -> None:
     request = _build_payload()
 
-    response = generate_plan(request, session)
+    response = asyncio.run(generate_plan(request, session))
 
     assert response.plan_id > 0
     assert response.status == PlanStatus.draft
     assert set(response.plan.keys()) == {"objective", "monthly_objectives", "kpis", "risks"}
 
-    plans = session.exec(select(Plan90Days)).all()
+    plans = asyncio.run(session.exec(select(Plan90Days))).all()
     assert len(plans) == 1
 
     stored = plans[0]
@@ -77,7 +74,7 @@ def test_generate_plan_persists_draft_plan(session: Session) -> None:
     assert len(stored.plan_json["monthly_objectives"]) == 3
 
 
-def test_evaluate_plan_rejects_bad_plan_and_persists_checklist(session: Session) -> None:
+def test_evaluate_plan_rejects_bad_plan_and_persists_checklist(session: AsyncSession) -> None:
     bad_plan = Plan90Days(
         user_id=1,
         status=PlanStatus.draft,
@@ -89,20 +86,20 @@ def test_evaluate_plan_rejects_bad_plan_and_persists_checklist(session: Session)
         },
     )
     session.add(bad_plan)
-    session.commit()
-    session.refresh(bad_plan)
+    asyncio.run(session.commit())
+    asyncio.run(session.refresh(bad_plan))
 
-    response = evaluate_plan(bad_plan.id or 0, session)
+    response = asyncio.run(evaluate_plan(bad_plan.id or 0, session))
 
     assert response.verdict == "rejected"
     assert response.status == PlanStatus.rejected
     assert response.checklist_result_id > 0
 
-    stored_plan = session.get(Plan90Days, bad_plan.id)
+    stored_plan = asyncio.run(session.get(Plan90Days, bad_plan.id))
     assert stored_plan is not None
     assert stored_plan.status == PlanStatus.rejected
 
-    checklist_results = session.exec(select(ChecklistResult)).all()
+    checklist_results = asyncio.run(session.exec(select(ChecklistResult))).all()
     assert len(checklist_results) == 1
     checklist = checklist_results[0]
     assert checklist.verdict == "rejected"
@@ -111,11 +108,66 @@ def test_evaluate_plan_rejects_bad_plan_and_persists_checklist(session: Session)
     assert "Plan rejeté" in checklist.feedback
 
 
-def test_evaluate_plan_never_returns_partial_verdict(session: Session) -> None:
+def test_evaluate_plan_never_returns_partial_verdict(session: AsyncSession) -> None:
     request = _build_payload()
-    generated = generate_plan(request, session)
+    generated = asyncio.run(generate_plan(request, session))
 
-    response = evaluate_plan(generated.plan_id, session)
+    response = asyncio.run(evaluate_plan(generated.plan_id, session))
 
     assert response.verdict in {"approved", "rejected"}
     assert response.verdict != "partial"
+
+
+def test_evaluate_plan_returns_404_when_plan_is_deleted_concurrently(session: AsyncSession, monkeypatch) -> None:
+    generated = asyncio.run(generate_plan(_build_payload(), session))
+    update_returning = plan_api.update_returning
+
+    async def _deleted_meanwhile(write_session, model, row_id, **values):
+        # The retention task removes the plan between the read and the write.
+        await write_session.exec(delete(Plan90Days).where(Plan90Days.id == row_id))
+        return await update_returning(write_session, model, row_id, **values)
+
+    monkeypatch.setattr(plan_api, "update_returning", _deleted_meanwhile)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(evaluate_plan(generated.plan_id, session))
+
+    assert exc_info.value.status_code == 404
+    asyncio.run(session.rollback())
+    assert asyncio.run(session.exec(select(ChecklistResult))).all() == []
+
+
+def test_generate_plan_stream_emits_months_then_persists(session: AsyncSession) -> None:
+    response = asyncio.run(generate_plan_stream(_build_payload(), session))
+
+    async def _read_events() -> list[dict]:
+        return [json.loads(chunk) async for chunk in response.body_iterator]
+
+    events = asyncio.run(_read_events())
+
+    assert response.media_type == "application/x-ndjson"
+    assert [event["event"] for event in events] == ["month", "month", "month", "done"]
+    assert [event["data"]["month"] for event in events[:3]] == [1, 2, 3]
+
+    done = events[-1]["data"]
+    stored = asyncio.run(session.get(Plan90Days, done["plan_id"]))
+    assert stored is not None
+    assert stored.status == PlanStatus.draft
+    assert stored.plan_json == done["plan"]
+    assert stored.plan_json["monthly_objectives"] == [event["data"] for event in events[:3]]
+
+
+def test_generate_plan_stream_ends_with_error_when_persisting_fails(session: AsyncSession, monkeypatch) -> None:
+    async def _failing_commit() -> None:
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(session, "commit", _failing_commit)
+    response = asyncio.run(generate_plan_stream(_build_payload(), session))
+
+    async def _read_events() -> list[dict]:
+        return [json.loads(chunk) async for chunk in response.body_iterator]
+
+    events = asyncio.run(_read_events())
+
+    assert [event["event"] for event in events] == ["month", "month", "month", "error"]
+    assert events[-1]["data"]["detail"] == "Impossible d'enregistrer le plan."
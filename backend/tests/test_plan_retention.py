@@ -0,0 +1,167 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, SQLModel, select
+
+from app.core.config import Settings
+from app.db import retention
+from app.db.retention import RetentionPolicy, compact_plans
+from app.db.session import build_engine
+from app.models import ChecklistResult, Plan90Days, PlanStatus, User
+from app.services.metrics import metrics_registry
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def _engine(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _seed(engine, *, drafts_per_user: int = 4, payload: str = "") -> None:
+    with Session(engine) as session:
+        for user_id in (1, 2):
+            session.add(User(id=user_id))
+            for index in range(drafts_per_user):
+                session.add(
+                    Plan90Days(
+                        user_id=user_id,
+                        plan_json={"draft": index, "payload": payload},
+                        created_at=NOW - timedelta(days=drafts_per_user - index),
+                    )
+                )
+        old_rejected = Plan90Days(user_id=1, plan_json={}, status=PlanStatus.rejected, created_at=NOW - timedelta(days=60))
+        recent_rejected = Plan90Days(user_id=1, plan_json={}, status=PlanStatus.rejected, created_at=NOW - timedelta(days=2))
+        approved = Plan90Days(user_id=1, plan_json={}, status=PlanStatus.approved, created_at=NOW - timedelta(days=365))
+        session.add_all([old_rejected, recent_rejected, approved])
+        session.flush()
+        for plan in (old_rejected, recent_rejected, approved):
+            session.add(
+                ChecklistResult(
+                    plan_id=plan.id, verdict=plan.status.value, feedback="Retour", created_at=plan.created_at
+                )
+            )
+        session.commit()
+
+
+def _remaining(engine) -> list[tuple[int, str, dict]]:
+    with Session(engine) as session:
+        plans = session.exec(select(Plan90Days).order_by(Plan90Days.id)).all()
+        return [(plan.user_id, plan.status.value, plan.plan_json.get("draft")) for plan in plans]
+
+
+def test_compact_plans_keeps_latest_drafts_recent_rejected_and_approved(tmp_path) -> None:
+    engine = _engine(tmp_path)
+    _seed(engine)
+    metrics_registry.reset()
+
+    stats = compact_plans(engine, RetentionPolicy(keep_drafts=2, rejected_ttl_days=30, batch_size=1), now=NOW)
+
+    assert (stats.drafts_deleted, stats.rejected_deleted, stats.checklist_results_deleted) == (4, 1, 1)
+    assert _remaining(engine) == [
+        (1, "draft", 2),
+        (1, "draft", 3),
+        (2, "draft", 2),
+        (2, "draft", 3),
+        (1, "rejected", None),
+        (1, "approved", None),
+    ]
+    with Session(engine) as session:
+        assert len(session.exec(select(ChecklistResult)).all()) == 2
+    assert metrics_registry.counter_value("plan_retention_rows_deleted_total", table="plan90days", reason="draft") == 4
+    assert "plan_retention" in metrics_registry.snapshot()
+
+
+def test_compact_plans_archives_deleted_rows_as_ndjson(tmp_path) -> None:
+    engine = _engine(tmp_path)
+    _seed(engine, drafts_per_user=1)
+    archive = tmp_path / "archive.ndjson"
+
+    stats = compact_plans(
+        engine,
+        RetentionPolicy(keep_drafts=1, rejected_ttl_days=30, archive_path=str(archive)),
+        now=NOW,
+    )
+
+    records = [json.loads(line) for line in archive.read_text(encoding="utf-8").splitlines()]
+    assert stats.rows_archived == 2
+    assert [record["table"] for record in records] == ["plan90days", "checklistresult"]
+    assert records[0]["row"]["status"] == "rejected"
+
+
+def test_compact_plans_ages_rejected_plans_from_their_rejection(tmp_path) -> None:
+    engine = _engine(tmp_path)
+    with Session(engine) as session:
+        session.add(User(id=1))
+        plan = Plan90Days(user_id=1, plan_json={}, status=PlanStatus.rejected, created_at=NOW - timedelta(days=60))
+        session.add(plan)
+        session.flush()
+        session.add(ChecklistResult(plan_id=plan.id, verdict="rejected", feedback="Retour", created_at=NOW - timedelta(days=2)))
+        session.commit()
+
+    stats = compact_plans(engine, RetentionPolicy(keep_drafts=0, rejected_ttl_days=30), now=NOW)
+
+    assert stats.rejected_deleted == 0
+    assert _remaining(engine) == [(1, "rejected", None)]
+
+
+def test_compact_plans_leaves_plans_evaluated_during_the_batch_alone(tmp_path, monkeypatch) -> None:
+    engine = _engine(tmp_path)
+    _seed(engine, drafts_per_user=2)
+    archive = tmp_path / "archive.ndjson"
+    expired_drafts = retention._expired_drafts
+
+    def _evaluated_after_selection(keep):
+        next_ids = expired_drafts(keep)
+
+        def _next_ids(connection, limit):
+            ids = next_ids(connection, limit)
+            # The first candidate is approved between its selection and its deletion.
+            if ids:
+                connection.execute(
+                    Plan90Days.__table__.update().where(Plan90Days.id == ids[0]).values(status=PlanStatus.approved)
+                )
+                connection.execute(
+                    ChecklistResult.__table__.insert().values(
+                        plan_id=ids[0], verdict="approved", feedback="Retour", created_at=NOW
+                    )
+                )
+            return ids
+
+        return _next_ids
+
+    monkeypatch.setattr(retention, "_expired_drafts", _evaluated_after_selection)
+
+    stats = compact_plans(
+        engine, RetentionPolicy(keep_drafts=1, rejected_ttl_days=0, archive_path=str(archive)), now=NOW
+    )
+
+    records = [json.loads(line) for line in archive.read_text(encoding="utf-8").splitlines()]
+    assert stats.drafts_deleted == 1
+    assert [record["row"]["status"] for record in records] == ["draft"]
+    with Session(engine) as session:
+        approved_drafts = session.exec(select(Plan90Days).where(Plan90Days.status == PlanStatus.approved)).all()
+        kept = [plan for plan in approved_drafts if plan.plan_json.get("draft") is not None]
+        assert len(kept) == 1
+        assert session.exec(select(ChecklistResult).where(ChecklistResult.plan_id == kept[0].id)).all()
+
+
+def test_compact_plans_returns_freed_pages_incrementally(tmp_path) -> None:
+    engine = _engine(tmp_path)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+    _seed(engine, drafts_per_user=50, payload="x" * 4000)
+
+    stats = compact_plans(engine, RetentionPolicy(keep_drafts=1, vacuum_pages=10_000), now=NOW)
+
+    assert stats.drafts_deleted == 98
+    assert stats.pages_vacuumed > 0
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA freelist_count").scalar() == 0
+
+
+def test_retention_policy_reads_settings() -> None:
+    policy = RetentionPolicy.from_settings(Settings(db_retention_keep_drafts=3, db_retention_rejected_ttl_days=0))
+
+    assert (policy.keep_drafts, policy.rejected_ttl_days) == (3, 0)
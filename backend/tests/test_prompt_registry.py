@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services.prompt_registry import PromptRegistry
+
+
+def _write_prompt(directory: Path, name: str, text: str, mtime_ns: int) -> Path:
+    path = directory / f"{name}.md"
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_registry_preloads_templates_with_hash_and_version(tmp_path: Path) -> None:
+    _write_prompt(tmp_path, "pinned", "<!-- version: 2024-06 -->\nBe concise.", 1_000)
+    _write_prompt(tmp_path, "unpinned", "Be structured.", 1_000)
+    registry = PromptRegistry(tmp_path)
+
+    loaded = registry.load()
+
+    assert set(loaded) == {"pinned", "unpinned"}
+    assert registry.get("pinned.md").version == "2024-06"
+    unpinned = registry.get("unpinned")
+    assert unpinned.version == unpinned.content_hash[:12]
+    assert len(unpinned.content_hash) == 64
+
+
+def test_registry_serves_from_memory_without_hot_reload(tmp_path: Path) -> None:
+    path = _write_prompt(tmp_path, "system", "v1", 1_000)
+    registry = PromptRegistry(tmp_path)
+    registry.load()
+
+    path.unlink()
+
+    assert registry.get("system").text == "v1"
+    with pytest.raises(FileNotFoundError):
+        registry.get("missing")
+
+
+def test_registry_hot_reloads_on_mtime_change(tmp_path: Path) -> None:
+    _write_prompt(tmp_path, "system", "v1", 1_000)
+    registry = PromptRegistry(tmp_path, hot_reload=True)
+    first = registry.get("system")
+
+    _write_prompt(tmp_path, "system", "v2", 2_000)
+    second = registry.get("system")
+
+    assert second.text == "v2"
+    assert second.content_hash != first.content_hash
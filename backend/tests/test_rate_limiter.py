@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rate_limiter import ModelRateLimiter, RateLimiterRegistry, RateLimitExceeded, estimate_tokens
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_estimate_tokens_is_roughly_four_chars_per_token() -> None:
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("a" * 40) == 10
+
+
+def test_reservations_queue_in_arrival_order() -> None:
+    clock = _Clock()
+    limiter = ModelRateLimiter("gpt-4o-mini", requests_per_minute=60, clock=clock)
+    limiter._requests.level = 1
+
+    waits = [limiter._reserve(10) for _ in range(3)]
+
+    assert waits == [0.0, pytest.approx(1.0), pytest.approx(2.0)]
+    assert limiter.stats.throttled == 2
+
+
+def test_record_usage_charges_actual_tokens() -> None:
+    clock = _Clock()
+    limiter = ModelRateLimiter("gpt-4o-mini", tokens_per_minute=1000, clock=clock)
+
+    limiter.acquire(100)
+    limiter.record_usage(100, SimpleNamespace(input_tokens=120, output_tokens=280))
+    budget = limiter.budget()
+
+    assert budget["tokens_available"] == pytest.approx(600)
+    assert budget["tokens_last_minute"] == 400
+    assert budget["requests_last_minute"] == 1
+    assert budget["output_tokens"] == 280
+
+    clock.now = 61.0
+    assert limiter.budget()["tokens_last_minute"] == 0
+
+
+def test_max_wait_fails_fast_without_consuming_budget() -> None:
+    limiter = ModelRateLimiter("gpt-4o-mini", tokens_per_minute=60, max_wait_s=1.0, clock=_Clock())
+
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(1000)
+
+    assert limiter.stats.requests == 0
+
+
+def test_registry_shares_limiters_and_skips_unlimited_models() -> None:
+    registry = RateLimiterRegistry(model_limits={"gpt-4o-mini": {"rpm": 10}})
+
+    assert registry.for_model("gpt-4o-mini") is registry.for_model("gpt-4o-mini")
+    assert registry.for_model("gpt-4o") is None
@@ -0,0 +1,94 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.context import CareerContextUpsertRequest, upsert_context
+from app.api.plan import PlanGenerateRequest, generate_plan
+from app.db import count_queries
+from app.db.repository import ensure_user, save_latest_draft_plan
+from app.models import CareerContext, Plan90Days, User
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def _context_payload(goal: str) -> CareerContextUpsertRequest:
+    return CareerContextUpsertRequest(
+        primary_goal=goal,
+        success_definition="Avoir une offre signée",
+        constraints={"temps": "10h/semaine"},
+    )
+
+
+def test_write_endpoints_use_one_statement_per_row_once_user_is_known() -> None:
+    async def _scenario() -> list[int]:
+        engine = await _engine()
+        counts = []
+        for _ in range(2):
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                with count_queries(engine) as statements:
+                    await generate_plan(PlanGenerateRequest(context={"a": 1}, chosen_option="A"), session)
+                counts.append(len(statements))
+        await engine.dispose()
+        return counts
+
+    # First call: user INSERT ... ON CONFLICT, plan INSERT ... RETURNING, COMMIT.
+    assert asyncio.run(_scenario()) == [3, 2]
+
+
+def test_upsert_context_overwrites_in_place() -> None:
+    async def _scenario() -> tuple[list[CareerContext], CareerContext, CareerContext]:
+        engine = await _engine()
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            first = await upsert_context(_context_payload("Premier objectif"), session)
+            second = await upsert_context(_context_payload("Second objectif"), session)
+            rows = (await session.exec(select(CareerContext))).all()
+        await engine.dispose()
+        return rows, first, second
+
+    rows, first, second = asyncio.run(_scenario())
+
+    assert len(rows) == 1
+    assert second.primary_goal == "Second objectif"
+    assert first is second
+
+
+def test_ensure_user_is_retried_after_rollback() -> None:
+    async def _scenario() -> list[User]:
+        engine = await _engine()
+        async with AsyncSession(engine) as session:
+            await ensure_user(session, 7)
+            await session.rollback()
+        async with AsyncSession(engine) as session:
+            await ensure_user(session, 7)
+            await session.commit()
+            users = (await session.exec(select(User))).all()
+        await engine.dispose()
+        return users
+
+    assert [user.id for user in asyncio.run(_scenario())] == [7]
+
+
+def test_save_latest_draft_plan_updates_newest_draft() -> None:
+    async def _scenario() -> tuple[Plan90Days, Plan90Days, int]:
+        engine = await _engine()
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            created = await save_latest_draft_plan(session, 1, {"version": 1})
+            updated = await save_latest_draft_plan(session, 1, {"version": 2})
+            await session.commit()
+            total = len((await session.exec(select(Plan90Days))).all())
+        await engine.dispose()
+        return created, updated, total
+
+    created, updated, total = asyncio.run(_scenario())
+
+    assert updated.id == created.id
+    assert updated.plan_json == {"version": 2}
+    assert total == 1
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_threads_share_leader_result() -> None:
+    flight = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def _work() -> dict:
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return {"value": 1}
+
+    results: list = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", _work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", _work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == 1
+    assert results == [{"value": 1}] * 4
+    assert flight.stats.coalesced == 3
+    assert flight.in_flight == 0
+
+
+def test_async_follower_receives_thread_leader_exception() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def _fail() -> None:
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    leader = threading.Thread(target=lambda: pytest.raises(RuntimeError, flight.do, "key", _fail))
+    leader.start()
+    started.wait()
+
+    async def _never() -> None:
+        raise AssertionError("follower must not execute")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(flight.ado("key", _never))
+    leader.join()
+
+    assert flight.stats.leaders == 1
+    assert flight.stats.coalesced == 1
+
+
+def test_cancelled_async_leader_still_serves_followers() -> None:
+    flight = SingleFlight()
+    calls = 0
+
+    async def _work() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    async def _scenario() -> list:
+        leader = asyncio.ensure_future(flight.ado("key", _work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.ado("key", _work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        # A cancelled follower does not affect the others either.
+        followers[0].cancel()
+        results = await asyncio.gather(leader, *followers, return_exceptions=True)
+        return results
+
+    leader_result, cancelled_follower, follower_result = asyncio.run(_scenario())
+
+    assert isinstance(leader_result, asyncio.CancelledError)
+    assert isinstance(cancelled_follower, asyncio.CancelledError)
+    assert follower_result == {"value": 1}
+    assert calls == 1
+    assert flight.in_flight == 0
+
+
+def test_follower_takes_over_when_the_shared_work_is_cancelled() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+    leader_loop: list[asyncio.AbstractEventLoop] = []
+
+    async def _hang() -> str:
+        started.set()
+        await asyncio.sleep(10)
+        return "never"
+
+    async def _leader() -> None:
+        leader_loop.append(asyncio.get_running_loop())
+        with pytest.raises(asyncio.CancelledError):
+            await flight.ado("key", _hang)
+
+    def _run_leader() -> None:
+        asyncio.run(_leader())
+
+    leader = threading.Thread(target=_run_leader)
+    leader.start()
+    started.wait()
+
+    async def _retry() -> str:
+        return "follower"
+
+    async def _follower() -> str:
+        waiting = asyncio.ensure_future(flight.ado("key", _retry))
+        await asyncio.sleep(0.02)
+        # Cancel every task of the leader's loop, the shared work included.
+        leader_loop[0].call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(leader_loop[0])])
+        return await waiting
+
+    assert asyncio.run(_follower()) == "follower"
+    leader.join()
+    assert flight.stats.leaders == 2
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.decision import DecisionChooseRequest, decision_choose
+from app.db import write_behind
+from app.db.repository import insert_returning
+from app.db.write_behind import WriteBehindQueue
+from app.models import Decision
+
+
+def _decision(index: int) -> Decision:
+    return Decision(user_id=1, options=["A", "B"], chosen_option="A", abandoned_options=["B"], justification=f"#{index}")
+
+
+async def _queue(tmp_path, **kwargs) -> tuple[WriteBehindQueue, object]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    queue = WriteBehindQueue(lambda: AsyncSession(engine, expire_on_commit=False), **kwargs)
+    return queue, engine
+
+
+async def _stored_justifications(engine) -> list[str]:
+    async with AsyncSession(engine) as session:
+        return sorted((await session.exec(select(Decision.justification))).all())
+
+
+def test_concurrent_writes_share_group_commits(tmp_path) -> None:
+    async def _scenario():
+        queue, engine = await _queue(tmp_path, max_batch=50, max_delay_s=0.05)
+        decisions = await asyncio.gather(
+            *(queue.submit(lambda session, i=i: insert_returning(session, _decision(i))) for i in range(20))
+        )
+        await queue.close()
+        stored = await _stored_justifications(engine)
+        await engine.dispose()
+        return queue.stats, decisions, stored
+
+    stats, decisions, stored = asyncio.run(_scenario())
+
+    assert len({decision.id for decision in decisions}) == 20
+    assert len(stored) == 20
+    assert stats.writes == 20
+    assert stats.batches < 5
+
+
+def test_failing_write_only_fails_its_own_request(tmp_path) -> None:
+    async def _broken(session: AsyncSession) -> None:
+        raise ValueError("bad write")
+
+    async def _scenario():
+        queue, engine = await _queue(tmp_path, max_delay_s=0.05)
+        results = await asyncio.gather(
+            queue.submit(lambda session: insert_returning(session, _decision(1))),
+            queue.submit(_broken),
+            queue.submit(lambda session: insert_returning(session, _decision(2))),
+            return_exceptions=True,
+        )
+        await queue.close()
+        stored = await _stored_justifications(engine)
+        await engine.dispose()
+        return queue.stats, results, stored
+
+    stats, results, stored = asyncio.run(_scenario())
+
+    assert isinstance(results[1], ValueError)
+    assert stored == ["#1", "#2"]
+    assert stats.failed_batches == 1
+    assert stats.failed_writes == 1
+
+
+def test_acknowledged_writes_are_flushed_on_close(tmp_path) -> None:
+    async def _scenario():
+        queue, engine = await _queue(tmp_path, max_delay_s=0.2, wait_for_commit=False)
+        decision = await queue.submit(lambda session: insert_returning(session, _decision(1)))
+        before_close = await _stored_justifications(engine)
+        await queue.close()
+        after_close = await _stored_justifications(engine)
+        await engine.dispose()
+        return decision, before_close, after_close
+
+    decision, before_close, after_close = asyncio.run(_scenario())
+
+    assert decision.id is not None
+    assert after_close == ["#1"]
+    assert before_close in ([], ["#1"])
+
+
+def test_failed_commit_in_early_ack_mode_is_surfaced_not_replayed(tmp_path) -> None:
+    calls = 0
+
+    async def _insert(session: AsyncSession) -> Decision:
+        nonlocal calls
+        calls += 1
+        return await insert_returning(session, _decision(calls))
+
+    async def _scenario():
+        queue, engine = await _queue(tmp_path, max_delay_s=0.05, wait_for_commit=False)
+        session_factory = queue.session_factory
+
+        def _failing_commit_session() -> AsyncSession:
+            session = session_factory()
+
+            async def _commit() -> None:
+                raise RuntimeError("disk full")
+
+            session.commit = _commit
+            return session
+
+        queue.session_factory = _failing_commit_session
+        decision = await queue.submit(_insert)
+        await queue.close()
+        stored = await _stored_justifications(engine)
+        await engine.dispose()
+        return queue.stats, decision, stored
+
+    stats, decision, stored = asyncio.run(_scenario())
+
+    # The request got an id, but the batch holding it never committed.
+    assert decision.id is not None
+    assert stored == []
+    assert calls == 1
+    assert stats.failed_batches == 1
+    assert stats.lost_writes == 1
+
+
+def test_submit_after_close_is_rejected(tmp_path) -> None:
+    async def _scenario():
+        queue, engine = await _queue(tmp_path)
+        await queue.close()
+        await engine.dispose()
+        await queue.submit(lambda session: insert_returning(session, _decision(1)))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_scenario())
+
+
+def test_decision_choose_goes_through_the_queue_when_enabled(tmp_path, monkeypatch) -> None:
+    async def _scenario():
+        queue, engine = await _queue(tmp_path, max_delay_s=0.01)
+        monkeypatch.setattr(write_behind.settings, "db_write_behind_enabled", True)
+        monkeypatch.setattr(write_behind, "_write_behind_queue", queue)
+        request = DecisionChooseRequest(
+            options=["A", "B"], chosen_option="A", abandoned_options=["B"], justification="Meilleur ratio"
+        )
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            response = await decision_choose(request, session)
+        await write_behind.close_write_behind_queue()
+        stored = await _stored_justifications(engine)
+        await engine.dispose()
+        return queue.stats, response, stored
+
+    stats, response, stored = asyncio.run(_scenario())
+
+    assert response.decision_id > 0
+    assert stored == ["Meilleur ratio"]
+    assert stats.writes == 1